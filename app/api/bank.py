@@ -0,0 +1,151 @@
+"""Segmented sentence bank: an immutable base segment plus append-only deltas.
+
+New parallel pairs are appended as small exact-scan delta segments so they become
+searchable immediately. Searches scatter across all segments and merge the per-segment
+top-k; compaction later folds the deltas into a new base, streamed to disk and
+memory-mapped so a large bank is never held in RAM.
+"""
+
+import csv
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+
+from app.api.retrieval import RowRanges, SentenceIndex, contiguous_ranges
+from app.api.strings import LabelArray, StringStore
+
+DEFAULT_DOMAIN = "other"
+
+_COPY_CHUNK_ROWS = 65536
+
+
+class BankSegment:
+    """One immutable slice of the sentence bank and the index that searches it."""
+
+    def __init__(
+        self,
+        sentences: Sequence[str],
+        embeddings: np.ndarray,
+        index: SentenceIndex | None,
+        domains: Sequence[str] | None = None,
+    ) -> None:
+        if domains is not None and len(domains) != len(sentences):
+            raise ValueError("tgt_domains must have one tag per target sentence.")
+        self.sentences = sentences
+        self.embeddings = embeddings
+        self.index = index
+        self.domains = domains
+        # Domain tag per row, grouped into contiguous row slices for filtering
+        self.domain_ranges: dict[str, list[tuple[int, int]]] = (
+            contiguous_ranges(domains) if domains is not None else {}
+        )
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    def ranges_for(self, domains: list[str] | None) -> RowRanges | None:
+        """Row slices of this segment covering `domains`; [] if it holds none of them."""
+        if not domains:
+            return None
+        return sorted(r for d in set(domains) for r in self.domain_ranges.get(d, []))
+
+
+def known_domains(segments: Sequence[BankSegment]) -> set[str]:
+    return {d for seg in segments for d in seg.domain_ranges}
+
+
+def validate_domains(segments: Sequence[BankSegment], domains: list[str] | None) -> None:
+    """Raises ValueError naming any requested domain no segment contains."""
+    if not domains:
+        return
+    available = known_domains(segments)
+    unknown = sorted(set(domains) - available)
+    if unknown:
+        raise ValueError(
+            f"Unknown domain(s): {', '.join(unknown)}. "
+            f"Available domains: {', '.join(sorted(available)) or 'none'}."
+        )
+
+
+def merged_domains(segments: Sequence[BankSegment]) -> LabelArray | None:
+    """Concatenates per-row domain tags; untagged rows become DEFAULT_DOMAIN."""
+    if all(seg.domains is None for seg in segments):
+        return None
+    parts = []
+    for seg in segments:
+        if isinstance(seg.domains, LabelArray):
+            parts.append(seg.domains)
+        else:
+            parts.append(LabelArray.from_labels(seg.domains or [DEFAULT_DOMAIN] * len(seg)))
+    return LabelArray.concatenate(parts)
+
+
+def merged_sentences(segments: Sequence[BankSegment]) -> StringStore:
+    """Concatenates segment sentences into one compact store."""
+    base = segments[0].sentences
+    store = base if isinstance(base, StringStore) else StringStore.from_strings(base)
+    return store.appended([s for seg in segments[1:] for s in seg.sentences])
+
+
+def domain_for_csv(csv_path: Path, sources: dict[str, str]) -> str:
+    """Tags a CSV with the deepest source directory that contains it."""
+    best, best_depth = DEFAULT_DOMAIN, -1
+    for name, source_dir in sources.items():
+        source = Path(source_dir)
+        if csv_path.is_relative_to(source) and len(source.parts) > best_depth:
+            best, best_depth = name, len(source.parts)
+    return best
+
+
+def load_parallel_bank(
+    parallel_dir: str, sources: dict[str, str]
+) -> tuple[list[str], list[str], list[str]]:
+    """Loads all parallel CSVs, returns (ki_sentences, en_sentences, domains)."""
+    ki_list: list[str] = []
+    en_list: list[str] = []
+    domains: list[str] = []
+    for csv_path in sorted(Path(parallel_dir).rglob("*.csv")):
+        domain = domain_for_csv(csv_path, sources)
+        with open(csv_path, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                ki = row.get("Kikuyu", "").strip()
+                en = row.get("English", "").strip()
+                if ki and en:
+                    ki_list.append(ki)
+                    en_list.append(en)
+                    domains.append(domain)
+    return ki_list, en_list, domains
+
+
+def stack_embeddings(segments: Sequence[BankSegment]) -> np.ndarray:
+    """Stacks segment embeddings, skipping empty segments."""
+    parts = [seg.embeddings for seg in segments if len(seg) > 0]
+    if not parts:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.vstack(parts)  # type: ignore[no-any-return]
+
+
+def write_embeddings(segments: Sequence[BankSegment], path: str) -> np.ndarray:
+    """Streams segment embeddings into a ``.npy`` file and re-opens it memory-mapped.
+
+    Rows are copied in chunks, so a memory-mapped base is never read into RAM whole.
+    """
+    parts = [seg.embeddings for seg in segments if len(seg) > 0]
+    if not parts:
+        return np.empty((0, 0), dtype=np.float32)
+    out = np.lib.format.open_memmap(
+        path,
+        mode="w+",
+        dtype=np.float32,
+        shape=(sum(len(p) for p in parts), parts[0].shape[1]),
+    )
+    row = 0
+    for part in parts:
+        for start in range(0, len(part), _COPY_CHUNK_ROWS):
+            chunk = part[start : start + _COPY_CHUNK_ROWS]
+            out[row : row + len(chunk)] = chunk
+            row += len(chunk)
+    out.flush()
+    del out
+    return np.load(path, mmap_mode="r")  # type: ignore[no-any-return]
@@ -2,7 +2,12 @@
 
 import io
 import multiprocessing
+import os
 import sys
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
 from concurrent.futures import ProcessPoolExecutor
 from functools import partial
 from typing import Any
@@ -10,7 +15,18 @@ from typing import Any
 import fasttext
 import numpy as np
 
+from app.api.bank import (
+    BankSegment,
+    known_domains,
+    merged_domains,
+    merged_sentences,
+    stack_embeddings,
+    validate_domains,
+    write_embeddings,
+)
 from app.api.preprocessing import normalize_text, tokenize_text
+from app.api.retrieval import ExactSentenceIndex, SentenceIndex
+from app.api.strings import StringMap, StringStore
 from app.shared.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -74,6 +90,10 @@ def extract_parallel_proper_noun_anchors(
     return sorted(anchors)[:max_anchors]
 
 
+# Query rows scored per block when computing CSLS penalties on the CPU
+_CSLS_CHUNK_ROWS = 4096
+
+
 def compute_csls_penalty(embs: np.ndarray, ref_embs: np.ndarray, k: int = 10) -> np.ndarray:
     """Computes the mean cosine similarity of each embedding in `embs` to its `k` nearest neighbors in `ref_embs`."""
     if is_cuda_available:
@@ -95,10 +115,37 @@ def compute_csls_penalty(embs: np.ndarray, ref_embs: np.ndarray, k: int = 10) ->
 
     norm_embs = embs / np.maximum(np.linalg.norm(embs, axis=1, keepdims=True), 1e-8)
     norm_ref = ref_embs / np.maximum(np.linalg.norm(ref_embs, axis=1, keepdims=True), 1e-8)
-    sim = norm_embs @ norm_ref.T
-    sim.sort(axis=1)
-    topk_sim = sim[:, -min(k, sim.shape[1]) :]
-    return topk_sim.mean(axis=1)  # type: ignore[no-any-return]
+    k = min(k, norm_ref.shape[0])
+    # Score in row chunks so large banks never materialise the full N x N matrix
+    penalty = np.empty(len(norm_embs), dtype=np.result_type(norm_embs, norm_ref))
+    for start in range(0, len(norm_embs), _CSLS_CHUNK_ROWS):
+        sim = norm_embs[start : start + _CSLS_CHUNK_ROWS] @ norm_ref.T
+        topk_sim = np.partition(sim, sim.shape[1] - k, axis=1)[:, -k:]
+        penalty[start : start + len(sim)] = topk_sim.mean(axis=1)
+    return penalty
+
+
+def streamed_csls_penalty(
+    embs: np.ndarray, references: Sequence[np.ndarray], k: int = 10
+) -> np.ndarray:
+    """Like `compute_csls_penalty`, with the reference rows spread over several arrays.
+
+    References are read in row chunks while a running top-`k` is kept per row, so
+    memory-mapped arrays are never loaded whole and nothing is stacked.
+    """
+    penalty = np.zeros(len(embs), dtype=np.float32)
+    for start in range(0, len(embs), _CSLS_CHUNK_ROWS):
+        query = _unit_rows(embs[start : start + _CSLS_CHUNK_ROWS])
+        top = np.empty((len(query), 0), dtype=np.float32)
+        for ref in references:
+            for ref_start in range(0, len(ref), _CSLS_CHUNK_ROWS):
+                chunk = _unit_rows(ref[ref_start : ref_start + _CSLS_CHUNK_ROWS])
+                sim = np.hstack([top, query @ chunk.T])
+                keep = min(k, sim.shape[1])
+                top = np.partition(sim, sim.shape[1] - keep, axis=1)[:, -keep:]
+        if top.shape[1] > 0:
+            penalty[start : start + len(query)] = top.mean(axis=1)
+    return penalty
 
 
 # Global variables for worker processes
@@ -134,7 +181,36 @@ def get_sentence_embeddings_parallel(
     return np.array(results)
 
 
-def get_sentence_embedding(model: Any, sentence: str, dim: int = 100) -> np.ndarray:
+class TokenVectorCache:
+    """Per-session memo of source word vectors and word-by-word translations.
+
+    As-you-type clients resend a growing prefix on every keystroke, so nearly all
+    tokens were already looked up; holding on to them skips the FastText and vocab
+    lookups. Both maps are dropped once they reach `max_tokens`.
+    """
+
+    def __init__(self, max_tokens: int = 4096) -> None:
+        self.max_tokens = max_tokens
+        self.vectors: dict[str, np.ndarray] = {}
+        self.words: dict[str, str] = {}
+
+    def word_vector(self, model: Any, token: str) -> np.ndarray:
+        vector = self.vectors.get(token)
+        if vector is None:
+            if len(self.vectors) >= self.max_tokens:
+                self.vectors.clear()
+            vector = self.vectors[token] = model.get_word_vector(token)
+        return vector
+
+    def remember_word(self, token: str, word: str) -> None:
+        if len(self.words) >= self.max_tokens:
+            self.words.clear()
+        self.words[token] = word
+
+
+def get_sentence_embedding(
+    model: Any, sentence: str, dim: int = 100, cache: TokenVectorCache | None = None
+) -> np.ndarray:
     """
     Computes the average word embedding for a given sentence.
     """
@@ -145,10 +221,58 @@ def get_sentence_embedding(model: Any, sentence: str, dim: int = 100) -> np.ndar
         actual_dim = getattr(model, "get_dimension", lambda: dim)()
         return np.zeros(actual_dim, dtype=np.float32)
 
-    embeddings = [model.get_word_vector(token) for token in tokens]
+    if cache is not None:
+        embeddings = [cache.word_vector(model, token) for token in tokens]
+    else:
+        embeddings = [model.get_word_vector(token) for token in tokens]
     return np.mean(embeddings, axis=0).astype(np.float32)  # type: ignore[no-any-return]
 
 
+def get_sentence_embeddings(
+    model: Any,
+    sentences: Sequence[str],
+    dim: int = 100,
+    cache: TokenVectorCache | None = None,
+) -> np.ndarray:
+    """Batched `get_sentence_embedding`: one row per sentence, zeros without tokens.
+
+    Each distinct token is looked up once for the whole batch, and every sentence
+    mean comes from a single `np.add.reduceat`. Per-sentence code instead looks up
+    every token occurrence and calls `np.mean` once per sentence.
+    """
+    positions: dict[str, int] = {}
+    ids: list[int] = []
+    lengths: list[int] = []
+    for sentence in sentences:
+        tokens = [t for t in tokenize_text(normalize_text(sentence)) if t]
+        lengths.append(len(tokens))
+        ids.extend(positions.setdefault(token, len(positions)) for token in tokens)
+    if not positions:
+        actual_dim = getattr(model, "get_dimension", lambda: dim)()
+        return np.zeros((len(sentences), actual_dim), dtype=np.float32)
+
+    if cache is not None:
+        vectors = [cache.word_vector(model, token) for token in positions]
+    else:
+        vectors = [model.get_word_vector(token) for token in positions]
+    table = np.asarray(vectors, dtype=np.float32)
+    counts = np.asarray(lengths)
+    nonempty = counts > 0
+    starts = (np.cumsum(counts) - counts)[nonempty]
+    embeddings = np.zeros((len(sentences), table.shape[1]), dtype=np.float32)
+    embeddings[nonempty] = (
+        np.add.reduceat(table[ids], starts, axis=0) / counts[nonempty, None]
+    )
+    return embeddings
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    """Rows scaled to unit length; rows too close to zero to normalize become zeros."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    usable = norms >= 1e-8
+    return np.where(usable, matrix / np.where(usable, norms, 1.0), 0.0)
+
+
 def learn_alignment_matrix(
     src_embeddings: np.ndarray, tgt_embeddings: np.ndarray
 ) -> np.ndarray:
@@ -302,66 +426,329 @@ class CrossLingualTranslator:
         src_model: Any,
         tgt_model: Any,
         projection_matrix: np.ndarray,
-        tgt_sentences: list[str],
+        tgt_sentences: Sequence[str],
         precomputed_tgt_embeddings: np.ndarray | None = None,
         csls_k: int = 10,
+        sentence_index: SentenceIndex | None = None,
+        tgt_domains: Sequence[str] | None = None,
+        compact_dir: str | None = None,
     ) -> None:
         self._vocab_hnsw_index: Any = None  # set via build_vocab_hnsw_index()
         self.src_model = src_model
         self.tgt_model = tgt_model
         self.projection_matrix = projection_matrix
-        self.tgt_sentences = tgt_sentences
         self.csls_k = csls_k
+        # Where compaction spills the merged bank; None keeps it in RAM
+        self.compact_dir = compact_dir
+        # Base segment first, then append-only deltas; swapped as one tuple so a
+        # concurrent search always sees a consistent bank
+        self._segments: tuple[BankSegment, ...] = ()
+        self._bank_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
 
         if precomputed_tgt_embeddings is not None:
-            self.tgt_embeddings = precomputed_tgt_embeddings
+            tgt_embeddings = precomputed_tgt_embeddings
         else:
             # Precompute target sentence embeddings
             tgt_embs = []
             for s in tgt_sentences:
                 emb = get_sentence_embedding(tgt_model, s)
                 tgt_embs.append(emb)
-            self.tgt_embeddings = np.array(tgt_embs)
-
-        # Precompute target r_S penalty for sentence retrieval
-        if len(self.tgt_embeddings) > 0:
+            tgt_embeddings = np.array(tgt_embs)
+
+        index: SentenceIndex | None = None
+        if sentence_index is not None:
+            # Prebuilt indexes (e.g. PQ) carry the penalty they were trained with
+            index = sentence_index
+        elif len(tgt_embeddings) > 0:
+            # Precompute target r_S penalty for sentence retrieval.
             # We approximate source sentence space with target sentence space (intra-hubness)
             # which is an effective lightweight CSLS variant when source queries aren't known upfront.
-            self.tgt_csls_penalty = compute_csls_penalty(
-                self.tgt_embeddings, self.tgt_embeddings, k=self.csls_k
+            tgt_csls_penalty = compute_csls_penalty(
+                tgt_embeddings, tgt_embeddings, k=self.csls_k
             )
-
-    def translate_sentence_retrieval(self, src_sentence: str) -> str:
+            index = ExactSentenceIndex(tgt_embeddings, tgt_csls_penalty)
+
+        self._segments = (BankSegment(tgt_sentences, tgt_embeddings, None, tgt_domains),)
+        if index is not None:
+            self.use_sentence_index(index)
+
+    # The base segment's attributes keep their historical names
+    @property
+    def tgt_sentences(self) -> Sequence[str]:
+        return self._segments[0].sentences
+
+    @property
+    def tgt_embeddings(self) -> np.ndarray:
+        return self._segments[0].embeddings
+
+    @property
+    def sentence_index(self) -> SentenceIndex | None:
+        return self._segments[0].index
+
+    @property
+    def tgt_csls_penalty(self) -> np.ndarray:
+        index = self._segments[0].index
+        if index is None:
+            raise AttributeError("tgt_csls_penalty")
+        return index.csls_penalty
+
+    @property
+    def domain_ranges(self) -> dict[str, list[tuple[int, int]]]:
+        return self._segments[0].domain_ranges
+
+    @property
+    def delta_segments(self) -> tuple[BankSegment, ...]:
+        return self._segments[1:]
+
+    def use_sentence_index(self, index: SentenceIndex) -> None:
+        """Swaps the index searched over the base bank segment (exact, PQ, ...)."""
+        with self._bank_lock:
+            base = self._segments[0]
+            if len(index) != len(base):
+                raise ValueError(
+                    f"Sentence index has {len(index)} rows but the bank has "
+                    f"{len(base)} sentences."
+                )
+            new_base = BankSegment(base.sentences, base.embeddings, index, base.domains)
+            self._segments = (new_base,) + self._segments[1:]
+        logger.info("Sentence retrieval now uses the %s index.", index.kind)
+
+    def add_sentences(
+        self, sentences: list[str], domains: list[str] | None = None
+    ) -> BankSegment:
+        """Appends target sentences as a new delta segment, searchable immediately.
+
+        Vectors come from the current target model. Their CSLS penalties are computed
+        against the whole bank by streaming each segment in row chunks; existing rows
+        keep theirs.
         """
-        Translates a source sentence by projecting its embedding to the target space
-        and retrieving the target sentence with the highest cosine similarity.
+        embs = np.array(
+            [get_sentence_embedding(self.tgt_model, s) for s in sentences], dtype=np.float32
+        )
+        references = [seg.embeddings for seg in self._segments if len(seg) > 0]
+        penalty = streamed_csls_penalty(embs, references + [embs], k=self.csls_k)
+        segment = BankSegment(
+            list(sentences), embs, ExactSentenceIndex(embs, penalty), domains
+        )
+        with self._bank_lock:
+            self._segments = self._segments + (segment,)
+        logger.info(
+            "Appended %d sentences as delta segment %d.",
+            len(sentences),
+            len(self._segments) - 1,
+        )
+        return segment
+
+    def compact(self) -> bool:
+        """Folds all delta segments into a new base.
+
+        Penalties are carried over rather than recomputed: base rows keep theirs and
+        each delta keeps the one computed when it was added, so compaction costs a
+        copy of the bank instead of an N x N pass. With `compact_dir` set the merged
+        bank is written there and memory-mapped. Returns False when there was nothing
+        to merge. Deltas appended while the merge runs are kept as deltas of the new
+        base.
         """
-        if not self.tgt_sentences:
-            return ""
+        with self._compact_lock:
+            segments = self._segments
+            if len(segments) < 2:
+                return False
+            base, deltas = segments[0], segments[1:]
+
+            start = time.perf_counter()
+            new_rows = stack_embeddings(deltas)
+            penalty = np.concatenate([
+                seg.index.csls_penalty for seg in segments if seg.index is not None
+            ])
+            path = None
+            if self.compact_dir is not None:
+                fd, path = tempfile.mkstemp(
+                    prefix="bank-", suffix=".npy", dir=self.compact_dir
+                )
+                os.close(fd)
+                embs = write_embeddings(segments, path)
+            else:
+                embs = stack_embeddings(segments)
+            index: SentenceIndex = (
+                base.index.extended(new_rows, penalty, embeddings=embs)
+                if base.index is not None
+                else ExactSentenceIndex(embs, penalty)
+            )
+            if path is not None:
+                # The mapping outlives the directory entry, so nothing is left on disk
+                # once the index (and any shard worker reading the file) is built
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            merged = BankSegment(
+                merged_sentences(segments), embs, index, merged_domains(segments)
+            )
+
+            with self._bank_lock:
+                self._segments = (merged,) + self._segments[len(segments) :]
+            # Release resources held by the replaced index (e.g. shard workers)
+            close = getattr(base.index, "close", None)
+            if close is not None and base.index is not index:
+                close()
+        logger.info(
+            "Compacted %d delta segments into a %d-row base in %.2fs.",
+            len(deltas),
+            len(merged),
+            time.perf_counter() - start,
+        )
+        return True
+
+    def schedule_compaction(self) -> bool:
+        """Runs `compact()` on a background thread unless one is already running."""
+        if self._compact_lock.locked():
+            return False
+        threading.Thread(target=self.compact, name="bank-compaction", daemon=True).start()
+        return True
+
+    def embed_query(
+        self, src_sentence: str, cache: TokenVectorCache | None = None
+    ) -> np.ndarray | None:
+        """Projects a source sentence into the target space as a unit vector.
 
-        src_emb = get_sentence_embedding(self.src_model, src_sentence)
+        Returns None when the sentence has no usable embedding (no known tokens).
+        """
+        segment_fn = getattr(self, "src_segment_fn", None)
+        sentence_to_embed = (
+            segment_fn(src_sentence) if segment_fn is not None else src_sentence
+        )
+        src_emb = get_sentence_embedding(self.src_model, sentence_to_embed, cache=cache)
         projected = self.projection_matrix @ src_emb
 
-        # Compute cosine similarities
         norm_projected = np.linalg.norm(projected)
         if norm_projected < 1e-8:
-            return self.tgt_sentences[0]
+            return None
+        return projected / norm_projected  # type: ignore[no-any-return]
 
-        norms_tgt = np.linalg.norm(self.tgt_embeddings, axis=1)
-        # Avoid division by zero for unaligned/empty target sentences
-        norms_tgt[norms_tgt < 1e-8] = 1.0
+    def embed_queries(
+        self, src_sentences: Sequence[str], cache: TokenVectorCache | None = None
+    ) -> np.ndarray:
+        """Batched `embed_query`: one projection for all rows, as unit vectors.
 
-        scores = np.dot(self.tgt_embeddings, projected) / (norms_tgt * norm_projected)
+        Sentences without a usable embedding get all-zero rows.
+        """
+        segment_fn = getattr(self, "src_segment_fn", None)
+        if segment_fn is not None:
+            src_sentences = [segment_fn(s) for s in src_sentences]
+        raw = get_sentence_embeddings(self.src_model, src_sentences, cache=cache)
+        return _unit_rows(raw @ self.projection_matrix.T)
+
+    def embed_targets(self, tgt_sentences: Sequence[str]) -> np.ndarray:
+        """Unit target-language sentence vectors, in the space the bank is searched in."""
+        return _unit_rows(get_sentence_embeddings(self.tgt_model, tgt_sentences))
+
+    @property
+    def bank_domains(self) -> set[str]:
+        """Domains tagged on rows of any bank segment, deltas included."""
+        return known_domains(self._segments)
+
+    def check_domains(self, domains: list[str] | None) -> None:
+        """Raises ValueError if any of `domains` is absent from every bank segment."""
+        validate_domains(self._segments, domains)
+
+    def retrieve_top_k(
+        self,
+        src_sentence: str,
+        k: int,
+        shortlist: int | None = None,
+        domains: list[str] | None = None,
+        cache: TokenVectorCache | None = None,
+    ) -> list[tuple[str, float]]:
+        """Returns the top-K (target sentence, CSLS score) pairs, best first.
+
+        `shortlist` trades latency for quality on approximate indexes: it is the
+        number of coarse candidates re-scored exactly (ignored by the exact index).
+        `domains` restricts the search to the bank slices tagged with those domains.
+        """
+        return self.retrieve_top_k_many([src_sentence], k, shortlist, domains, cache)[0]
 
-        # Apply CSLS r_S penalty (we ignore r_T as it's constant for a single query)
-        if hasattr(self, "tgt_csls_penalty"):
-            scores = 2 * scores - self.tgt_csls_penalty
+    def retrieve_top_k_many(
+        self,
+        src_sentences: Sequence[str],
+        k: int,
+        shortlist: int | None = None,
+        domains: list[str] | None = None,
+        cache: TokenVectorCache | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """Batched `retrieve_top_k`: indexes with `search_many` score all queries at once."""
+        segments = [seg for seg in self._segments if seg.index is not None and len(seg)]
+        if not segments or not src_sentences:
+            return [[] for _ in src_sentences]
+        validate_domains(segments, domains)
+        searchable = [
+            (seg, ranges)
+            for seg in segments
+            if (ranges := seg.ranges_for(domains)) is None or ranges
+        ]
+
+        embedded = self.embed_queries(src_sentences, cache)
+        usable = embedded.any(axis=1)
+        live = np.flatnonzero(usable).tolist()
+        merged: list[list[tuple[float, str]]] = [[] for _ in src_sentences]
+        if live:
+            matrix = embedded[usable]
+            # Scatter across segments, then merge per query
+            for seg, ranges in searchable:
+                assert seg.index is not None
+                search_many = getattr(seg.index, "search_many", None)
+                if search_many is not None:
+                    hits = search_many(matrix, k, shortlist=shortlist, ranges=ranges)
+                else:
+                    hits = [
+                        seg.index.search(q, k, shortlist=shortlist, ranges=ranges)
+                        for q in matrix
+                    ]
+                for i, (ids, scores) in zip(live, hits, strict=True):
+                    merged[i].extend(
+                        (float(score), seg.sentences[int(row)])
+                        for row, score in zip(ids, scores, strict=True)
+                    )
+
+        results: list[list[tuple[str, float]]] = []
+        for has_query, candidates in zip(usable, merged, strict=True):
+            if not has_query:
+                # No usable embedding: fall back to the first searchable row
+                seg, ranges = searchable[0]
+                results.append([(seg.sentences[ranges[0][0] if ranges else 0], 0.0)])
+                continue
+            # The stable sort keeps older segments first on ties
+            candidates.sort(key=lambda r: -r[0])
+            results.append([(text, score) for score, text in candidates[:k]])
+        return results
 
-        best_idx = int(np.argmax(scores))
-        return self.tgt_sentences[best_idx]
+    def translate_sentence_retrieval(
+        self,
+        src_sentence: str,
+        shortlist: int | None = None,
+        domains: list[str] | None = None,
+    ) -> str:
+        """
+        Translates a source sentence by projecting its embedding to the target space
+        and retrieving the target sentence with the highest CSLS-adjusted similarity.
+        """
+        top = self.retrieve_top_k(src_sentence, 1, shortlist=shortlist, domains=domains)
+        return top[0][0] if top else ""
 
-    def build_vocab_hnsw_index(self, ef_construction: int = 200, M: int = 16) -> None:
-        """Builds an hnswlib HNSW index over the target vocabulary for fast word lookup."""
+    def build_vocab_hnsw_index(
+        self,
+        ef_construction: int = 200,
+        M: int = 16,
+        ef: int = 64,
+        shortlist: int = 64,
+        num_threads: int = 1,
+    ) -> None:
+        """Builds an hnswlib HNSW index over the target vocabulary for fast word lookup.
+
+        Each word query takes the `shortlist` nearest neighbours found with search
+        breadth `ef` and re-ranks them with CSLS. `scripts.tune_hnsw` picks all four.
+        The build uses every core; queries then run on `num_threads` threads.
+        """
         try:
             import hnswlib
         except ImportError:
@@ -371,7 +758,8 @@ class CrossLingualTranslator:
             return
 
         if not hasattr(self, "tgt_vocab_words"):
-            self.tgt_vocab_words = self.tgt_model.get_words()
+            # Compact store: the vocab is only decoded for the words returned
+            self.tgt_vocab_words = StringStore.from_strings(self.tgt_model.get_words())
             raw = np.array([
                 self.tgt_model.get_word_vector(w) for w in self.tgt_vocab_words
             ])
@@ -397,16 +785,54 @@ class CrossLingualTranslator:
             M=M,
         )
         index.add_items(self.tgt_vocab_embeddings)
-        index.set_ef(64)
+        index.set_num_threads(num_threads)
+        # hnswlib searches with breadth max(ef, k); a minimal index ef lets each
+        # query choose its own breadth through k
+        index.set_ef(1)
         self._vocab_hnsw_index = index
+        self.vocab_shortlist = shortlist
+        self.vocab_ef = max(ef, shortlist)
         logger.info(
             "Built HNSW vocab index over %d target words.", len(self.tgt_vocab_words)
         )
 
-    def translate_word_by_word(self, src_sentence: str) -> str:
+    def build_word_table(self, size: int) -> None:
+        """Precomputes word-by-word translations of the `size` most frequent source words.
+
+        `translate_with_word_table` then answers with dictionary lookups only, the
+        cheapest fallback when the server is over its latency budget.
+        """
+        start = time.perf_counter()
+        words = self.src_model.get_words()[:size]
+        self._ensure_tgt_vocab()
+        self.word_table = StringMap.from_items(
+            (word, self._translate_token(word, None)) for word in words
+        )
+        logger.info(
+            "Built word table of %d entries in %.1fs.",
+            len(self.word_table),
+            time.perf_counter() - start,
+        )
+
+    def translate_with_word_table(self, src_sentence: str) -> str:
+        """Word-by-word from the precomputed table; unknown words are kept as they are."""
+        table = getattr(self, "word_table", None)
+        tokens = [t for t in tokenize_text(normalize_text(src_sentence)) if t]
+        if table is None:
+            return " ".join(tokens)
+        return " ".join(table.get(token, token) for token in tokens)
+
+    def translate_word_by_word(
+        self,
+        src_sentence: str,
+        cache: TokenVectorCache | None = None,
+        ef: int | None = None,
+    ) -> str:
         """
         Translates a source sentence word-by-word by projecting each word's embedding
-        and finding the nearest target vocabulary word.
+        and finding the nearest target vocabulary word. Tokens already in `cache`
+        reuse their earlier translation; `ef` lowers the HNSW search breadth for
+        this call (cached translations were made at the full breadth).
         """
         from app.api.preprocessing import normalize_text, tokenize_text
 
@@ -417,9 +843,22 @@ class CrossLingualTranslator:
         if not tokens:
             return ""
 
+        self._ensure_tgt_vocab()
+        translated_words = []
+        for token in tokens:
+            word = cache.words.get(token) if cache is not None else None
+            if word is None:
+                word = self._translate_token(token, cache, ef)
+                if cache is not None and ef is None:
+                    cache.remember_word(token, word)
+            translated_words.append(word)
+
+        return " ".join(translated_words)
+
+    def _ensure_tgt_vocab(self) -> None:
         # Get target vocabulary words and embeddings if not already cached
         if not hasattr(self, "tgt_vocab_words"):
-            self.tgt_vocab_words = self.tgt_model.get_words()
+            self.tgt_vocab_words = StringStore.from_strings(self.tgt_model.get_words())
             self.tgt_vocab_embeddings = np.array([
                 self.tgt_model.get_word_vector(w) for w in self.tgt_vocab_words
             ])
@@ -436,37 +875,43 @@ class CrossLingualTranslator:
                 self.tgt_vocab_embeddings, projected_src_vocab, k=self.csls_k
             )
 
-        translated_words = []
-        for token in tokens:
-            v_src = self.src_model.get_word_vector(token)
-
-            norm_v = np.linalg.norm(v_src)
-            if norm_v < 1e-8:
-                translated_words.append(token)
-                continue
-
-            projected = self.projection_matrix @ v_src
-            norm_proj = np.linalg.norm(projected)
-            if norm_proj < 1e-8:
-                translated_words.append(token)
-                continue
-
-            if self._vocab_hnsw_index is not None:
-                # Fast approximate search: get top-64 candidates, re-rank with CSLS
-                q = (projected / norm_proj).reshape(1, -1)
-                labels, _ = self._vocab_hnsw_index.knn_query(q, k=64)
-                cand = labels[0]
-                cand_vecs = self.tgt_vocab_embeddings[cand]
-                cosines = cand_vecs @ (projected / norm_proj)
-                csls_scores = 2 * cosines - self.tgt_word_csls_penalty[cand]
-                best_idx = int(cand[np.argmax(csls_scores)])
-            else:
-                scores = np.dot(self.tgt_vocab_embeddings, projected) / (
-                    self.tgt_vocab_norms * norm_proj
-                )
-                scores = 2 * scores - self.tgt_word_csls_penalty
-                best_idx = int(np.argmax(scores))
+    def _translate_token(
+        self, token: str, cache: TokenVectorCache | None, ef: int | None = None
+    ) -> str:
+        """Nearest target vocab word under CSLS, or the token itself if it has no vector."""
+        v_src = (
+            cache.word_vector(self.src_model, token)
+            if cache is not None
+            else self.src_model.get_word_vector(token)
+        )
 
-            translated_words.append(self.tgt_vocab_words[best_idx])
+        norm_v = np.linalg.norm(v_src)
+        if norm_v < 1e-8:
+            return token
+
+        projected = self.projection_matrix @ v_src
+        norm_proj = np.linalg.norm(projected)
+        if norm_proj < 1e-8:
+            return token
+
+        if self._vocab_hnsw_index is not None:
+            # Fast approximate search: get a shortlist of candidates, re-rank with CSLS
+            q = (projected / norm_proj).reshape(1, -1)
+            breadth = self.vocab_ef if ef is None else ef
+            labels, _ = self._vocab_hnsw_index.knn_query(
+                q, k=min(breadth, len(self.tgt_vocab_words))
+            )
+            # Neighbours come nearest first; re-rank the configured shortlist of them
+            cand = labels[0][: self.vocab_shortlist]
+            cand_vecs = self.tgt_vocab_embeddings[cand]
+            cosines = cand_vecs @ (projected / norm_proj)
+            csls_scores = 2 * cosines - self.tgt_word_csls_penalty[cand]
+            best_idx = int(cand[np.argmax(csls_scores)])
+        else:
+            scores = np.dot(self.tgt_vocab_embeddings, projected) / (
+                self.tgt_vocab_norms * norm_proj
+            )
+            scores = 2 * scores - self.tgt_word_csls_penalty
+            best_idx = int(np.argmax(scores))
 
-        return " ".join(translated_words)
+        return self.tgt_vocab_words[best_idx]
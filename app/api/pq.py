@@ -0,0 +1,313 @@
+"""Product-quantization compressed sentence index for very large target banks.
+
+Each unit-normalised bank vector is split into `m` sub-vectors and every sub-vector
+is replaced by the id of its nearest k-means centroid, so a 300-d float32 row
+(1,200 bytes) becomes `m` uint8 codes. Queries are scored with asymmetric distance
+computation (ADC): the query stays in full precision and is compared against the
+centroids once per search through a small (m, n_centroids) lookup table.
+"""
+
+import time
+
+import numpy as np
+
+from app.api.retrieval import (
+    RowRanges,
+    normalize_rows,
+    rescore_exact,
+    scan_ranges,
+    top_k_rows,
+)
+from app.shared.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Rows scored per ADC chunk; bounds the (chunk, m) gather temporary on huge banks
+_ADC_CHUNK_ROWS = 65536
+
+
+def kmeans(x: np.ndarray, n_clusters: int, n_iter: int = 20, seed: int = 0) -> np.ndarray:
+    """Plain Lloyd's k-means in NumPy. Returns centroids of shape (n_clusters, dim)."""
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(x))
+    centroids = x[rng.choice(len(x), size=n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2; ||x||^2 is constant per row
+        dists = (centroids**2).sum(axis=1) - 2 * (x @ centroids.T)
+        assign = np.argmin(dists, axis=1)
+
+        counts = np.bincount(assign, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        non_empty = counts > 0
+        centroids[non_empty] = sums[non_empty] / counts[non_empty, None]
+
+        # Re-seed empty clusters with random points so every code stays usable
+        n_empty = int((~non_empty).sum())
+        if n_empty:
+            centroids[~non_empty] = x[rng.choice(len(x), size=n_empty)]
+
+    return centroids.astype(np.float32)  # type: ignore[no-any-return]
+
+
+class ProductQuantizer:
+    """Sub-space k-means codebooks with encode/decode and ADC lookup tables."""
+
+    def __init__(self, codebooks: np.ndarray, dim: int) -> None:
+        self.codebooks = codebooks.astype(np.float32)  # (m, n_centroids, dsub)
+        self.dim = dim
+        self.m, self.n_centroids, self.dsub = self.codebooks.shape
+
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        n_subvectors: int = 50,
+        n_centroids: int = 256,
+        n_iter: int = 20,
+        sample_size: int = 100_000,
+        seed: int = 0,
+    ) -> "ProductQuantizer":
+        """Fits one k-means codebook per sub-space on (a sample of) `vectors`."""
+        if n_centroids > 256:
+            raise ValueError("n_centroids must be <= 256 so codes fit in uint8")
+
+        dim = vectors.shape[1]
+        rng = np.random.default_rng(seed)
+        if len(vectors) > sample_size:
+            vectors = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+        x = cls._pad(np.asarray(vectors, dtype=np.float32), n_subvectors)
+        dsub = x.shape[1] // n_subvectors
+
+        codebooks = np.stack([
+            kmeans(
+                x[:, j * dsub : (j + 1) * dsub], n_centroids, n_iter=n_iter, seed=seed + j
+            )
+            for j in range(n_subvectors)
+        ])
+        return cls(codebooks, dim)
+
+    @staticmethod
+    def _pad(x: np.ndarray, m: int) -> np.ndarray:
+        """Zero-pads columns so the dimension splits evenly into `m` sub-vectors."""
+        remainder = x.shape[1] % m
+        if remainder == 0:
+            return x
+        return np.pad(x, ((0, 0), (0, m - remainder)))
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Returns uint8 codes of shape (n, m)."""
+        x = self._pad(np.asarray(vectors, dtype=np.float32), self.m)
+        codes = np.empty((len(x), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            sub = x[:, j * self.dsub : (j + 1) * self.dsub]
+            cb = self.codebooks[j]
+            dists = (cb**2).sum(axis=1) - 2 * (sub @ cb.T)
+            codes[:, j] = np.argmin(dists, axis=1)
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Reconstructs approximate vectors of shape (n, dim) from codes."""
+        parts = [self.codebooks[j][codes[:, j]] for j in range(self.m)]
+        return np.hstack(parts)[:, : self.dim]  # type: ignore[no-any-return]
+
+    def distance_table(self, query: np.ndarray) -> np.ndarray:
+        """Inner products between each query sub-vector and its codebook: (m, n_centroids)."""
+        q = self._pad(np.asarray(query, dtype=np.float32).reshape(1, -1), self.m)[0]
+        q_sub = q.reshape(self.m, self.dsub)
+        return np.einsum("mkd,md->mk", self.codebooks, q_sub)  # type: ignore[no-any-return]
+
+    def adc_scores(self, table: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate query/row inner products summed from the lookup table."""
+        scores = np.empty(len(codes), dtype=np.float32)
+        sub_ids = np.arange(self.m)
+        for start in range(0, len(codes), _ADC_CHUNK_ROWS):
+            chunk = codes[start : start + _ADC_CHUNK_ROWS]
+            scores[start : start + len(chunk)] = table[sub_ids, chunk].sum(axis=1)
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codebooks.nbytes)
+
+
+class _StackedRows:
+    """Rows of `base` followed by those of `delta`, gathered without stacking them."""
+
+    def __init__(self, base: np.ndarray, delta: np.ndarray) -> None:
+        self.base = base
+        self.delta = delta
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.delta)
+
+    def __getitem__(self, rows: np.ndarray) -> np.ndarray:
+        out = np.empty((len(rows), self.base.shape[1]), dtype=np.float32)
+        in_base = rows < len(self.base)
+        out[in_base] = self.base[rows[in_base]]
+        out[~in_base] = self.delta[rows[~in_base] - len(self.base)]
+        return out
+
+
+class PQSentenceIndex:
+    """Compressed sentence bank scored by ADC with CSLS-aware re-ranking.
+
+    Rows are shortlisted by the approximate CSLS score ``2 * adc - r_S``; the
+    shortlist is then re-scored exactly when full-precision vectors are available
+    (e.g. a memory-mapped ``tgt_embs_*.npy``), so only shortlisted pages are read.
+    Rows added later are re-scored from `rerank_delta`, a small in-memory array
+    kept next to the memory map rather than stacked onto it.
+    """
+
+    kind = "pq"
+
+    def __init__(
+        self,
+        quantizer: ProductQuantizer,
+        codes: np.ndarray,
+        csls_penalty: np.ndarray,
+        rerank_vectors: np.ndarray | None = None,
+        rerank_factor: int = 10,
+        rerank_delta: np.ndarray | None = None,
+    ) -> None:
+        self.quantizer = quantizer
+        self.codes = codes
+        self.csls_penalty = csls_penalty.astype(np.float32)
+        self.rerank_vectors = rerank_vectors
+        self.rerank_factor = rerank_factor
+        self.rerank_delta = rerank_delta
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: np.ndarray,
+        csls_penalty: np.ndarray,
+        n_subvectors: int = 50,
+        n_centroids: int = 256,
+        n_iter: int = 20,
+        seed: int = 0,
+    ) -> "PQSentenceIndex":
+        unit = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        quantizer = ProductQuantizer.train(
+            unit,
+            n_subvectors=n_subvectors,
+            n_centroids=n_centroids,
+            n_iter=n_iter,
+            seed=seed,
+        )
+        return cls(quantizer, quantizer.encode(unit), csls_penalty)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        shortlist: int | None = None,
+        ranges: RowRanges | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        table = self.quantizer.distance_table(query)
+
+        def score_range(start: int, end: int) -> np.ndarray:
+            adc = self.quantizer.adc_scores(table, self.codes[start:end])
+            return 2 * adc - self.csls_penalty[start:end]  # type: ignore[no-any-return]
+
+        scanned = scan_ranges(score_range, len(self), ranges)
+        if self.rerank_vectors is None:
+            return top_k_rows(*scanned, k)
+
+        size = max(k, shortlist or k * self.rerank_factor)
+        candidates, _ = top_k_rows(*scanned, size)
+        rows = (
+            self.rerank_vectors
+            if self.rerank_delta is None
+            else _StackedRows(self.rerank_vectors, self.rerank_delta)
+        )
+        return rescore_exact(rows, self.csls_penalty, query, candidates, k)  # type: ignore[arg-type]
+
+    def extended(
+        self,
+        new_rows: np.ndarray,
+        csls_penalty: np.ndarray,
+        embeddings: np.ndarray | None = None,
+    ) -> "PQSentenceIndex":
+        """Encodes `new_rows` with the existing codebooks and appends them.
+
+        The re-rank vectors are not copied: re-ranking reads `embeddings` when given,
+        otherwise new rows join the in-memory delta.
+        """
+        codes = np.vstack([self.codes, self.quantizer.encode(normalize_rows(new_rows))])
+        rerank = self.rerank_vectors
+        delta = None
+        if rerank is not None and embeddings is not None:
+            rerank = embeddings
+        elif rerank is not None:
+            new_rows = np.asarray(new_rows, dtype=np.float32)
+            delta = (
+                new_rows
+                if self.rerank_delta is None
+                else np.vstack([self.rerank_delta, new_rows])
+            )
+        return PQSentenceIndex(
+            self.quantizer,
+            codes,
+            csls_penalty,
+            rerank,
+            self.rerank_factor,
+            delta,
+        )
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            codebooks=self.quantizer.codebooks,
+            dim=np.array(self.quantizer.dim),
+            codes=self.codes,
+            csls_penalty=self.csls_penalty,
+        )
+        logger.info(
+            "Saved PQ index (%d rows, m=%d) to %s", len(self), self.quantizer.m, path
+        )
+
+    @classmethod
+    def load(
+        cls, path: str, rerank_vectors: np.ndarray | None = None, rerank_factor: int = 10
+    ) -> "PQSentenceIndex":
+        with np.load(path) as data:
+            quantizer = ProductQuantizer(data["codebooks"], int(data["dim"]))
+            codes = data["codes"]
+            penalty = data["csls_penalty"]
+        return cls(quantizer, codes, penalty, rerank_vectors, rerank_factor)
+
+    def compression_ratio(self) -> float:
+        """Full float32 bank size divided by codes + codebooks size."""
+        full = len(self.codes) * self.quantizer.dim * 4
+        compressed = self.codes.nbytes + self.quantizer.nbytes
+        return full / max(compressed, 1)
+
+
+def evaluate_pq_recall(
+    index: PQSentenceIndex,
+    exact_embeddings: np.ndarray,
+    queries: np.ndarray,
+    ks: tuple[int, ...] = (1, 5, 10),
+) -> dict[str, float]:
+    """Recall@k: how often the exact CSLS top-1 row appears in the PQ top-k."""
+    unit = normalize_rows(np.asarray(exact_embeddings, dtype=np.float32))
+    max_k = max(ks)
+    hits = dict.fromkeys(ks, 0)
+    latencies = []
+    for q in queries:
+        exact_best = int(np.argmax(2 * (unit @ q) - index.csls_penalty))
+        start = time.perf_counter()
+        ids, _ = index.search(q, max_k)
+        latencies.append(time.perf_counter() - start)
+        for k in ks:
+            if exact_best in ids[:k]:
+                hits[k] += 1
+    n = max(len(queries), 1)
+    report = {f"recall_at_{k}": hits[k] / n for k in ks}
+    report["mean_query_ms"] = 1000 * float(np.mean(latencies)) if latencies else 0.0
+    return report
@@ -0,0 +1,288 @@
+"""Sentence-bank indexes searched by `CrossLingualTranslator` for retrieval.
+
+Every index exposes the same interface: ``search(query, k, shortlist, ranges)`` takes
+a unit-normalised projected query vector and returns ``(row_ids, csls_scores)`` sorted
+best-first, and ``csls_penalty`` holds the per-row r_S penalty the scores were
+adjusted with. Approximate indexes use ``shortlist`` as the number of candidates
+re-scored exactly; the exact index ignores it. ``ranges`` restricts the scan to
+``[start, end)`` row slices (e.g. one domain of the bank); None scans every row.
+"""
+
+from collections.abc import Callable, Sequence
+from typing import Protocol
+
+import numpy as np
+
+from app.api.strings import LabelArray
+
+# Queries scored per matrix product in batched searches; bounds the (rows, block) temporary
+_QUERY_BLOCK = 32
+
+
+class SentenceIndex(Protocol):
+    kind: str
+    csls_penalty: np.ndarray
+
+    def __len__(self) -> int: ...
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        shortlist: int | None = None,
+        ranges: "RowRanges | None" = None,
+    ) -> tuple[np.ndarray, np.ndarray]: ...
+
+    def extended(
+        self,
+        new_rows: np.ndarray,
+        csls_penalty: np.ndarray,
+        embeddings: np.ndarray | None = None,
+    ) -> "SentenceIndex":
+        """Returns a copy with `new_rows` appended and penalties replaced for all rows.
+
+        `embeddings`, when given, already holds the old rows followed by `new_rows`
+        (e.g. a memory-mapped merged bank) and is used instead of stacking a copy.
+        """
+        ...
+
+
+RowRanges = Sequence[tuple[int, int]]
+
+
+def contiguous_ranges(labels: Sequence[str]) -> dict[str, list[tuple[int, int]]]:
+    """Groups row labels into maximal contiguous ``[start, end)`` runs per label."""
+    if isinstance(labels, LabelArray):
+        return labels.contiguous_ranges()
+    ranges: dict[str, list[tuple[int, int]]] = {}
+    start = 0
+    for i in range(1, len(labels) + 1):
+        if i == len(labels) or labels[i] != labels[start]:
+            ranges.setdefault(labels[start], []).append((start, i))
+            start = i
+    return ranges
+
+
+def scan_ranges(
+    score_range: Callable[[int, int], np.ndarray], n_rows: int, ranges: RowRanges | None
+) -> tuple[np.ndarray | None, np.ndarray]:
+    """Scores each row range and concatenates the results.
+
+    Returns ``(row_ids, scores)``; ``row_ids`` is None when the whole bank was scanned
+    so callers can skip the identity mapping.
+    """
+    if ranges is None:
+        return None, score_range(0, n_rows)
+    ranges = [(start, end) for start, end in ranges if end > start]
+    if not ranges:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    row_ids = np.concatenate([np.arange(start, end) for start, end in ranges])
+    scores = np.concatenate([score_range(start, end) for start, end in ranges])
+    return row_ids, scores
+
+
+def top_k_rows(
+    row_ids: np.ndarray | None, scores: np.ndarray, k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Selects the best `k` scores from a `scan_ranges` result as (row_ids, scores)."""
+    top = top_k_indices(scores, k)
+    rows = top if row_ids is None else row_ids[top]
+    return rows, scores[top]
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Returns the indices of the `k` highest scores, best first, without a full sort."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order].astype(np.int64)  # type: ignore[no-any-return]
+
+
+def normalize_rows(embs: np.ndarray) -> np.ndarray:
+    """L2-normalises each row, leaving all-zero rows untouched."""
+    norms = np.linalg.norm(embs, axis=1, keepdims=True)
+    norms[norms < 1e-8] = 1.0
+    return (embs / norms).astype(np.float32)  # type: ignore[no-any-return]
+
+
+class ExactSentenceIndex:
+    """Brute-force CSLS scan over the full-precision sentence bank."""
+
+    kind = "exact"
+
+    def __init__(self, embeddings: np.ndarray, csls_penalty: np.ndarray) -> None:
+        self.embeddings = embeddings
+        self.csls_penalty = csls_penalty
+        norms = np.linalg.norm(embeddings, axis=1)
+        # Avoid division by zero for unaligned/empty target sentences
+        norms[norms < 1e-8] = 1.0
+        self._norms = norms
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        shortlist: int | None = None,
+        ranges: RowRanges | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        def score_range(start: int, end: int) -> np.ndarray:
+            scores = np.dot(self.embeddings[start:end], query) / self._norms[start:end]
+            # Apply CSLS r_S penalty (r_T is constant for a single query)
+            return 2 * scores - self.csls_penalty[start:end]  # type: ignore[no-any-return]
+
+        return top_k_rows(*scan_ranges(score_range, len(self), ranges), k)
+
+    def search_many(
+        self,
+        queries: np.ndarray,
+        k: int,
+        shortlist: int | None = None,
+        ranges: RowRanges | None = None,
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Batched `search`: one matrix product per block of queries."""
+        results = []
+        for start in range(0, len(queries), _QUERY_BLOCK):
+            block = queries[start : start + _QUERY_BLOCK].T  # (dim, n_queries)
+
+            def score_range(a: int, b: int, block: np.ndarray = block) -> np.ndarray:
+                scores = (self.embeddings[a:b] @ block) / self._norms[a:b, None]
+                return 2 * scores - self.csls_penalty[a:b, None]  # type: ignore[no-any-return]
+
+            row_ids, scores = scan_ranges(score_range, len(self), ranges)
+            if scores.ndim == 1:  # no rows inside `ranges`
+                scores = np.empty((0, block.shape[1]), dtype=np.float32)
+            results.extend(top_k_rows(row_ids, col, k) for col in scores.T)
+        return results
+
+    def extended(
+        self,
+        new_rows: np.ndarray,
+        csls_penalty: np.ndarray,
+        embeddings: np.ndarray | None = None,
+    ) -> "ExactSentenceIndex":
+        if embeddings is None:
+            embeddings = np.vstack([self.embeddings, new_rows])
+        return ExactSentenceIndex(embeddings, csls_penalty)
+
+
+def rescore_exact(
+    embeddings: np.ndarray,
+    csls_penalty: np.ndarray,
+    query: np.ndarray,
+    shortlist: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Re-scores shortlisted rows with exact CSLS and keeps the best `k`."""
+    # Gather in row order so memory-mapped banks are read sequentially
+    shortlist = np.sort(shortlist)
+    vecs = np.asarray(embeddings[shortlist], dtype=np.float32)
+    norms = np.linalg.norm(vecs, axis=1)
+    norms[norms < 1e-8] = 1.0
+    exact = 2 * (vecs @ query) / norms - csls_penalty[shortlist]
+    order = top_k_indices(exact, k)
+    return shortlist[order], exact[order]
+
+
+class PCABasis:
+    """Mean and top principal directions of a unit-normalised sentence bank."""
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray) -> None:
+        self.mean = mean.astype(np.float32)  # (dim,)
+        self.components = components.astype(np.float32)  # (dim, n_components)
+
+    @classmethod
+    def fit(
+        cls,
+        embeddings: np.ndarray,
+        n_components: int = 64,
+        sample_size: int = 100_000,
+        seed: int = 0,
+    ) -> "PCABasis":
+        unit = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        if len(unit) > sample_size:
+            rng = np.random.default_rng(seed)
+            unit = unit[np.sort(rng.choice(len(unit), sample_size, replace=False))]
+        mean = unit.mean(axis=0)
+        _, _, vt = np.linalg.svd(unit - mean, full_matrices=False)
+        n_components = min(n_components, vt.shape[0])
+        return cls(mean, vt[:n_components].T)
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        return ((vectors - self.mean) @ self.components).astype(np.float32)  # type: ignore[no-any-return]
+
+    def save(self, path: str) -> None:
+        np.savez(path, mean=self.mean, components=self.components)
+
+    @classmethod
+    def load(cls, path: str) -> "PCABasis":
+        with np.load(path) as data:
+            return cls(data["mean"], data["components"])
+
+
+class CascadeSentenceIndex:
+    """Two-stage retrieval: a PCA-reduced scan picks a shortlist, exact CSLS ranks it.
+
+    For unit vectors x and q, ``x.q = (x-mu).(q-mu) + x.mu + q.mu - mu.mu``. Stage one
+    keeps the per-row ``x.mu`` term exactly and approximates ``(x-mu).(q-mu)`` in the
+    reduced space; the per-query terms are constant and dropped from the ranking.
+    """
+
+    kind = "cascade"
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        csls_penalty: np.ndarray,
+        basis: PCABasis,
+        default_shortlist: int = 200,
+    ) -> None:
+        self.embeddings = embeddings
+        self.csls_penalty = csls_penalty
+        self.basis = basis
+        self.default_shortlist = default_shortlist
+        unit = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        self.reduced = basis.project(unit)
+        self.mean_bias = (unit @ basis.mean).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        shortlist: int | None = None,
+        ranges: RowRanges | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        size = max(k, shortlist or self.default_shortlist)
+        q_reduced = self.basis.project(query.reshape(1, -1))[0]
+
+        def score_range(start: int, end: int) -> np.ndarray:
+            coarse = self.reduced[start:end] @ q_reduced + self.mean_bias[start:end]
+            return 2 * coarse - self.csls_penalty[start:end]  # type: ignore[no-any-return]
+
+        candidates, _ = top_k_rows(*scan_ranges(score_range, len(self), ranges), size)
+        return rescore_exact(self.embeddings, self.csls_penalty, query, candidates, k)
+
+    def extended(
+        self,
+        new_rows: np.ndarray,
+        csls_penalty: np.ndarray,
+        embeddings: np.ndarray | None = None,
+    ) -> "CascadeSentenceIndex":
+        if embeddings is None:
+            embeddings = np.vstack([self.embeddings, new_rows])
+        return CascadeSentenceIndex(
+            embeddings,
+            csls_penalty,
+            self.basis,
+            self.default_shortlist,
+        )
@@ -0,0 +1,73 @@
+"""Paragraph and sentence segmentation for document translation.
+
+Sentences end at ``.``, ``!``, ``?`` or ``…`` (plus any closing quotes or brackets)
+when the next word starts a new sentence: an upper-case letter (including Kikuyu
+``Ĩ``/``Ũ``), a digit or an opening quote. A full stop after a known abbreviation,
+a single initial or a verse/list number does not end a sentence.
+"""
+
+import re
+
+# Lower-cased, without the trailing full stop
+ABBREVIATIONS = frozenset({
+    # English titles and Latin shorthands
+    "mr", "mrs", "ms", "dr", "prof", "rev", "st", "sr", "jr", "gen", "mt", "no",
+    "vol", "ch", "v", "vv", "fig", "approx", "etc", "e.g", "i.e", "cf", "vs",
+    "kg", "km", "ha", "ltd", "co", "inc",
+    # Scripture references in English and Kikuyu (e.g. "Matt. 5:3", "Math. 5:3")
+    "matt", "mat", "math", "mk", "mar", "lk", "luk", "jn", "joh", "atũm", "rom",
+    "aroma", "cor", "akor", "gal", "agal", "eph", "aef", "phil", "afil", "col",
+    "akol", "thess", "athes",
+})  # fmt: skip
+
+_OPENING = "\"'“‘«(["
+_CLOSING = "\"'”’»)]"
+
+_BOUNDARY = re.compile(
+    r"(?P<end>[.!?…]+[" + re.escape(_CLOSING) + r"]*)"
+    r"(?P<space>\s+)"
+    r"(?=[" + re.escape(_OPENING) + r"]*(?P<next>\w))"
+)
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def split_paragraphs(text: str) -> list[str]:
+    """Splits on blank lines; single newlines inside a paragraph become spaces."""
+    paragraphs = (re.sub(r"\s+", " ", p).strip() for p in _PARAGRAPH_BREAK.split(text))
+    return [p for p in paragraphs if p]
+
+
+def _is_abbreviation(text_before: str) -> bool:
+    """True when the full stop closing `text_before` belongs to an abbreviation."""
+    word = text_before.rsplit(maxsplit=1)[-1] if text_before.strip() else ""
+    word = word.lstrip(_OPENING).lower()
+    if not word:
+        return False
+    # Single initials ("J. Kenyatta") and list numbers opening a sentence ("1. Plant")
+    if len(word) == 1 and word.isalpha():
+        return True
+    if word.isdigit() and text_before.strip() == word:
+        return True
+    return word in ABBREVIATIONS
+
+
+def split_sentences(paragraph: str) -> list[str]:
+    """Splits one paragraph into sentences, keeping punctuation and quotes attached."""
+    sentences = []
+    start = 0
+    for match in _BOUNDARY.finditer(paragraph):
+        if not (match.group("next").isupper() or match.group("next").isdigit()):
+            continue
+        if match.group("end") == "." and _is_abbreviation(paragraph[start : match.start()]):
+            continue
+        sentences.append(paragraph[start : match.end("end")].strip())
+        start = match.end()
+    tail = paragraph[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def segment_document(text: str) -> list[list[str]]:
+    """Returns the document as paragraphs of sentences."""
+    return [split_sentences(p) for p in split_paragraphs(text)]
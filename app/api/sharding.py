@@ -0,0 +1,249 @@
+"""Sentence bank split across worker processes with scatter-gather top-k.
+
+Each shard is a contiguous row slice of the bank served by its own single-worker
+process pool, which holds only that slice and its CSLS penalties in memory. The
+coordinator sends the query to every shard, waits up to a per-shard deadline and
+merges the local top-k lists; shards that miss the deadline are left out so a slow
+worker degrades recall instead of stalling the request. A search abandoned at the
+deadline still runs to completion in its worker, so that shard is skipped until it
+finishes rather than queueing later queries behind it.
+"""
+
+import json
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from app.api.retrieval import ExactSentenceIndex, RowRanges, top_k_indices
+from app.shared.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Global shard state for worker processes
+_worker_shard: ExactSentenceIndex | None = None
+
+
+def _init_shard_worker(
+    source: str | np.ndarray, start: int, end: int, csls_penalty: np.ndarray
+) -> None:
+    global _worker_shard
+    if isinstance(source, str):
+        # Copy the slice out of the memory-mapped bank so the shard owns its rows
+        embeddings = np.array(np.load(source, mmap_mode="r")[start:end])
+    else:
+        embeddings = source
+    _worker_shard = ExactSentenceIndex(embeddings, csls_penalty)
+
+
+def _shard_rows() -> int:
+    return len(_worker_shard) if _worker_shard is not None else 0
+
+
+def _search_shard_worker(
+    query: np.ndarray, k: int, ranges: RowRanges | None
+) -> tuple[np.ndarray, np.ndarray]:
+    assert _worker_shard is not None
+    return _worker_shard.search(query, k, ranges=ranges)
+
+
+def shard_bounds(n_rows: int, n_shards: int) -> list[tuple[int, int]]:
+    """Splits `n_rows` into `n_shards` contiguous, near-equal ``[start, end)`` slices."""
+    n_shards = max(1, min(n_shards, n_rows))
+    edges = np.linspace(0, n_rows, n_shards + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:], strict=True)]
+
+
+def local_ranges(
+    ranges: RowRanges | None, start: int, end: int
+) -> list[tuple[int, int]] | None:
+    """Intersects global row ranges with one shard, in shard-local row numbers."""
+    if ranges is None:
+        return None
+    return [
+        (max(a, start) - start, min(b, end) - start)
+        for a, b in ranges
+        if min(b, end) > max(a, start)
+    ]
+
+
+def gather_partial(
+    futures: dict[int, Future], timeout: float | None
+) -> tuple[dict[int, object], list[int]]:
+    """Collects finished futures within `timeout` seconds.
+
+    Returns ``(results, missing)`` where `missing` lists the keys that timed out or
+    failed; unfinished futures are cancelled if they have not started.
+    """
+    done, _ = wait(futures.values(), timeout=timeout)
+    results: dict[int, object] = {}
+    missing: list[int] = []
+    for key, future in futures.items():
+        if future not in done:
+            future.cancel()
+            missing.append(key)
+            continue
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            logger.warning("Shard %d failed: %s", key, e)
+            missing.append(key)
+    return results, missing
+
+
+def write_shard_layout(path: str, bounds: list[tuple[int, int]], source: str) -> None:
+    layout = {
+        "rows": bounds[-1][1] if bounds else 0,
+        "n_shards": len(bounds),
+        "embeddings": source,
+        "shards": [
+            {"shard": i, "start": start, "end": end}
+            for i, (start, end) in enumerate(bounds)
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(layout, f, indent=2)
+
+
+def read_shard_layout(
+    path: str, n_rows: int, n_shards: int
+) -> list[tuple[int, int]] | None:
+    """Returns the recorded shard bounds if they still describe this bank, else None."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            layout = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if layout.get("rows") != n_rows or layout.get("n_shards") != n_shards:
+        return None
+    return [(int(s["start"]), int(s["end"])) for s in layout["shards"]]
+
+
+class ShardedSentenceIndex:
+    """Exact CSLS retrieval scattered over one worker process per bank shard."""
+
+    kind = "sharded"
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        csls_penalty: np.ndarray,
+        bounds: list[tuple[int, int]],
+        source_path: str | None = None,
+        timeout: float | None = 0.5,
+    ) -> None:
+        """Starts one worker per shard.
+
+        Workers memory-map `source_path` (the saved bank) and copy their own slice
+        when it is given; otherwise each slice is pickled to its worker.
+        """
+        self.embeddings = embeddings
+        self.csls_penalty = csls_penalty
+        self.bounds = bounds
+        self.timeout = timeout
+        self.shard_timeouts = [0] * len(bounds)
+        self.shard_skips = [0] * len(bounds)
+        # Per shard, the timed-out search its worker may still be running
+        self._abandoned: list[Future | None] = [None] * len(bounds)
+
+        start_time = time.perf_counter()
+        self._pools: list[ProcessPoolExecutor] = []
+        for start, end in bounds:
+            source = source_path if source_path is not None else embeddings[start:end]
+            self._pools.append(
+                ProcessPoolExecutor(
+                    max_workers=1,
+                    initializer=_init_shard_worker,
+                    initargs=(source, start, end, csls_penalty[start:end]),
+                )
+            )
+        # Load every shard now so the first query does not pay for it
+        loaded = [pool.submit(_shard_rows).result() for pool in self._pools]
+        logger.info(
+            "Started %d sentence-bank shards (%s rows) in %.2fs.",
+            len(bounds),
+            ", ".join(str(n) for n in loaded),
+            time.perf_counter() - start_time,
+        )
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        shortlist: int | None = None,
+        ranges: RowRanges | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        futures: dict[int, Future] = {}
+        busy: list[int] = []
+        for shard, (pool, (start, end)) in enumerate(
+            zip(self._pools, self.bounds, strict=True)
+        ):
+            shard_ranges = local_ranges(ranges, start, end)
+            if shard_ranges == []:
+                continue
+            abandoned = self._abandoned[shard]
+            if abandoned is not None:
+                if not abandoned.done():
+                    busy.append(shard)
+                    continue
+                self._abandoned[shard] = None
+            try:
+                futures[shard] = pool.submit(_search_shard_worker, query, k, shard_ranges)
+            except RuntimeError:
+                # Pool shut down by a concurrent compaction; the new index has the rows
+                continue
+
+        results, missing = gather_partial(futures, self.timeout)
+        for shard in missing:
+            self.shard_timeouts[shard] += 1
+            if not futures[shard].done():
+                self._abandoned[shard] = futures[shard]
+        for shard in busy:
+            self.shard_skips[shard] += 1
+        if missing or busy:
+            logger.warning(
+                "Returning partial results: shard(s) %s timed out or failed, %s busy.",
+                ", ".join(str(s) for s in missing) or "none",
+                ", ".join(str(s) for s in busy) or "none",
+            )
+
+        # Scatter done; gather in shard order so ties keep the lower row first
+        parts = [
+            (ids + self.bounds[shard][0], scores)
+            for shard, (ids, scores) in sorted(results.items())  # type: ignore[misc]
+        ]
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        ids = np.concatenate([p[0] for p in parts])
+        scores = np.concatenate([p[1] for p in parts])
+        top = top_k_indices(scores, k)
+        return ids[top], scores[top]
+
+    def extended(
+        self,
+        new_rows: np.ndarray,
+        csls_penalty: np.ndarray,
+        embeddings: np.ndarray | None = None,
+    ) -> "ShardedSentenceIndex":
+        """Re-shards the grown bank over the same number of workers.
+
+        Workers read a memory-mapped `embeddings` from its file instead of being
+        sent their slices.
+        """
+        if embeddings is None:
+            embeddings = np.vstack([self.embeddings, new_rows])
+        return ShardedSentenceIndex(
+            embeddings,
+            csls_penalty,
+            shard_bounds(len(embeddings), len(self.bounds)),
+            source_path=getattr(embeddings, "filename", None),
+            timeout=self.timeout,
+        )
+
+    def close(self) -> None:
+        """Stops the shard workers once any in-flight searches have finished."""
+        for pool in self._pools:
+            pool.shutdown(wait=False)
@@ -0,0 +1,205 @@
+"""Compact, memory-mappable storage for large string tables (sentence banks, vocab).
+
+A `StringStore` keeps every string UTF-8 encoded back to back in one uint8 buffer
+with an int64 offsets array, so a million-row bank costs its text plus 8 bytes per
+row instead of a Python `str` object per row. Items are decoded only when read.
+Both arrays are saved as `.npy` files and memory-mapped on load, so the server can
+start without re-parsing the parallel CSVs.
+"""
+
+import bisect
+import os
+from collections.abc import Iterable, Iterator, Sequence
+from typing import overload
+
+import numpy as np
+
+
+class StringStore(Sequence[str]):
+    """Read-only sequence of strings backed by a byte buffer and offsets."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray) -> None:
+        self.data = data  # uint8, all strings concatenated
+        self.offsets = offsets  # int64, len(self) + 1 absolute positions in `data`
+        self._order: np.ndarray | None = None  # ids sorted by value, built on demand
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "StringStore":
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | Sequence[str]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            # Contiguous slices are views sharing the same buffer
+            return StringStore(self.data, self.offsets[start : max(start, stop) + 1])
+        return self._bytes(index).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self._bytes(i).decode("utf-8")
+
+    def _bytes(self, index: int) -> bytes:
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("StringStore index out of range")
+        return bytes(self.data[self.offsets[index] : self.offsets[index + 1]])
+
+    def take(self, ids: Iterable[int]) -> list[str]:
+        """Decodes only the requested rows."""
+        return [self[int(i)] for i in ids]
+
+    def appended(self, strings: Sequence[str]) -> "StringStore":
+        """Returns an in-memory store with `strings` added after the current rows."""
+        extra = StringStore.from_strings(strings)
+        start, end = int(self.offsets[0]), int(self.offsets[-1])
+        data = np.concatenate([self.data[start:end], extra.data])
+        offsets = np.concatenate([
+            self.offsets - start,
+            extra.offsets[1:] + (end - start),
+        ])
+        return StringStore(data, offsets)
+
+    def index_of(self, value: str) -> int | None:
+        """Row id of `value` by binary search over a sorted id array, or None.
+
+        UTF-8 byte order matches code point order, so rows are compared as bytes.
+        """
+        if self._order is None:
+            self._order = np.array(
+                sorted(range(len(self)), key=self._bytes), dtype=np.int64
+            )
+        order = self._order
+        target = value.encode("utf-8")
+        pos = bisect.bisect_left(order, target, key=lambda i: self._bytes(int(i)))
+        if pos < len(order) and self._bytes(int(order[pos])) == target:
+            return int(order[pos])
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.offsets[-1] - self.offsets[0]) + self.offsets.nbytes
+
+    def save(self, stem: str) -> None:
+        """Writes `<stem>.data.npy` and `<stem>.offsets.npy`."""
+        start, end = int(self.offsets[0]), int(self.offsets[-1])
+        np.save(f"{stem}.data.npy", np.asarray(self.data[start:end], dtype=np.uint8))
+        np.save(f"{stem}.offsets.npy", np.asarray(self.offsets - start, dtype=np.int64))
+
+    @classmethod
+    def load(cls, stem: str, mmap: bool = True) -> "StringStore":
+        mode = "r" if mmap else None
+        return cls(
+            np.load(f"{stem}.data.npy", mmap_mode=mode),
+            np.load(f"{stem}.offsets.npy", mmap_mode=mode),
+        )
+
+    @staticmethod
+    def exists(stem: str) -> bool:
+        return os.path.exists(f"{stem}.data.npy") and os.path.exists(f"{stem}.offsets.npy")
+
+
+class StringMap:
+    """Read-only str -> str mapping over two `StringStore`s, looked up by binary search.
+
+    Unlike a dict of `str` objects, lookups never touch per-entry reference counts,
+    so the table stays in pages shared copy-on-write by forked workers.
+    """
+
+    def __init__(self, keys: StringStore, values: StringStore) -> None:
+        self.keys = keys
+        self.values = values
+        # Build the sorted order up front so it is shared too
+        keys.index_of("")
+
+    @classmethod
+    def from_items(cls, items: Iterable[tuple[str, str]]) -> "StringMap":
+        pairs = list(items)
+        return cls(
+            StringStore.from_strings(k for k, _ in pairs),
+            StringStore.from_strings(v for _, v in pairs),
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get(self, key: str, default: str) -> str:
+        row = self.keys.index_of(key)
+        return self.values[row] if row is not None else default
+
+
+class LabelArray(Sequence[str]):
+    """Per-row categorical labels (e.g. corpus domains) stored as small integer codes."""
+
+    def __init__(self, codes: np.ndarray, names: Sequence[str]) -> None:
+        self.codes = codes
+        self.names = list(names)
+
+    @classmethod
+    def from_labels(cls, labels: Iterable[str]) -> "LabelArray":
+        names: dict[str, int] = {}
+        codes = [names.setdefault(label, len(names)) for label in labels]
+        dtype = np.uint8 if len(names) <= 256 else np.int32
+        return cls(np.array(codes, dtype=dtype), list(names))
+
+    @classmethod
+    def concatenate(cls, parts: Sequence["LabelArray"]) -> "LabelArray":
+        names = list(dict.fromkeys(name for part in parts for name in part.names))
+        position = {name: i for i, name in enumerate(names)}
+        dtype = np.uint8 if len(names) <= 256 else np.int32
+        codes = [
+            np.array([position[n] for n in part.names], dtype=dtype)[part.codes]
+            if len(part.codes)
+            else np.empty(0, dtype=dtype)
+            for part in parts
+        ]
+        return cls(np.concatenate(codes) if codes else np.empty(0, dtype=dtype), names)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "LabelArray": ...
+
+    def __getitem__(self, index: int | slice) -> "str | LabelArray":
+        if isinstance(index, slice):
+            return LabelArray(self.codes[index], self.names)
+        return self.names[int(self.codes[index])]
+
+    def contiguous_ranges(self) -> dict[str, list[tuple[int, int]]]:
+        """Vectorised equivalent of `retrieval.contiguous_ranges`."""
+        if len(self.codes) == 0:
+            return {}
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(self.codes)) + 1])
+        ends = np.concatenate([starts[1:], [len(self.codes)]])
+        ranges: dict[str, list[tuple[int, int]]] = {}
+        for start, end in zip(starts.tolist(), ends.tolist(), strict=True):
+            ranges.setdefault(self.names[int(self.codes[start])], []).append((start, end))
+        return ranges
+
+    def save(self, path: str) -> None:
+        np.savez(path, codes=self.codes, names=np.array(self.names, dtype=str))
+
+    @classmethod
+    def load(cls, path: str) -> "LabelArray":
+        with np.load(path) as data:
+            return cls(data["codes"], data["names"].tolist())
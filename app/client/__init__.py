@@ -0,0 +1,5 @@
+"""Python client for the translation API; see `app.client.client`."""
+
+from app.client.client import AsyncTauraClient, TauraClient, TauraError
+
+__all__ = ["AsyncTauraClient", "TauraClient", "TauraError"]
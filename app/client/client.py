@@ -0,0 +1,337 @@
+"""Python client for the translation API.
+
+`AsyncTauraClient` coalesces individual `translate` and `candidates` calls into
+`/translate/batch` and `/translate/candidates/batch` requests. Calls with the same
+options that arrive within `batch_delay_s` of each other share one request, up to
+`max_batch` distinct texts. Requests go over one pooled `httpx.AsyncClient` with at
+most `max_concurrency` in flight. On 429 and 503 the whole session waits for the
+server's Retry-After and then retries. Results are cached for the life of the
+client. `TauraClient` offers the same calls blocking and from any number of threads
+by running an `AsyncTauraClient` on a private event loop, so concurrent threads
+share batches too.
+
+    with TauraClient("http://localhost:8000") as client:
+        client.translate("Nĩ wega mũno")
+        client.translate_many(lines, source_lang="en", target_lang="ki")
+"""
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Coroutine, Sequence, TypeVar
+
+import httpx
+
+from app.shared.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+# Per-text limit of the batch endpoints; longer texts would fail their whole batch
+MAX_TEXT_CHARS = 2000
+# Admission control answers these with Retry-After; anything else is not retried
+RETRY_STATUSES = (429, 503)
+
+Candidates = list[tuple[str, float]]
+
+
+class TauraError(Exception):
+    """The API answered with an error that retrying did not or would not fix."""
+
+    def __init__(self, status_code: int, detail: Any) -> None:
+        super().__init__(f"HTTP {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+class _Batch:
+    """Texts waiting to go out in one request, with one shared future per distinct text."""
+
+    def __init__(
+        self, path: str, options: dict[str, Any], parse: Callable[[dict], list]
+    ) -> None:
+        self.path = path
+        self.options = options
+        self.parse = parse
+        self.futures: dict[str, asyncio.Future] = {}
+        self.timer: asyncio.TimerHandle | None = None
+
+
+def _translations(body: dict) -> list[str]:
+    return body["translations"]
+
+
+def _candidates(body: dict) -> list[Candidates]:
+    return [[(c["text"], c["score"]) for c in hits] for hits in body["results"]]
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """Seconds from a delta-seconds Retry-After header (the form the server sends)."""
+    try:
+        return max(0.0, float(response.headers["retry-after"]))
+    except (KeyError, ValueError):
+        return None
+
+
+def _detail(response: httpx.Response) -> Any:
+    try:
+        return response.json().get("detail", response.text)
+    except (ValueError, AttributeError):
+        return response.text
+
+
+class AsyncTauraClient:
+    """Batching, retrying and caching client for one API server; use one per session."""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        *,
+        max_batch: int = 256,
+        batch_delay_s: float = 0.005,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        max_retry_wait_s: float = 30.0,
+        cache_size: int = 10_000,
+        timeout_s: float = 60.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.max_batch = max_batch
+        self.batch_delay_s = batch_delay_s
+        self.max_retries = max_retries
+        self.max_retry_wait_s = max_retry_wait_s
+        self.cache_size = cache_size
+        self.stats = {"calls": 0, "cache_hits": 0, "requests": 0, "retries": 0}
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout_s,
+            limits=httpx.Limits(
+                max_connections=max_concurrency, max_keepalive_connections=max_concurrency
+            ),
+            transport=transport,
+        )
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._pending: dict[tuple[str, str], _Batch] = {}
+        self._cache: OrderedDict[tuple[str, str, str], Any] = OrderedDict()
+        self._sends: set[asyncio.Task] = set()
+        # Event loop time before which no request is sent (the latest Retry-After)
+        self._resume_at = 0.0
+
+    async def __aenter__(self) -> "AsyncTauraClient":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    async def translate(
+        self,
+        text: str,
+        source_lang: str = "ki",
+        target_lang: str = "en",
+        method: str = "retrieval",
+        domains: Sequence[str] | None = None,
+    ) -> str:
+        """Translates one text as `/translate` would; blank texts translate to ""."""
+        options: dict[str, Any] = {
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "method": method,
+        }
+        if domains:
+            options["domains"] = list(domains)
+        return await self._submit("/translate/batch", options, _translations, text, "")
+
+    async def translate_many(self, texts: Sequence[str], **options: Any) -> list[str]:
+        """Translations of `texts` in order; takes the keyword options of `translate`."""
+        return list(await asyncio.gather(*(self.translate(t, **options) for t in texts)))
+
+    async def candidates(
+        self,
+        text: str,
+        source_lang: str = "ki",
+        target_lang: str = "en",
+        k: int = 5,
+        domains: Sequence[str] | None = None,
+    ) -> Candidates:
+        """Top-k (translation, score) pairs as `/translate/candidates` returns them."""
+        options: dict[str, Any] = {
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "k": k,
+        }
+        if domains:
+            options["domains"] = list(domains)
+        return await self._submit(
+            "/translate/candidates/batch", options, _candidates, text, []
+        )
+
+    async def candidates_many(
+        self, texts: Sequence[str], **options: Any
+    ) -> list[Candidates]:
+        """Candidates for `texts` in order; takes the keyword options of `candidates`."""
+        return list(await asyncio.gather(*(self.candidates(t, **options) for t in texts)))
+
+    async def aclose(self) -> None:
+        """Sends whatever is still waiting to be batched, then closes the connections."""
+        for key in list(self._pending):
+            self._flush(key)
+        await asyncio.gather(*self._sends, return_exceptions=True)
+        await self._http.aclose()
+
+    async def _submit(
+        self,
+        path: str,
+        options: dict[str, Any],
+        parse: Callable[[dict], list],
+        text: str,
+        blank: Any,
+    ) -> Any:
+        if not text.strip():
+            return blank
+        if len(text) > MAX_TEXT_CHARS:
+            raise ValueError(f"Texts are limited to {MAX_TEXT_CHARS} characters.")
+        self.stats["calls"] += 1
+        key = (path, json.dumps(options, sort_keys=True))
+        cached = self._cache.get((*key, text))
+        if cached is not None:
+            self._cache.move_to_end((*key, text))
+            self.stats["cache_hits"] += 1
+            return cached
+
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _Batch(path, options, parse)
+            batch.timer = loop.call_later(self.batch_delay_s, self._flush, key)
+        future = batch.futures.get(text)
+        if future is None:
+            future = batch.futures[text] = loop.create_future()
+            if len(batch.futures) >= self.max_batch:
+                self._flush(key)
+        # Other callers may share this future; cancelling one must not cancel theirs
+        return await asyncio.shield(future)
+
+    def _flush(self, key: tuple[str, str]) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._send(key, batch))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    async def _send(self, key: tuple[str, str], batch: _Batch) -> None:
+        texts = list(batch.futures)
+        try:
+            body = await self._post(batch.path, {**batch.options, "texts": texts})
+            results = batch.parse(body)
+        except Exception as e:
+            for future in batch.futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, result in zip(texts, results, strict=True):
+            self._remember((*key, text), result)
+            future = batch.futures[text]
+            if not future.done():
+                future.set_result(result)
+
+    async def _post(self, path: str, payload: dict[str, Any]) -> dict:
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            delay = self._resume_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            response = None
+            async with self._slots:
+                self.stats["requests"] += 1
+                try:
+                    response = await self._http.post(path, json=payload)
+                except httpx.TransportError:
+                    if attempt >= self.max_retries:
+                        raise
+            if response is not None and (
+                response.status_code not in RETRY_STATUSES or attempt >= self.max_retries
+            ):
+                break
+
+            wait = _retry_after(response) if response is not None else None
+            if wait is None:
+                wait = 0.5 * 2**attempt
+            wait = min(wait, self.max_retry_wait_s)
+            # Every request of the session holds off, not just this one
+            self._resume_at = max(self._resume_at, loop.time() + wait)
+            attempt += 1
+            self.stats["retries"] += 1
+            logger.warning(
+                "%s answered %s; retry %d in %.1fs.",
+                path,
+                response.status_code if response is not None else "a connection error",
+                attempt,
+                wait,
+            )
+
+        if response.is_error:
+            raise TauraError(response.status_code, _detail(response))
+        return response.json()
+
+    def _remember(self, key: tuple[str, str, str], result: Any) -> None:
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+class TauraClient:
+    """Blocking `AsyncTauraClient`; one instance can be shared between threads.
+
+    Takes the same arguments. Calls run on the client's own event loop thread, so
+    calls made at the same time from different threads are batched together.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:8000", **options: Any) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="taura-client", daemon=True
+        )
+        self._thread.start()
+        self.client = AsyncTauraClient(base_url, **options)
+
+    def __enter__(self) -> "TauraClient":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return self.client.stats
+
+    def translate(self, text: str, **options: Any) -> str:
+        return self._run(self.client.translate(text, **options))
+
+    def translate_many(self, texts: Sequence[str], **options: Any) -> list[str]:
+        return self._run(self.client.translate_many(texts, **options))
+
+    def candidates(self, text: str, **options: Any) -> Candidates:
+        return self._run(self.client.candidates(text, **options))
+
+    def candidates_many(self, texts: Sequence[str], **options: Any) -> list[Candidates]:
+        return self._run(self.client.candidates_many(texts, **options))
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        self._run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
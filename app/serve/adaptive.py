@@ -0,0 +1,105 @@
+"""Latency-driven choice of retrieval strategy.
+
+Each method has a ladder of strategies from most to least exact. The selector
+keeps a moving average of the compute time of every strategy and picks the most
+exact one expected to finish within the request's remaining budget, so a server
+under load degrades answers instead of missing its latency objective.
+
+Retrieval: ``full`` (the configured index at its default settings), ``shortlist``
+(approximate indexes with a smaller re-score shortlist), ``word_table``
+(precomputed word-by-word lookups). Word-by-word: ``full`` (tuned HNSW breadth),
+``reduced_ef`` (narrower HNSW search), ``word_table``.
+"""
+
+import threading
+import time
+
+LADDERS: dict[str, tuple[str, ...]] = {
+    "retrieval": ("full", "shortlist", "word_table"),
+    "word-by-word": ("full", "reduced_ef", "word_table"),
+}
+
+# Weight of the newest observation in the per-strategy moving average
+_EWMA_ALPHA = 0.2
+
+
+class StrategySelector:
+    """Picks a strategy per request from observed latencies and queue depth.
+
+    A strategy's expected cost is its average compute time scaled by
+    ``1 + queued / concurrency``: while requests wait behind this one, the time it
+    holds a slot is added to theirs, so a growing queue pushes towards cheaper
+    strategies before the budget itself runs out. Strategies never observed are
+    assumed to fit.
+
+    A strategy skipped for being too slow is only re-measured when it runs, so one
+    request per `probe_interval_s` goes to the most exact skipped strategy anyway.
+    Without that a single slow request (a cold start, a GC pause) would demote it
+    for the life of the process.
+
+    Latencies are kept per `run` as well (``""`` is the primary), so a slow variant
+    run served next to the primary only degrades its own requests.
+    """
+
+    def __init__(self, slo_ms: float, probe_interval_s: float = 5.0) -> None:
+        self.slo_s = slo_ms / 1000
+        self.probe_interval_s = probe_interval_s
+        # Keyed by (method, strategy, run)
+        self._latency_s: dict[tuple[str, str, str], float] = {}
+        self._counts: dict[tuple[str, str, str], int] = {}
+        # When each strategy last ran or was handed out as a probe
+        self._tried_at: dict[tuple[str, str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def budget(self, deadline_ms: int | None, waited_s: float) -> float:
+        """Seconds left for compute: the tighter of the SLO and deadline, less queueing."""
+        limit = self.slo_s if deadline_ms is None else min(self.slo_s, deadline_ms / 1000)
+        return limit - waited_s
+
+    def choose(
+        self,
+        method: str,
+        available: list[str],
+        budget_s: float,
+        queue_pressure: float = 0.0,
+        run: str = "",
+    ) -> str:
+        """Most exact of `available` expected to fit `budget_s`, else the cheapest.
+
+        A skipped strategy not tried for `probe_interval_s` is returned instead, once.
+        """
+        ladder = [s for s in LADDERS[method] if s in available]
+        now = time.monotonic()
+        with self._lock:
+            for strategy in ladder:
+                key = (method, strategy, run)
+                expected = self._latency_s.get(key, 0.0)
+                if expected * (1 + queue_pressure) <= budget_s:
+                    return strategy
+                if now - self._tried_at.get(key, now) >= self.probe_interval_s:
+                    self._tried_at[key] = now
+                    return strategy
+        return ladder[-1]
+
+    def observe(self, method: str, strategy: str, seconds: float, run: str = "") -> None:
+        key = (method, strategy, run)
+        with self._lock:
+            previous = self._latency_s.get(key)
+            self._latency_s[key] = (
+                seconds
+                if previous is None
+                else previous + _EWMA_ALPHA * (seconds - previous)
+            )
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._tried_at[key] = time.monotonic()
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            strategies = {}
+            for (method, strategy, run), latency in sorted(self._latency_s.items()):
+                label = f"{method}:{strategy}" + (f"@{run}" if run else "")
+                strategies[label] = {
+                    "requests": self._counts[(method, strategy, run)],
+                    "latency_ms": 1000 * latency,
+                }
+            return {"slo_ms": 1000 * self.slo_s, "strategies": strategies}
@@ -0,0 +1,69 @@
+"""Append-only log of the parallel pairs added to the live retrieval bank.
+
+Every worker serving a run shares one ``bank_additions.jsonl``. Appends hold an
+exclusive ``flock`` on ``<path>.lock`` so lines from several workers never
+interleave, and each worker remembers the byte offset it has applied up to. A
+worker picks up the pairs any worker appended, its own included, by reading past
+that offset, so all of them apply the same pairs in the same order.
+"""
+
+import json
+import os
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process servers only
+    fcntl = None  # type: ignore[assignment]
+
+
+class BankAdditionsLog:
+    """One run's additions log and how far this worker has read it.
+
+    `offset` is None until the log is first read, then the byte offset after the
+    last complete line read.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.offset: int | None = None
+
+    def append(self, pairs: list[dict[str, Any]]) -> None:
+        """Appends one line per pair under the log's lock."""
+        data = "".join(json.dumps(p, ensure_ascii=False) + "\n" for p in pairs)
+        lock = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+        finally:
+            os.close(lock)  # closing releases the lock
+
+    def has_new(self) -> bool:
+        """Whether lines were appended past `offset`; a stat, cheap enough per request."""
+        try:
+            return os.path.getsize(self.path) > (self.offset or 0)
+        except OSError:
+            return False
+
+    def read(self, start: int = 0, end: int | None = None) -> tuple[list[dict], int]:
+        """Pairs on the complete lines between byte offsets `start` and `end` (or EOF).
+
+        Returns them with the offset after the last complete line read.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                data = f.read() if end is None else f.read(max(0, end - start))
+        except FileNotFoundError:
+            return [], start
+        # A line still being written by another process is left for the next read
+        data = data[: data.rfind(b"\n") + 1]
+        pairs = [json.loads(line) for line in data.decode("utf-8").splitlines() if line]
+        return pairs, start + len(data)
+
+    def read_new(self) -> list[dict]:
+        """Pairs appended since the last `read_new`, advancing `offset` past them."""
+        pairs, self.offset = self.read(self.offset or 0)
+        return pairs
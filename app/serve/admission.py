@@ -0,0 +1,180 @@
+"""Admission control for the translation endpoints.
+
+Without it every request under a burst joins the threadpool queue and latency
+grows for all callers. Each endpoint gets a concurrency limit with a bounded wait
+queue, and each client a token bucket; requests that would exceed the queue or the
+latency budget are turned away at once with a Retry-After hint.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+# Recent queue waits kept per endpoint for the exported percentiles
+_WAIT_SAMPLES = 1024
+# Weight of the newest request in the service-time moving average
+_SERVICE_EWMA_ALPHA = 0.2
+
+
+class Rejected(Exception):
+    """Raised when a request is not admitted; maps to a 429 or 503 response."""
+
+    def __init__(self, status_code: int, retry_after: float, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.detail = detail
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`; each request takes one."""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Takes a token and returns 0, or returns the seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ClientRateLimiter:
+    """Per-client token buckets; the least recently seen clients are forgotten."""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10_000) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.limited = 0
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def check(self, client: str) -> None:
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(client)
+        wait = bucket.take(time.monotonic())
+        if wait > 0:
+            self.limited += 1
+            raise Rejected(429, wait, "Rate limit exceeded for this client.")
+
+
+class EndpointGate:
+    """Concurrency limit and bounded wait queue for one endpoint.
+
+    The expected wait of a new arrival is estimated from the queue length and a
+    moving average of recent service times; arrivals are shed with a 503 when the
+    queue is full or that estimate exceeds `latency_budget_s`.
+    """
+
+    def __init__(
+        self, name: str, concurrency: int, max_queue: int, latency_budget_s: float
+    ) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.latency_budget_s = latency_budget_s
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed = 0
+        self.service_s = 0.0
+        self._waits: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    def estimated_wait(self) -> float:
+        if self.in_flight < self.concurrency:
+            return 0.0
+        return (self.queued + 1) * self.service_s / self.concurrency
+
+    async def acquire(self) -> float:
+        """Waits for a slot and returns the seconds spent queued, or raises Rejected."""
+        wait = self.estimated_wait()
+        if self.in_flight >= self.concurrency and (
+            self.queued >= self.max_queue or wait > self.latency_budget_s
+        ):
+            self.shed += 1
+            raise Rejected(503, wait, f"Server is overloaded ({self.name}); retry later.")
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        waited = time.perf_counter() - start
+        self._waits.append(waited)
+        self.in_flight += 1
+        self.admitted += 1
+        return waited
+
+    def release(self, service_seconds: float) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+        self.service_s += _SERVICE_EWMA_ALPHA * (service_seconds - self.service_s)
+
+    def stats(self) -> dict[str, float]:
+        waits_ms = 1000 * np.array(self._waits) if self._waits else np.zeros(1)
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "service_ms": 1000 * self.service_s,
+            "queue_wait_ms_mean": float(waits_ms.mean()),
+            "queue_wait_ms_p99": float(np.percentile(waits_ms, 99)),
+        }
+
+
+def client_address(
+    peer: str, forwarded_for: str | None, trusted_proxies: frozenset[str]
+) -> str:
+    """The address a request's rate limit is keyed on.
+
+    `peer` unless it is a trusted proxy; then the right-most X-Forwarded-For entry
+    not added by a trusted proxy, since anything left of it is client-supplied.
+    """
+    if peer not in trusted_proxies or not forwarded_for:
+        return peer
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if hop not in trusted_proxies:
+            return hop
+    return hops[0] if hops else peer
+
+
+class AdmissionController:
+    """Routes requests to their endpoint gate after the client's rate limit."""
+
+    def __init__(
+        self, gates: dict[str, EndpointGate], rate_limiter: ClientRateLimiter | None
+    ) -> None:
+        self.gates = gates
+        self.rate_limiter = rate_limiter
+
+    def gate_for(self, path: str) -> EndpointGate | None:
+        return self.gates.get(path)
+
+    async def admit(self, gate: EndpointGate, client: str) -> float:
+        """Returns the queue wait once the request may run; pair with `gate.release`."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.check(client)
+        return await gate.acquire()
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "rate_limited": self.rate_limiter.limited if self.rate_limiter else 0,
+            "endpoints": {path: gate.stats() for path, gate in self.gates.items()},
+        }
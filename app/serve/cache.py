@@ -0,0 +1,240 @@
+"""Translation result caches shared by `/translate` and `/translate/candidates`."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from app.shared.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Evict at most once per this many writes; the bound is therefore approximate
+_EVICT_EVERY = 64
+
+
+def cache_key(direction: str, method: str, text: str, k: int | None, options: dict) -> str:
+    """Stable key for one request; `text` should already be in canonical form."""
+    payload = json.dumps(
+        [direction, method, text, k, options], ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteResultCache:
+    """LRU-bounded result cache in a local SQLite database shared across workers.
+
+    The database runs in WAL mode so concurrent uvicorn workers can read while one
+    writes. Entries belong to a run id; opening the cache for a different run (or
+    calling `clear`) drops everything cached for the previous bank.
+    """
+
+    def __init__(self, path: str, run_id: str, max_entries: int = 100_000) -> None:
+        self.path = path
+        self.run_id = run_id
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)"
+            )
+            row = conn.execute("SELECT value FROM meta WHERE name = 'run_id'").fetchone()
+            if row is None or row[0] != run_id:
+                conn.execute("DELETE FROM results")
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES ('run_id', ?)",
+                    (run_id,),
+                )
+                if row is not None:
+                    logger.info("Result cache invalidated: run changed to %s.", run_id)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are per thread; FastAPI runs sync handlers in a pool
+        conn = getattr(self._local, "conn", None)
+        # Connections must not cross a fork; preforked workers open their own
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Any | None:
+        conn = self._conn()
+        try:
+            row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                with conn:
+                    conn.execute(
+                        "UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key)
+                    )
+        except sqlite3.Error as e:
+            logger.warning("Result cache read failed: %s", e)
+            row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, key: str, value: Any) -> None:
+        conn = self._conn()
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % _EVICT_EVERY == 0
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, last_used) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), time.time()),
+                )
+                if evict:
+                    self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning("Result cache write failed: %s", e)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (count,) = conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def clear(self) -> None:
+        """Drops every entry, e.g. after the sentence bank changed."""
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM results")
+
+    def stats(self) -> dict[str, float]:
+        (entries,) = self._conn().execute("SELECT COUNT(*) FROM results").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+
+class _Flight:
+    """One in-progress computation that identical concurrent misses wait on."""
+
+    def __init__(self, k: int) -> None:
+        self.k = k
+        self.done = threading.Event()
+        self.value: Any = None
+        self.ok = False
+
+
+class LRUResultCache:
+    """Bounded in-process LRU cache with a TTL and single-flight misses.
+
+    Entries are keyed without `k`: ranked results are stored for the largest `k`
+    computed so far, and any request for a smaller `k` is answered from a prefix of
+    them, so a top-5 candidates call also serves the matching top-1 translation.
+    Concurrent misses for the same key wait for the first caller's computation.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 3600.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self._flights: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _take(value: Any, k: int) -> Any:
+        return value[:k] if isinstance(value, list) else value
+
+    def get_or_compute(self, key: str, k: int, compute: Callable[[], Any]) -> Any:
+        """Returns the cached value for (key, k), calling `compute` at most once."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, cached_k, value = entry
+                if expires_at < time.monotonic():
+                    del self._entries[key]
+                elif cached_k >= k:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._take(value, k)
+            flight = self._flights.get(key)
+            leader = flight is None or flight.k < k
+            if leader:
+                flight = _Flight(k)
+                self._flights[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        assert flight is not None
+
+        if not leader:
+            flight.done.wait()
+            if flight.ok:
+                return self._take(flight.value, k)
+            # The leader failed; compute independently so its error surfaces here too
+            return compute()
+
+        try:
+            flight.value = compute()
+            flight.ok = True
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if flight.ok:
+                    self._store(key, k, flight.value)
+            flight.done.set()
+        return flight.value
+
+    def _store(self, key: str, k: int, value: Any) -> None:
+        existing = self._entries.get(key)
+        if existing is not None and existing[1] > k:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, k, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
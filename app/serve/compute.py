@@ -0,0 +1,195 @@
+"""Bounded executor for embedding, scoring and HNSW work, with BLAS thread limits.
+
+Sync handlers run on Starlette's threadpool (40 threads), and every NumPy matmul
+may start its own OpenBLAS/MKL pool with a thread per core; under load the two
+multiply into far more runnable threads than cores and throughput collapses.
+Request compute is instead submitted to a fixed number of worker threads, and
+each call site runs under its own BLAS thread limit (`serving.blas_threads`).
+
+OpenBLAS and MKL thread counts are process-wide, so while call sites with
+different limits overlap the largest of them applies. With equal limits (the
+default) the setting is applied once and never changes afterwards.
+"""
+
+import asyncio
+import ctypes
+import os
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from app.shared.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# (get, set) symbol pairs per BLAS; NumPy wheels ship OpenBLAS as scipy_openblas64_
+_SYMBOLS: dict[str, list[tuple[str, str]]] = {
+    "openblas": [
+        (f"{prefix}_get_num_threads{suffix}", f"{prefix}_set_num_threads{suffix}")
+        for prefix in ("openblas", "scipy_openblas")
+        for suffix in ("", "64_")
+    ],
+    "mkl": [("MKL_Get_Max_Threads", "MKL_Set_Num_Threads")],
+}
+
+
+class BlasLibrary:
+    """A loaded BLAS whose thread count is read and set through ctypes."""
+
+    def __init__(
+        self, path: str, api: str, get: Callable[[], int], set_: Callable[[int], None]
+    ) -> None:
+        self.path = path
+        self.api = api
+        self._get = get
+        self._set = set_
+
+    @property
+    def threads(self) -> int:
+        return int(self._get())
+
+    def set_threads(self, threads: int) -> None:
+        self._set(threads)
+
+
+def _loaded_library_paths() -> list[str]:
+    """Shared objects mapped into this process (Linux only; [] elsewhere)."""
+    try:
+        with open("/proc/self/maps", encoding="utf-8") as f:
+            return sorted({line.split()[-1] for line in f if line.rstrip().endswith(".so")})
+    except OSError:
+        return []
+
+
+def find_blas_libraries() -> list[BlasLibrary]:
+    """OpenBLAS and MKL libraries loaded in this process whose threads can be set.
+
+    Only libraries already loaded are found, so call this after importing NumPy.
+    """
+    libraries = []
+    for path in _loaded_library_paths():
+        name = os.path.basename(path).lower()
+        api = "openblas" if "openblas" in name else "mkl" if "mkl_rt" in name else None
+        if api is None:
+            continue
+        try:
+            lib = ctypes.CDLL(path)
+        except OSError:
+            continue
+        for get_name, set_name in _SYMBOLS[api]:
+            if hasattr(lib, get_name) and hasattr(lib, set_name):
+                libraries.append(
+                    BlasLibrary(path, api, getattr(lib, get_name), getattr(lib, set_name))
+                )
+                break
+    if not libraries:
+        logger.info(
+            "No BLAS with a settable thread count found; set OPENBLAS_NUM_THREADS "
+            "or MKL_NUM_THREADS to limit BLAS threads."
+        )
+    return libraries
+
+
+class BlasThreadLimiter:
+    """Applies the largest BLAS thread limit among the call sites currently running.
+
+    When none is running the count drops back to `idle_threads`, but only
+    changes when the effective limit does, so equal limits cost nothing per call.
+    """
+
+    def __init__(self, libraries: list[BlasLibrary], idle_threads: int) -> None:
+        self.libraries = libraries
+        self.idle_threads = idle_threads
+        self._active: Counter[int] = Counter()
+        self._applied: int | None = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def limit(self, threads: int) -> Iterator[None]:
+        with self._lock:
+            self._active[threads] += 1
+            self._apply()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active[threads] -= 1
+                if not self._active[threads]:
+                    del self._active[threads]
+                self._apply()
+
+    def _apply(self) -> None:
+        target = max(self._active) if self._active else self.idle_threads
+        if target != self._applied:
+            for library in self.libraries:
+                library.set_threads(target)
+            self._applied = target
+
+
+class ComputeExecutor:
+    """Runs request compute on `workers` threads, each call site under its BLAS limit.
+
+    `blas_threads` maps call sites (``query``, ``batch``) to the BLAS threads their
+    tasks may use.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        blas_threads: dict[str, int],
+        libraries: list[BlasLibrary] | None = None,
+    ) -> None:
+        self.workers = workers
+        self.blas_threads = blas_threads
+        self.libraries = find_blas_libraries() if libraries is None else libraries
+        self._limiter = BlasThreadLimiter(self.libraries, min(blas_threads.values()))
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compute")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed: Counter[str] = Counter()
+
+    def submit(self, site: str, fn: Callable[..., Any], *args: Any) -> Future:
+        threads = self.blas_threads[site]
+        with self._lock:
+            self.queued += 1
+        return self._pool.submit(self._call, site, threads, fn, args)
+
+    def run(self, site: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Runs `fn(*args)` on the executor and waits for it (from sync handlers)."""
+        return self.submit(site, fn, *args).result()
+
+    async def arun(self, site: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Awaits `fn(*args)` on the executor (from async handlers)."""
+        return await asyncio.wrap_future(self.submit(site, fn, *args))
+
+    def _call(self, site: str, threads: int, fn: Callable[..., Any], args: tuple) -> Any:
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            with self._limiter.limit(threads):
+                return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed[site] += 1
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": dict(self.completed),
+                "blas_threads": self.blas_threads,
+                "blas_libraries": [
+                    {"library": os.path.basename(lib.path), "threads": lib.threads}
+                    for lib in self.libraries
+                ],
+            }
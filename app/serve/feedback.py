@@ -0,0 +1,444 @@
+"""Background writer and aggregate store for `/feedback` entries.
+
+Requests only queue their entry; one thread per process appends queued entries
+in batches. Each batch is a single ``write`` to a file opened with ``O_APPEND``
+while holding an exclusive ``flock`` on ``<path>.lock``, so lines from several
+workers never interleave and only one of them rotates the file at a time.
+``fsync`` runs at most once per `fsync_interval_s` (after every batch when 0).
+
+The file is rotated to ``<path>.<timestamp>`` when it grows past `max_bytes`, or
+on the first write of a new `rotate_s` period (files last written in an earlier
+period are rolled before appending). A process that finds the file replaced
+under it reopens the new one.
+
+After each batch the writer also adds the entries to a `FeedbackStore`, a SQLite
+database keeping per-(direction, method, source) rating counts up to date, so
+statistics never need a scan of the JSONL log.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Iterator
+
+from app.api.preprocessing import normalize_text
+from app.shared.logger import setup_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process servers only
+    fcntl = None  # type: ignore[assignment]
+
+logger = setup_logger(__name__)
+
+
+class FeedbackWriter:
+    """Queues feedback entries and appends them to a JSONL file from a thread."""
+
+    def __init__(
+        self,
+        path: str,
+        fsync_interval_s: float = 1.0,
+        max_bytes: int = 64 * 1024 * 1024,
+        rotate_s: float = 24 * 3600,
+        max_pending: int = 10_000,
+        store: "FeedbackStore | None" = None,
+    ) -> None:
+        self.path = path
+        self.store = store
+        self.fsync_interval_s = fsync_interval_s
+        self.max_bytes = max_bytes
+        self.rotate_s = rotate_s
+        self.max_pending = max_pending
+        self.written = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.rotations = 0
+        self.rejected = 0
+        self._pending: deque[dict[str, Any]] = deque()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._fd: int | None = None
+        self._lock_file: int | None = None
+        self._unsynced = False
+        self._last_fsync = time.monotonic()
+
+    def put(self, entry: dict[str, Any]) -> bool:
+        """Queues one entry; False when the queue is full and it was not accepted."""
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                self.rejected += 1
+                return False
+            self._pending.append(entry)
+            if self._thread is None:
+                # Started on first use, so a preforking parent never owns the thread
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=self._run, name="feedback-writer", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Writes everything queued, fsyncs and stops the thread (restarts on next put)."""
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify()
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning("Feedback writer did not drain within %.0fs.", timeout)
+                return
+        with self._cond:
+            if self._thread is thread:
+                self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._pending and not self._stopping:
+                    # Wake for a due fsync even when no new entries arrive
+                    self._cond.wait(self.fsync_interval_s if self._unsynced else None)
+                batch = list(self._pending)
+                self._pending.clear()
+                stopping = self._stopping
+            try:
+                if batch:
+                    lines = [json.dumps(e, ensure_ascii=False) + "\n" for e in batch]
+                    self._write("".join(lines).encode("utf-8"))
+                    self.written += len(batch)
+                    self.batches += 1
+                    if self.store is not None:
+                        self.store.add(batch)
+                if self._unsynced and (
+                    stopping or time.monotonic() - self._last_fsync >= self.fsync_interval_s
+                ):
+                    self._fsync()
+            except (OSError, sqlite3.Error):
+                logger.exception("Failed to write %d feedback entries.", len(batch))
+            if stopping:
+                with self._cond:
+                    if not self._pending:
+                        self._close_file()
+                        if self._lock_file is not None:
+                            os.close(self._lock_file)
+                            self._lock_file = None
+                        return
+
+    def _write(self, data: bytes) -> None:
+        lock_fd = self._lock_fd()
+        _lock(lock_fd)
+        try:
+            fd = self._open()
+            if self._replaced(fd):
+                # Another process rotated the file; append to the new one instead
+                self._close_file()
+                fd = self._open()
+            if self._due_for_rotation(fd, len(data)):
+                self._rotate()
+                fd = self._open()
+            os.write(fd, data)
+            self._unsynced = True
+        finally:
+            _unlock(lock_fd)
+
+    def _lock_fd(self) -> int:
+        # A separate lock file: its inode survives rotations of the log itself
+        if self._lock_file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._lock_file = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        return self._lock_file
+
+    def _open(self) -> int:
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _replaced(self, fd: int) -> bool:
+        try:
+            return os.stat(self.path).st_ino != os.fstat(fd).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _due_for_rotation(self, fd: int, incoming: int) -> bool:
+        stat = os.fstat(fd)
+        if stat.st_size == 0:
+            return False
+        if self.max_bytes > 0 and stat.st_size + incoming > self.max_bytes:
+            return True
+        return self.rotate_s > 0 and (
+            stat.st_mtime // self.rotate_s < time.time() // self.rotate_s
+        )
+
+    def _rotate(self) -> None:
+        """Renames the current file aside (lock held); the next open starts a new one."""
+        self._close_file()
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        target = f"{self.path}.{stamp}"
+        n = 1
+        while os.path.exists(target):
+            target = f"{self.path}.{stamp}-{n}"
+            n += 1
+        os.rename(self.path, target)
+        self.rotations += 1
+        logger.info("Rotated feedback log to %s.", target)
+
+    def _fsync(self) -> None:
+        if self._fd is not None:
+            os.fsync(self._fd)
+            self.fsyncs += 1
+        self._unsynced = False
+        self._last_fsync = time.monotonic()
+
+    def _close_file(self) -> None:
+        if self._fd is not None:
+            if self._unsynced:
+                self._fsync()
+            os.close(self._fd)
+            self._fd = None
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "written": self.written,
+            "batches": self.batches,
+            "fsyncs": self.fsyncs,
+            "rotations": self.rotations,
+            "rejected": self.rejected,
+        }
+
+
+def source_hash(text: str) -> str:
+    """Groups feedback on the same query: hash of the text in `normalize_text` form."""
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def entry_id(entry: dict[str, Any]) -> str:
+    """The entry's own id, or (for entries logged before ids) a hash of its content."""
+    if entry.get("id"):
+        return str(entry["id"])
+    payload = json.dumps(entry, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class FeedbackStore:
+    """Indexed SQLite copy of the feedback log with incrementally updated counts.
+
+    Every entry is stored once by its id, so re-ingesting a log is harmless. The
+    `queries` table keeps helpful/unhelpful counts per (direction, method, source
+    hash) and `totals` per (direction, method); both are updated in the same
+    transaction as the insert and only for entries not seen before. WAL mode lets
+    workers add while others read.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # Per thread, and never carried across a fork
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _create_schema(conn)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def add(self, entries: list[dict[str, Any]]) -> int:
+        """Adds entries not stored yet and updates their counts; returns how many."""
+        added = 0
+        with self._conn() as conn:
+            for entry in entries:
+                direction = f"{entry['source_lang']}_{entry['target_lang']}"
+                rating = int(entry["rating"])
+                helpful, unhelpful = int(rating > 0), int(rating < 0)
+                created_at = entry.get("created_at")
+                key = source_hash(entry["source_text"])
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO feedback VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        entry_id(entry),
+                        created_at,
+                        direction,
+                        entry["method"],
+                        key,
+                        entry["source_text"],
+                        entry["target_text"],
+                        rating,
+                        entry.get("comment"),
+                    ),
+                ).rowcount
+                if not inserted:
+                    continue
+                added += 1
+                conn.execute(
+                    "INSERT INTO queries VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (direction, method, source_hash) DO UPDATE SET "
+                    "helpful = helpful + excluded.helpful, "
+                    "unhelpful = unhelpful + excluded.unhelpful, "
+                    "last_rated_at = MAX(COALESCE(last_rated_at, 0), "
+                    "COALESCE(excluded.last_rated_at, 0))",
+                    (
+                        direction,
+                        entry["method"],
+                        key,
+                        entry["source_text"],
+                        helpful,
+                        unhelpful,
+                        created_at,
+                    ),
+                )
+                conn.execute(
+                    "INSERT INTO totals VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (direction, method) DO UPDATE SET "
+                    "helpful = helpful + excluded.helpful, "
+                    "unhelpful = unhelpful + excluded.unhelpful",
+                    (direction, entry["method"], helpful, unhelpful),
+                )
+        return added
+
+    def ingest_jsonl(self, path: str) -> int:
+        """Adds the entries of a feedback log (e.g. one written before the store)."""
+        added = 0
+        with open(path, "r", encoding="utf-8") as f:
+            batch = []
+            for line in f:
+                if line.strip():
+                    batch.append(json.loads(line))
+                if len(batch) >= 1000:
+                    added += self.add(batch)
+                    batch = []
+            added += self.add(batch)
+        return added
+
+    def stats(
+        self,
+        direction: str | None = None,
+        method: str | None = None,
+        limit: int = 20,
+    ) -> dict[str, Any]:
+        """Totals per (direction, method) and the queries most often rated unhelpful."""
+        scope, params = [], []
+        for column, value in (("direction", direction), ("method", method)):
+            if value is not None:
+                scope.append(f"{column} = ?")
+                params.append(value)
+        conn = self._conn()
+        totals = conn.execute(
+            f"SELECT direction, method, helpful, unhelpful FROM totals{_where(scope)} "
+            "ORDER BY direction, method",
+            params,
+        ).fetchall()
+        # Read in index order when unscoped or scoped by both direction and method
+        worst = conn.execute(
+            "SELECT direction, method, source_hash, source_text, helpful, unhelpful, "
+            f"last_rated_at FROM queries{_where([*scope, 'unhelpful > 0'])} "
+            "ORDER BY unhelpful DESC, helpful LIMIT ?",
+            [*params, limit],
+        ).fetchall()
+        return {
+            "totals": [
+                {"direction": d, "method": m, "helpful": h, "unhelpful": u}
+                for d, m, h, u in totals
+            ],
+            "most_unhelpful": [
+                {
+                    "direction": d,
+                    "method": m,
+                    "source_hash": key,
+                    "source_text": text,
+                    "helpful": h,
+                    "unhelpful": u,
+                    "last_rated_at": last,
+                }
+                for d, m, key, text, h, u, last in worst
+            ],
+        }
+
+    def positive_pairs(self, min_net: int = 1) -> Iterator[tuple[str, str, str]]:
+        """(direction, source, target) pairs whose ratings sum to at least `min_net`."""
+        rows = self._conn().execute(
+            "SELECT direction, MIN(source_text), target_text FROM feedback "
+            "GROUP BY direction, source_hash, target_text "
+            "HAVING SUM(rating) >= ? ORDER BY MIN(created_at)",
+            (min_net,),
+        )
+        yield from rows
+
+    def export_positive_pairs(self, path: str, min_net: int = 1) -> int:
+        """Writes positively rated pairs as a `data/parallel` CSV (Kikuyu, English)."""
+        count = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Kikuyu", "English"])
+            for direction, source, target in self.positive_pairs(min_net):
+                ki, en = (source, target) if direction == "ki_en" else (target, source)
+                writer.writerow([ki.strip(), en.strip()])
+                count += 1
+        return count
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    """Creates the tables and indexes if missing (idempotent, run per connection)."""
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS feedback ("
+            "id TEXT PRIMARY KEY, created_at REAL, direction TEXT NOT NULL, "
+            "method TEXT NOT NULL, source_hash TEXT NOT NULL, "
+            "source_text TEXT NOT NULL, target_text TEXT NOT NULL, "
+            "rating INTEGER NOT NULL, comment TEXT)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS feedback_pairs "
+            "ON feedback (direction, source_hash, target_text)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS queries ("
+            "direction TEXT NOT NULL, method TEXT NOT NULL, "
+            "source_hash TEXT NOT NULL, source_text TEXT NOT NULL, "
+            "helpful INTEGER NOT NULL, unhelpful INTEGER NOT NULL, "
+            "last_rated_at REAL, PRIMARY KEY (direction, method, source_hash))"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS queries_unhelpful "
+            "ON queries (unhelpful DESC, helpful)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS queries_scope_unhelpful "
+            "ON queries (direction, method, unhelpful DESC, helpful)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS totals ("
+            "direction TEXT NOT NULL, method TEXT NOT NULL, "
+            "helpful INTEGER NOT NULL, unhelpful INTEGER NOT NULL, "
+            "PRIMARY KEY (direction, method))"
+        )
+
+
+def _where(conditions: list[str]) -> str:
+    return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+
+def _lock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
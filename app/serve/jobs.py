@@ -0,0 +1,309 @@
+"""Background bulk-translation jobs for CSV/TSV uploads.
+
+Each job is a directory under `paths.jobs_dir` holding the uploaded file, the
+output written so far and ``job.json`` with its state. A worker reads the input
+one row at a time, translates the chosen column in batches and appends rows (the
+input columns plus ``translation``) to the output. After every batch the output
+is fsynced and the input/output byte offsets are saved, so a restarted server
+resumes a job exactly where it stopped.
+
+A running job holds an ``flock`` on its directory, so preforked workers that all
+scan the jobs directory at startup never run the same job twice. Job state is
+read from disk on every poll and is therefore the same from any worker.
+"""
+
+import csv
+import io
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Callable
+
+from app.shared.logger import setup_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process servers only
+    fcntl = None  # type: ignore[assignment]
+
+logger = setup_logger(__name__)
+
+JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+DELIMITERS = {"csv": ",", "tsv": "\t"}
+
+# (direction, method, texts) -> translations, one per text
+TranslateBatch = Callable[[str, str, list[str]], list[str]]
+
+
+class _Lines:
+    """Binary lines decoded for `csv.reader`, tracking the byte offset consumed.
+
+    `csv.reader` only pulls the lines of the record it is parsing, so after it
+    yields a row `offset` is the position just past that row.
+    """
+
+    def __init__(self, f: BinaryIO) -> None:
+        self._f = f
+        self.offset = f.tell()
+
+    def __iter__(self) -> "_Lines":
+        return self
+
+    def __next__(self) -> str:
+        line = self._f.readline()
+        if not line:
+            raise StopIteration
+        if self.offset == 0:
+            line = line.removeprefix(b"\xef\xbb\xbf")  # Excel's UTF-8 BOM
+        self.offset = self._f.tell()
+        return line.decode("utf-8")
+
+
+class BulkJobs:
+    """Runs uploaded translation jobs on `workers` threads, persisting their progress."""
+
+    def __init__(
+        self,
+        root: str,
+        translate: TranslateBatch,
+        workers: int = 1,
+        batch_size: int = 64,
+    ) -> None:
+        self.root = root
+        self.translate = translate
+        self.workers = workers
+        self.batch_size = batch_size
+        self._queue: queue.Queue[str] = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+
+    # ── Submission and state ────────────────────────────────────────────────
+
+    def new_job(self) -> tuple[str, str]:
+        """Creates an empty job directory; returns (job id, path for the upload)."""
+        job_id = uuid.uuid4().hex
+        os.makedirs(self._dir(job_id))
+        return job_id, os.path.join(self._dir(job_id), "input")
+
+    def submit(
+        self, job_id: str, column: str, direction: str, method: str, file_format: str
+    ) -> dict[str, Any]:
+        """Validates the uploaded file's header and queues the job.
+
+        Raises ValueError (and discards the upload) when the column is missing.
+        """
+        delimiter = DELIMITERS[file_format]
+        path = os.path.join(self._dir(job_id), "input")
+        try:
+            with open(path, "r", encoding="utf-8-sig", newline="") as f:
+                header = next(csv.reader(f, delimiter=delimiter), [])
+        except UnicodeDecodeError:
+            self.discard(job_id)
+            raise ValueError("The upload is not UTF-8 text.")
+        if column not in header:
+            self.discard(job_id)
+            raise ValueError(f"Column {column!r} not found; the header has {header}.")
+        now = time.time()
+        state = {
+            "id": job_id,
+            "status": "queued",
+            "column": column,
+            "direction": direction,
+            "method": method,
+            "format": file_format,
+            "rows_done": 0,
+            "input_bytes": os.path.getsize(path),
+            "input_offset": 0,
+            "output_offset": 0,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        self._save(state)
+        self._queue.put(job_id)
+        return state | {"progress": 0.0}
+
+    def discard(self, job_id: str) -> None:
+        shutil.rmtree(self._dir(job_id), ignore_errors=True)
+
+    def status(self, job_id: str) -> dict[str, Any] | None:
+        """The job's saved state plus a 0-1 `progress`, or None for unknown ids."""
+        if not JOB_ID.match(job_id):
+            return None
+        try:
+            with open(self._state_path(job_id), "r", encoding="utf-8") as f:
+                state: dict[str, Any] = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        size = state["input_bytes"]
+        done = state["status"] == "completed" or not size
+        state["progress"] = 1.0 if done else round(state["input_offset"] / size, 4)
+        return state
+
+    def output_path(self, job_id: str) -> str:
+        return os.path.join(self._dir(job_id), "output")
+
+    def _dir(self, job_id: str) -> str:
+        return os.path.join(self.root, job_id)
+
+    def _state_path(self, job_id: str) -> str:
+        return os.path.join(self._dir(job_id), "job.json")
+
+    def _save(self, state: dict[str, Any]) -> None:
+        state["updated_at"] = time.time()
+        path = self._state_path(state["id"])
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    # ── Workers ─────────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Starts the workers and queues unfinished jobs left by a previous run."""
+        self._stopping.clear()
+        if os.path.isdir(self.root):
+            pending = [
+                s
+                for s in (self.status(name) for name in os.listdir(self.root))
+                if s is not None and s["status"] in ("queued", "running")
+            ]
+            for state in sorted(pending, key=lambda s: s["created_at"]):
+                self._queue.put(state["id"])
+            if pending:
+                logger.info("Resuming %d unfinished translation jobs.", len(pending))
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Stops after the current batch; unfinished jobs resume on the next start."""
+        self._stopping.set()
+        for _ in self._threads:
+            self._queue.put("")
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            job_id = self._queue.get()
+            if job_id:
+                self._run(job_id)
+
+    def _run(self, job_id: str) -> None:
+        try:
+            lock = open(os.path.join(self._dir(job_id), "lock"), "w")
+        except FileNotFoundError:
+            return  # Discarded while queued
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return  # Another worker process is running it
+            state = self.status(job_id)
+            if state is None or state["status"] not in ("queued", "running"):
+                return
+            state["status"] = "running"
+            self._save(state)
+            try:
+                finished = self._translate_rows(state)
+            except Exception as e:
+                logger.exception("Translation job %s failed.", job_id)
+                state["status"] = "failed"
+                state["error"] = str(e)
+            else:
+                state["status"] = "completed" if finished else "queued"
+            self._save(state)
+            logger.info(
+                "Translation job %s %s after %d rows.",
+                job_id,
+                state["status"],
+                state["rows_done"],
+            )
+        finally:
+            lock.close()
+
+    def _translate_rows(self, state: dict[str, Any]) -> bool:
+        """Translates from the saved offsets on; False if stopped before the end."""
+        delimiter = DELIMITERS[state["format"]]
+        job_dir = self._dir(state["id"])
+        with (
+            open(os.path.join(job_dir, "input"), "rb") as fin,
+            open(self.output_path(state["id"]), "ab") as fout,
+        ):
+            # Drop anything written after the last saved batch
+            fout.truncate(state["output_offset"])
+            fin.seek(state["input_offset"])
+            lines = _Lines(fin)
+            reader = csv.reader(lines, delimiter=delimiter)
+            if state["input_offset"] == 0:
+                header = next(reader)
+                state["column_index"] = header.index(state["column"])
+                self._append(fout, [[*header, "translation"]], delimiter)
+                self._commit(state, lines.offset, fout, 0)
+
+            batch: list[list[str]] = []
+            for row in reader:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._flush(state, batch, lines.offset, fout, delimiter)
+                    batch = []
+                    if self._stopping.is_set():
+                        return False
+            if batch:
+                self._flush(state, batch, lines.offset, fout, delimiter)
+        return True
+
+    def _flush(
+        self,
+        state: dict[str, Any],
+        rows: list[list[str]],
+        input_offset: int,
+        fout: BinaryIO,
+        delimiter: str,
+    ) -> None:
+        col = state["column_index"]
+        texts = [row[col].strip() if col < len(row) else "" for row in rows]
+        wanted = [i for i, text in enumerate(texts) if text]
+        translations = [""] * len(rows)
+        if wanted:
+            done = self.translate(
+                state["direction"], state["method"], [texts[i] for i in wanted]
+            )
+            for i, translation in zip(wanted, done, strict=True):
+                translations[i] = translation
+        self._append(
+            fout,
+            [[*row, t] for row, t in zip(rows, translations, strict=True)],
+            delimiter,
+        )
+        self._commit(state, input_offset, fout, len(rows))
+
+    def _append(self, fout: BinaryIO, rows: list[list[str]], delimiter: str) -> None:
+        buffer = io.StringIO()
+        csv.writer(buffer, delimiter=delimiter, lineterminator="\n").writerows(rows)
+        fout.write(buffer.getvalue().encode("utf-8"))
+
+    def _commit(
+        self, state: dict[str, Any], input_offset: int, fout: BinaryIO, rows: int
+    ) -> None:
+        """Makes the rows written so far durable, then records the offsets past them."""
+        fout.flush()
+        os.fsync(fout.fileno())
+        state["input_offset"] = input_offset
+        state["output_offset"] = fout.tell()
+        state["rows_done"] += rows
+        self._save(state)
+
+    def stats(self) -> dict[str, int]:
+        return {"workers": len(self._threads), "queued": self._queue.qsize()}
@@ -0,0 +1,420 @@
+"""Loading a trained run's translators, and the batch translation shared by callers.
+
+Nothing here builds the HTTP app: the server (`app.serve.main`) and offline bulk
+translation (`app.serve.offline`) both import it, so offline use gets the same
+sentence index, tuned HNSW settings and replayed bank additions as `/translate`
+without starting the server's admission state, feedback writer or job queue.
+"""
+
+import json
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Sequence
+
+import fasttext
+import numpy as np
+
+from app.api.bank import DEFAULT_DOMAIN, load_parallel_bank
+from app.api.embeddings import CrossLingualTranslator
+from app.api.pq import PQSentenceIndex
+from app.api.retrieval import CascadeSentenceIndex, PCABasis
+from app.api.sharding import (
+    ShardedSentenceIndex,
+    read_shard_layout,
+    shard_bounds,
+    write_shard_layout,
+)
+from app.api.strings import LabelArray, StringStore
+from app.serve.additions import BankAdditionsLog
+from app.serve.startup import StartupReport
+from app.serve.variants import SharedArtifacts
+from app.shared import config
+from app.shared.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def _run_path(path: str, run_dir: str | None) -> str:
+    """`path`, a file of the latest run, in `run_dir` instead (None keeps the latest)."""
+    return path if run_dir is None else os.path.join(run_dir, os.path.basename(path))
+
+
+def _bank_files(run_dir: str | None = None) -> list[str]:
+    """String stores and domain labels of a run's sentence bank."""
+    stems = [
+        _run_path(config.BANK_STRINGS_KI_PATH, run_dir),
+        _run_path(config.BANK_STRINGS_EN_PATH, run_dir),
+    ]
+    return [f"{stem}.{part}.npy" for stem in stems for part in ("data", "offsets")] + [
+        _run_path(config.BANK_DOMAINS_PATH, run_dir)
+    ]
+
+
+def _load_parallel_sentences(
+    run_dir: str | None = None,
+) -> tuple[Sequence[str], Sequence[str], Sequence[str]]:
+    """Returns (ki_sentences, en_sentences, domains) for the sentence banks.
+
+    Uses the memory-mapped string stores written at training time when present, and
+    falls back to re-reading every parallel CSV otherwise.
+    """
+    stems = [
+        _run_path(config.BANK_STRINGS_KI_PATH, run_dir),
+        _run_path(config.BANK_STRINGS_EN_PATH, run_dir),
+    ]
+    domains_path = _run_path(config.BANK_DOMAINS_PATH, run_dir)
+    if all(StringStore.exists(s) for s in stems) and os.path.exists(domains_path):
+        ki, en = (StringStore.load(s) for s in stems)
+        domains = LabelArray.load(domains_path)
+        if len(ki) == len(en) == len(domains):
+            return ki, en, domains
+        logger.warning("Bank string stores disagree in length; re-reading CSVs.")
+    ki, en, domains = load_parallel_bank(config.PARALLEL_DATA_DIR, config.DATA_SOURCES)
+    # Compact like the saved stores: no per-row objects for forked workers to dirty
+    return (
+        StringStore.from_strings(ki),
+        StringStore.from_strings(en),
+        LabelArray.from_labels(domains),
+    )
+
+
+def _load_pq_index(path: str, rerank_vectors: np.ndarray | None) -> PQSentenceIndex | None:
+    """Loads a PQ index built by `scripts.build_pq_index`, or None to fall back to exact."""
+    if not os.path.exists(path):
+        logger.warning(
+            "PQ index %s not found; serving the exact sentence bank. "
+            "Run `uv run python -m scripts.build_pq_index` to build it.",
+            path,
+        )
+        return None
+    return PQSentenceIndex.load(
+        path, rerank_vectors=rerank_vectors, rerank_factor=config.PQ_RERANK_FACTOR
+    )
+
+
+def _attach_cascade_index(translator: CrossLingualTranslator, pca_path: str) -> None:
+    """Switches a translator to the PCA coarse-to-exact cascade when its basis exists."""
+    if translator.sentence_index is None:
+        return
+    if not os.path.exists(pca_path):
+        logger.warning(
+            "PCA basis %s not found; serving the exact sentence bank. "
+            "Re-run `uv run python -m scripts.train_embeddings` to fit it.",
+            pca_path,
+        )
+        return
+    translator.use_sentence_index(
+        CascadeSentenceIndex(
+            translator.tgt_embeddings,
+            translator.tgt_csls_penalty,
+            PCABasis.load(pca_path),
+            default_shortlist=config.CASCADE_SHORTLIST,
+        )
+    )
+
+
+def _attach_sharded_index(
+    translator: CrossLingualTranslator, embs_path: str, layout_path: str
+) -> None:
+    """Moves a translator's bank scan into one worker process per shard."""
+    if translator.sentence_index is None:
+        return
+    n_rows = len(translator.tgt_embeddings)
+    bounds = read_shard_layout(layout_path, n_rows, min(config.SHARDS, n_rows))
+    if bounds is None:
+        bounds = shard_bounds(n_rows, config.SHARDS)
+        write_shard_layout(layout_path, bounds, os.path.basename(embs_path))
+    # Workers read their slice from the saved bank when it matches the served rows
+    source = embs_path if os.path.exists(embs_path) else None
+    if source is not None and len(np.load(source, mmap_mode="r")) < n_rows:
+        source = None
+    translator.use_sentence_index(
+        ShardedSentenceIndex(
+            translator.tgt_embeddings,
+            translator.tgt_csls_penalty,
+            bounds,
+            source_path=source,
+            timeout=config.SHARD_TIMEOUT_MS / 1000,
+        )
+    )
+
+
+def _hnsw_params(direction: str, run_dir: str | None = None) -> dict[str, int]:
+    """HNSW settings chosen by `scripts.tune_hnsw` for a direction, or {} for defaults."""
+    path = _run_path(config.HNSW_CONFIG_PATH, run_dir)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            selected = json.load(f)[direction]["selected"]
+    except (json.JSONDecodeError, OSError, KeyError) as e:
+        logger.warning("Ignoring %s: %s", path, e)
+        return {}
+    logger.info("Using tuned HNSW settings for %s: %s", direction, selected)
+    return {k: int(selected[k]) for k in ("M", "ef_construction", "ef", "shortlist")}
+
+
+def apply_bank_pairs(
+    translators: dict[str, CrossLingualTranslator], pairs: list[dict[str, str]]
+) -> None:
+    """Appends parallel pairs to each loaded direction's bank as new delta segments."""
+    domains = [p.get("domain", DEFAULT_DOMAIN) for p in pairs]
+    # A direction's bank holds its target language
+    for direction, column in (("ki_en", "english"), ("en_ki", "kikuyu")):
+        if direction in translators:
+            translators[direction].add_sentences([p[column] for p in pairs], domains)
+
+
+_bank_logs: dict[str, BankAdditionsLog] = {}
+
+
+def bank_log() -> BankAdditionsLog:
+    path = config.BANK_ADDITIONS_PATH
+    return _bank_logs.setdefault(path, BankAdditionsLog(path))
+
+
+def _replay_bank_additions(translators: dict[str, CrossLingualTranslator]) -> None:
+    """Re-applies pairs added through the admin endpoint since the run was trained.
+
+    Every loaded run (A/B and shadow variants included) serves the additions logged
+    for the latest run. The first load reads the whole log; a run or direction
+    loaded later replays only up to what the others have applied, so
+    `_sync_bank_additions` brings them all forward together. Pairs stay as delta
+    segments; merging them is left to the background compaction.
+    """
+    log = bank_log()
+    pairs = log.read_new() if log.offset is None else log.read(0, log.offset)[0]
+    if not pairs:
+        return
+    apply_bank_pairs(translators, pairs)
+    logger.info("Replayed %d bank additions from %s", len(pairs), log.path)
+
+
+def direction_files(direction: str, run_dir: str | None = None) -> dict[str, str]:
+    """Run-directory artifacts for one direction; the bank is in the target language."""
+    if run_dir is not None:
+        return {
+            name: _run_path(path, run_dir)
+            for name, path in direction_files(direction).items()
+        }
+    if direction == "ki_en":
+        return {
+            "src_model": config.KI_MODEL_PATH,
+            "tgt_model": config.EN_MODEL_PATH,
+            "projection": config.PROJ_KI_EN_PATH,
+            "tgt_embs": config.TGT_EMBS_EN_PATH,
+            "pq_index": config.PQ_INDEX_EN_PATH,
+            "pca": config.PCA_EN_PATH,
+            "shard_layout": config.SHARD_LAYOUT_EN_PATH,
+        }
+    return {
+        "src_model": config.EN_MODEL_PATH,
+        "tgt_model": config.KI_MODEL_PATH,
+        "projection": config.PROJ_EN_KI_PATH,
+        "tgt_embs": config.TGT_EMBS_KI_PATH,
+        "pq_index": config.PQ_INDEX_KI_PATH,
+        "pca": config.PCA_KI_PATH,
+        "shard_layout": config.SHARD_LAYOUT_KI_PATH,
+    }
+
+
+def _load_bank_embeddings(path: str) -> np.ndarray | None:
+    # The PQ index only re-reads shortlisted rows and shard workers load their own
+    # slices, so the coordinator keeps full vectors on disk
+    mmap_mode = "r" if config.SENTENCE_INDEX in ("pq", "sharded") else None
+    return np.load(path, mmap_mode=mmap_mode) if os.path.exists(path) else None
+
+
+def _build_direction(
+    report: StartupReport,
+    direction: str,
+    src_model: Future,
+    tgt_model: Future,
+    projection: Future,
+    bank: Future,
+    tgt_embs: Future,
+    run_dir: str | None = None,
+    shared: SharedArtifacts | None = None,
+) -> CrossLingualTranslator:
+    """Builds one direction's translator once the files it needs are loaded.
+
+    With `shared`, an exact bank index built from identical embeddings for another
+    run is reused instead of recomputing its CSLS penalties.
+    """
+    files = direction_files(direction, run_dir)
+    ki_sentences, en_sentences, domains = bank.result()
+    sentences = en_sentences if direction == "ki_en" else ki_sentences
+    embeddings = tgt_embs.result()
+
+    # Precomputed embeddings cover only training sentences (val rows were held out).
+    # Trim sentence lists to match so retrieval indices are always valid.
+    if embeddings is not None and len(embeddings) < len(sentences):
+        sentences = sentences[: len(embeddings)]
+        domains = domains[: len(embeddings)]
+
+    sentence_index = None
+    index_key = None
+    if config.SENTENCE_INDEX == "pq":
+        sentence_index = _load_pq_index(files["pq_index"], embeddings)
+    elif shared is not None and embeddings is not None:
+        index_key = shared.key("exact_index", [files["tgt_embs"]])
+        sentence_index = shared.get(index_key)
+    translator = report.run(
+        f"{direction}.translator",
+        CrossLingualTranslator,
+        src_model.result(),
+        tgt_model.result(),
+        projection.result(),
+        sentences,
+        precomputed_tgt_embeddings=embeddings,
+        sentence_index=sentence_index,
+        tgt_domains=domains,
+        compact_dir=os.path.dirname(files["tgt_embs"]),
+    )
+    if index_key is not None and translator.sentence_index is not None:
+        assert shared is not None
+        shared.put(index_key, translator.sentence_index)
+    if config.SENTENCE_INDEX == "cascade":
+        report.run(
+            f"{direction}.cascade_index", _attach_cascade_index, translator, files["pca"]
+        )
+    elif config.SENTENCE_INDEX == "sharded":
+        report.run(
+            f"{direction}.sharded_index",
+            _attach_sharded_index,
+            translator,
+            files["tgt_embs"],
+            files["shard_layout"],
+        )
+
+    # Pre-build HNSW vocab indexes (on all cores); queries use `serving.hnsw_threads`
+    report.run(
+        f"{direction}.hnsw_index",
+        translator.build_vocab_hnsw_index,
+        num_threads=config.HNSW_THREADS,
+        **_hnsw_params(direction, run_dir),
+    )
+    if config.LATENCY_SLO_MS > 0 and config.WORD_TABLE_SIZE > 0:
+        report.run(
+            f"{direction}.word_table", translator.build_word_table, config.WORD_TABLE_SIZE
+        )
+    return translator
+
+
+def load_translators(
+    report: StartupReport,
+    directions: list[str],
+    loaded_models: dict[str, Any],
+    run_dir: str | None = None,
+    shared: SharedArtifacts | None = None,
+) -> dict[str, CrossLingualTranslator]:
+    """Loads the artifacts of `directions` and builds them, overlapping independent stages.
+
+    fastText models, projections, bank embeddings and the sentence bank load
+    concurrently; each direction then builds its translator, indexes and word table
+    as soon as its own inputs are ready. fastText, numpy and hnswlib release the
+    GIL during the heavy parts, so threads overlap real work. fastText models in
+    `loaded_models` (by language) are reused instead of loaded again. Files come
+    from `run_dir` (default: the latest run); with `shared`, anything another run
+    loaded from identical files is reused.
+    """
+    with ThreadPoolExecutor(
+        max_workers=config.STARTUP_WORKERS, thread_name_prefix="startup"
+    ) as pool:
+
+        def stage(name: str, fn: Callable[..., Any], *args: Any) -> Future:
+            return pool.submit(report.run, name, fn, *args)
+
+        def load(name: str, fn: Callable[..., Any], paths: list[str], *args: Any) -> Future:
+            if shared is None:
+                return stage(name, fn, *args)
+            return shared.future(fn.__name__, paths, lambda: stage(name, fn, *args))
+
+        # Loads are submitted before the builds that wait on them, so a worker only
+        # ever blocks on a stage that is already running
+        models: dict[str, Future] = {}
+        for direction in directions:
+            src, tgt = direction.split("_")
+            files = direction_files(direction, run_dir)
+            for lang, path in ((src, files["src_model"]), (tgt, files["tgt_model"])):
+                if lang in models:
+                    continue
+                if lang in loaded_models:
+                    models[lang] = Future()
+                    models[lang].set_result(loaded_models[lang])
+                else:
+                    models[lang] = load(
+                        f"fasttext_{lang}", fasttext.load_model, [path], path
+                    )
+        bank = load(
+            "sentence_bank", _load_parallel_sentences, _bank_files(run_dir), run_dir
+        )
+        loads = {}
+        for direction in directions:
+            files = direction_files(direction, run_dir)
+            loads[direction] = (
+                load(
+                    f"{direction}.projection",
+                    np.load,
+                    [files["projection"]],
+                    files["projection"],
+                ),
+                load(
+                    f"{direction}.bank_embeddings",
+                    _load_bank_embeddings,
+                    [files["tgt_embs"]],
+                    files["tgt_embs"],
+                ),
+            )
+        builds = {
+            direction: pool.submit(
+                _build_direction,
+                report,
+                direction,
+                models[direction[:2]],
+                models[direction[3:]],
+                projection,
+                bank,
+                tgt_embs,
+                run_dir,
+                shared,
+            )
+            for direction, (projection, tgt_embs) in loads.items()
+        }
+        translators = {direction: f.result() for direction, f in builds.items()}
+
+    report.run("bank_additions", _replay_bank_additions, translators)
+    return translators
+
+
+def required_files(directions: list[str], run_dir: str | None = None) -> list[str]:
+    return list(
+        dict.fromkeys(
+            direction_files(d, run_dir)[name]
+            for d in directions
+            for name in ("src_model", "tgt_model", "projection")
+        )
+    )
+
+
+def loaded_models(translators: dict[str, CrossLingualTranslator]) -> dict[str, Any]:
+    """fastText models already held by loaded translators, by language."""
+    models = {}
+    for direction, translator in translators.items():
+        src, tgt = direction.split("_")
+        models[src] = translator.src_model
+        models[tgt] = translator.tgt_model
+    return models
+
+
+def translate_sentences(
+    translator: CrossLingualTranslator,
+    method: str,
+    sentences: list[str],
+    domains: list[str] | None,
+) -> list[str]:
+    """Translates `sentences` with one batched retrieval, or word by word."""
+    if method == "word-by-word":
+        return [translator.translate_word_by_word(s) for s in sentences]
+    top = translator.retrieve_top_k_many(sentences, 1, domains=domains)
+    return [hits[0][0] if hits else "" for hits in top]
@@ -1,24 +1,68 @@
 """FastAPI application for Kikuyu-English bidirectional translation."""
 
-import csv
+import asyncio
+import io
 import json
 import os
-from contextlib import asynccontextmanager
-from pathlib import Path
-from typing import AsyncGenerator, Optional
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, suppress
+from typing import Annotated, Any, AsyncGenerator, Callable, Optional, TypeVar
 
-import fasttext
 import numpy as np
-from fastapi import FastAPI, HTTPException, Request, status
-from fastapi.responses import HTMLResponse
+from fastapi import (
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    JSONResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, Field
-
-from app.api.embeddings import (
-    CrossLingualTranslator,
-    get_sentence_embedding,
+from pydantic import BaseModel, Field, ValidationError
+
+from app.api.bank import DEFAULT_DOMAIN
+from app.api.embeddings import CrossLingualTranslator, TokenVectorCache
+from app.api.preprocessing import normalize_text
+from app.api.segmentation import segment_document
+from app.serve.adaptive import StrategySelector
+from app.serve.admission import (
+    AdmissionController,
+    ClientRateLimiter,
+    EndpointGate,
+    Rejected,
+    client_address,
+)
+from app.serve.binary import MEDIA_TYPE as BINARY_BATCH
+from app.serve.binary import decode_batch, encode_batch
+from app.serve.cache import LRUResultCache, SQLiteResultCache, cache_key
+from app.serve.compute import ComputeExecutor
+from app.serve.feedback import FeedbackStore, FeedbackWriter
+from app.serve.jobs import BulkJobs
+from app.serve.loading import (
+    apply_bank_pairs,
+    bank_log,
+    direction_files,
+    load_translators,
+    loaded_models,
+    required_files,
+    translate_sentences,
 )
+from app.serve.startup import StartupReport, current_rss_mb, unique_memory_mb
+from app.serve.variants import SharedArtifacts, VariantRouter, VariantServing
 from app.shared import config
 from app.shared.logger import setup_logger
 
@@ -36,6 +80,21 @@ class TranslationRequest(BaseModel):
     method: str = Field(
         "retrieval", description="Translation method ('retrieval' or 'word-by-word')"
     )
+    shortlist: Optional[int] = Field(
+        None,
+        ge=1,
+        le=10000,
+        description="Coarse candidates re-scored exactly (approximate indexes only)",
+    )
+    domains: Optional[list[str]] = Field(
+        None, description="Restrict retrieval to these corpus domains (e.g. 'agriculture')"
+    )
+    deadline_ms: Optional[int] = Field(
+        None,
+        ge=1,
+        le=60000,
+        description="Latency budget; cheaper strategies are used to meet it",
+    )
 
 
 class TranslationResponse(BaseModel):
@@ -43,6 +102,10 @@ class TranslationResponse(BaseModel):
     source_lang: str = Field(..., description="Source language code")
     target_lang: str = Field(..., description="Target language code")
     method: str = Field(..., description="Translation method used")
+    strategy: str = Field(
+        "full",
+        description="Strategy used ('full', 'shortlist', 'reduced_ef', 'word_table')",
+    )
 
 
 class CandidatesRequest(BaseModel):
@@ -52,6 +115,21 @@ class CandidatesRequest(BaseModel):
     source_lang: str = Field(..., description="Source language code ('ki' or 'en')")
     target_lang: str = Field(..., description="Target language code ('ki' or 'en')")
     k: int = Field(5, ge=1, le=20, description="Number of top-K candidates to return")
+    shortlist: Optional[int] = Field(
+        None,
+        ge=1,
+        le=10000,
+        description="Coarse candidates re-scored exactly (approximate indexes only)",
+    )
+    domains: Optional[list[str]] = Field(
+        None, description="Restrict retrieval to these corpus domains (e.g. 'agriculture')"
+    )
+    deadline_ms: Optional[int] = Field(
+        None,
+        ge=1,
+        le=60000,
+        description="Latency budget; cheaper strategies are used to meet it",
+    )
 
 
 class TranslationCandidate(BaseModel):
@@ -63,6 +141,78 @@ class CandidatesResponse(BaseModel):
     candidates: list[TranslationCandidate] = Field(..., description="Top-K candidates")
     source_lang: str = Field(..., description="Source language code")
     target_lang: str = Field(..., description="Target language code")
+    strategy: str = Field(
+        "full", description="Strategy used ('full', 'shortlist' or 'word_table')"
+    )
+
+
+BatchText = Annotated[str, Field(min_length=1, max_length=2000)]
+
+
+class BatchTranslationRequest(BaseModel):
+    texts: list[BatchText] = Field(
+        ..., min_length=1, max_length=config.BATCH_MAX_TEXTS, description="Source texts"
+    )
+    source_lang: str = Field(..., description="Source language code ('ki' or 'en')")
+    target_lang: str = Field(..., description="Target language code ('ki' or 'en')")
+    method: str = Field(
+        "retrieval", description="Translation method ('retrieval' or 'word-by-word')"
+    )
+    domains: Optional[list[str]] = Field(
+        None, description="Restrict retrieval to these corpus domains (e.g. 'agriculture')"
+    )
+
+
+class BatchTranslationResponse(BaseModel):
+    translations: list[str] = Field(..., description="One translation per text, in order")
+    source_lang: str
+    target_lang: str
+    method: str
+
+
+class BatchCandidatesRequest(BaseModel):
+    texts: list[BatchText] = Field(
+        ..., min_length=1, max_length=config.BATCH_MAX_TEXTS, description="Source texts"
+    )
+    source_lang: str = Field(..., description="Source language code ('ki' or 'en')")
+    target_lang: str = Field(..., description="Target language code ('ki' or 'en')")
+    k: int = Field(5, ge=1, le=20, description="Number of top-K candidates per text")
+    shortlist: Optional[int] = Field(
+        None,
+        ge=1,
+        le=10000,
+        description="Coarse candidates re-scored exactly (approximate indexes only)",
+    )
+    domains: Optional[list[str]] = Field(
+        None, description="Restrict retrieval to these corpus domains (e.g. 'agriculture')"
+    )
+
+
+class BatchCandidatesResponse(BaseModel):
+    results: list[list[TranslationCandidate]] = Field(
+        ..., description="Top-K candidates per text, in order"
+    )
+    source_lang: str
+    target_lang: str
+
+
+class EmbedRequest(BaseModel):
+    texts: list[BatchText] = Field(
+        ..., min_length=1, max_length=config.BATCH_MAX_TEXTS, description="Texts to embed"
+    )
+    lang: str = Field(..., pattern="^(ki|en)$", description="Language of the texts")
+    space: str = Field(
+        "en", pattern="^(ki|en)$", description="Language whose embedding space to use"
+    )
+    dtype: str = Field("float32", pattern="^(float16|float32)$")
+
+
+class EmbedResponse(BaseModel):
+    vectors: list[list[float]] = Field(..., description="One unit vector per text")
+    dim: int
+    lang: str
+    space: str
+    dtype: str
 
 
 class ModelInfoResponse(BaseModel):
@@ -73,31 +223,319 @@ class ModelInfoResponse(BaseModel):
     window_size: int = Field(..., description="Context window size")
     min_count: int = Field(..., description="Minimum word count threshold")
     metrics: dict = Field(default_factory=dict, description="Evaluation metrics")
+    domains: list[str] = Field(
+        default_factory=list, description="Corpus domains accepted by `domains` filters"
+    )
+    startup: dict = Field(
+        default_factory=dict, description="Startup status and per-stage timings"
+    )
+    directions: list[str] = Field(
+        default_factory=list, description="Directions currently loaded (e.g. 'ki_en')"
+    )
+
+
+class DocumentRequest(BaseModel):
+    text: str = Field(
+        ...,
+        min_length=1,
+        description="Document to translate; paragraphs are separated by blank lines",
+    )
+    source_lang: str = Field(..., description="Source language code ('ki' or 'en')")
+    target_lang: str = Field(..., description="Target language code ('ki' or 'en')")
+    method: str = Field(
+        "retrieval", description="Translation method ('retrieval' or 'word-by-word')"
+    )
+    domains: Optional[list[str]] = Field(
+        None, description="Restrict retrieval to these corpus domains (e.g. 'agriculture')"
+    )
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str = Field(..., description="queued, running, completed or failed")
+    column: str = Field(..., description="Column being translated")
+    direction: str
+    method: str
+    format: str = Field(..., description="'csv' or 'tsv'")
+    rows_done: int = Field(..., description="Rows translated and saved so far")
+    progress: float = Field(..., description="Share of the upload processed (0-1)")
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
+class TypeAheadMessage(BaseModel):
+    text: str = Field("", max_length=2000, description="Current contents of the input")
+    source_lang: str = Field(..., description="Source language code ('ki' or 'en')")
+    target_lang: str = Field(..., description="Target language code ('ki' or 'en')")
+    k: int = Field(3, ge=1, le=20, description="Number of retrieval candidates to push")
+    domains: Optional[list[str]] = Field(
+        None, description="Restrict retrieval to these corpus domains (e.g. 'agriculture')"
+    )
+    seq: Optional[int] = Field(None, description="Echoed back to match replies to inputs")
+
+
+class BankPair(BaseModel):
+    kikuyu: str = Field(..., min_length=1, max_length=2000)
+    english: str = Field(..., min_length=1, max_length=2000)
+    domain: str = Field(DEFAULT_DOMAIN, min_length=1, description="Corpus domain tag")
 
 
-def _load_parallel_sentences() -> tuple[list[str], list[str]]:
-    """Loads all parallel CSVs, returns (ki_sentences, en_sentences)."""
-    ki_list: list[str] = []
-    en_list: list[str] = []
-    for csv_path in sorted(Path(config.PARALLEL_DATA_DIR).rglob("*.csv")):
-        with open(csv_path, "r", encoding="utf-8") as f:
-            for row in csv.DictReader(f):
-                ki = row.get("Kikuyu", "").strip()
-                en = row.get("English", "").strip()
-                if ki and en:
-                    ki_list.append(ki)
-                    en_list.append(en)
-    return ki_list, en_list
+class BankPairsRequest(BaseModel):
+    pairs: list[BankPair] = Field(..., min_length=1, max_length=1000)
+
+
+class BankPairsResponse(BaseModel):
+    added: int = Field(..., description="Pairs appended to each direction's bank")
+    delta_segments: int = Field(..., description="Uncompacted segments per direction")
+    compaction_scheduled: bool = Field(
+        ..., description="Whether a background compaction was started"
+    )
+
+
+_bank_sync_lock = threading.Lock()
+# When this worker last checked the additions log for new lines
+_bank_checked_at = [0.0]
+
+
+def _loaded_runs(
+    translators: dict[str, CrossLingualTranslator],
+) -> list[dict[str, CrossLingualTranslator]]:
+    """The primary's translators followed by every other loaded run's."""
+    variants: VariantServing | None = getattr(app.state, "variants", None)
+    if variants is None:
+        return [translators]
+    return [translators] + [run for run in variants.runs.values() if run is not translators]
+
+
+def _sync_bank_additions(
+    translators: dict[str, CrossLingualTranslator], force: bool = False
+) -> bool:
+    """Applies pairs appended to the latest run's log since this worker last looked.
+
+    Pairs added through any worker reach every loaded run of every worker this
+    way, the one that received them included. The log is checked at most once per
+    `serving.bank_sync_interval_s` unless `force` is set. Returns whether a
+    compaction was scheduled.
+    """
+    now = time.monotonic()
+    if not force and now - _bank_checked_at[0] < config.BANK_SYNC_INTERVAL_S:
+        return False
+    _bank_checked_at[0] = now
+    log = bank_log()
+    if not log.has_new():
+        return False
+    runs = _loaded_runs(translators)
+    with _bank_sync_lock:
+        pairs, end = log.read(log.offset or 0)
+        if pairs:
+
+            def apply() -> None:
+                for run in runs:
+                    apply_bank_pairs(run, pairs)
+
+            _compute("batch", apply)()
+        # Advanced only once applied, so a racing caller waits for them above
+        log.offset = end
+    if not pairs:
+        return False
+    lru: LRUResultCache | None = getattr(app.state, "lru_cache", None)
+    if lru is not None:
+        lru.clear()
+    scheduled = False
+    for run in runs:
+        for translator in run.values():
+            if len(translator.delta_segments) >= config.BANK_COMPACT_SEGMENTS:
+                scheduled = translator.schedule_compaction() or scheduled
+    logger.info("Applied %d bank additions from %s", len(pairs), log.path)
+    return scheduled
+
+
+# Serialises lazy loads so concurrent first requests build a direction once
+_lazy_load_lock = threading.Lock()
+
+
+def _translator_for(
+    translators: dict[str, CrossLingualTranslator], direction: str
+) -> CrossLingualTranslator | None:
+    """Returns the direction's translator, loading it on first use if lazy loading is on.
+
+    Directions outside `serving.directions` are rejected with 404 unless
+    `serving.lazy_directions` is set. Blocks for the whole load, so async callers
+    should run it in a thread.
+    """
+    translator = translators.get(direction)
+    if translator is not None or direction in config.DIRECTIONS:
+        return translator
+    if not config.LAZY_DIRECTIONS:
+        src, tgt = direction.split("_")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Translation from {src} to {tgt} is not served by this deployment.",
+        )
+    with _lazy_load_lock:
+        translator = translators.get(direction)
+        if translator is not None:
+            return translator
+        missing = [p for p in required_files([direction]) if not os.path.exists(p)]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Model files for {direction} are missing.",
+            )
+        report: StartupReport = getattr(app.state, "startup", None) or StartupReport()
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        loaded = load_translators(report, [direction], loaded_models(translators))
+        translators[direction] = translator = loaded[direction]
+        logger.info(
+            "Lazily loaded %s in %.1fs; RSS %.0f -> %.0f MB.",
+            direction,
+            time.perf_counter() - start,
+            rss_before,
+            current_rss_mb(),
+        )
+    return translator
+
+
+def _load_variants(
+    report: StartupReport,
+    translators: dict[str, CrossLingualTranslator],
+    shared: SharedArtifacts,
+) -> VariantServing:
+    """Loads the runs in `serving.variants` next to the latest run's `translators`.
+
+    A run that is missing files or fails to load is logged and left out, so a bad
+    candidate never keeps the primary from serving.
+    """
+    primary = os.path.basename(config.LATEST_RUN_DIR)
+    runs = {primary: translators}
+    for run in config.VARIANTS:
+        run_dir = os.path.join(config.MODELS_DIR, run)
+        missing = [
+            p for p in required_files(config.DIRECTIONS, run_dir) if not os.path.exists(p)
+        ]
+        if run == primary or missing:
+            logger.error(
+                "Not serving variant %s: %s.",
+                run,
+                "it is the latest run" if run == primary else f"missing {missing}",
+            )
+            continue
+        run_report = StartupReport()
+        try:
+            runs[run] = load_translators(run_report, config.DIRECTIONS, {}, run_dir, shared)
+        except Exception:
+            logger.exception("Not serving variant %s: it failed to load.", run)
+        report.include(run_report, f"{run}/")
+    logger.info(
+        "Serving runs %s; %d artifacts shared between them.", ", ".join(runs), shared.reused
+    )
+    router = VariantRouter(
+        primary,
+        weights={run: config.VARIANTS[run]["weight"] for run in runs if run != primary},
+        shadows={run: config.VARIANTS[run]["shadow"] for run in runs if run != primary},
+        compare_rate=config.VARIANT_COMPARE_RATE,
+    )
+    return VariantServing(
+        primary,
+        runs,
+        router,
+        workers=config.SHADOW_WORKERS,
+        max_pending=config.SHADOW_MAX_PENDING,
+        compute=lambda fn: _compute("batch", fn)(),
+    )
+
+
+def _start_serving(report: StartupReport) -> None:
+    """Loads the models, then publishes translators and caches to `app.state`."""
+    variants = None
+    try:
+        if config.VARIANTS:
+            shared = SharedArtifacts()
+            translators = load_translators(report, config.DIRECTIONS, {}, None, shared)
+            variants = _load_variants(report, translators, shared)
+        else:
+            translators = load_translators(report, config.DIRECTIONS, {})
+    except Exception as e:
+        logger.exception("Startup failed.")
+        report.finish("failed", str(e))
+        return
+
+    if config.LRU_CACHE_ENTRIES > 0:
+        app.state.lru_cache = LRUResultCache(
+            config.LRU_CACHE_ENTRIES, ttl_seconds=config.LRU_CACHE_TTL_S
+        )
+    if config.RESULT_CACHE:
+        # Results depend on the trained run, its files and the index serving it
+        run_id = ":".join([
+            os.path.basename(config.LATEST_RUN_DIR),
+            str(os.path.getmtime(direction_files(config.DIRECTIONS[0])["projection"])),
+            config.SENTENCE_INDEX,
+        ])
+        app.state.result_cache = SQLiteResultCache(
+            config.RESULT_CACHE_PATH, run_id, max_entries=config.RESULT_CACHE_MAX_ENTRIES
+        )
+    app.state.compute = ComputeExecutor(config.COMPUTE_WORKERS, config.BLAS_THREADS)
+    app.state.variants = variants
+    # Published last: a ready server has its caches in place
+    app.state.translators = translators
+    report.finish("ready")
+    logger.info(
+        "Models ready after %.1fs (%s); RSS %.0f MB.",
+        report.total_seconds,
+        ", ".join(translators),
+        current_rss_mb(),
+    )
+
+
+def preload() -> bool:
+    """Loads the models in this process before workers are forked (`scripts.serve`).
+
+    Returns whether the models are ready; workers forked afterwards skip loading
+    in `lifespan` and share the loaded arrays copy-on-write.
+    """
+    report = StartupReport()
+    app.state.startup = report
+    app.state.translators = None
+    missing = [p for p in required_files(config.DIRECTIONS) if not os.path.exists(p)]
+    if missing:
+        logger.error("Translation models not found (%s).", ", ".join(missing))
+        report.finish("missing", "Translation models not found.")
+        return False
+    _start_serving(report)
+    app.state.preloaded = report.ready
+    return report.ready
+
+
+def _start_jobs(report: StartupReport) -> None:
+    """Starts the bulk job workers (resuming unfinished jobs) once models are ready."""
+    if report.ready:
+        app.state.jobs.start()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    required = [
-        config.KI_MODEL_PATH,
-        config.EN_MODEL_PATH,
-        config.PROJ_KI_EN_PATH,
-        config.PROJ_EN_KI_PATH,
-    ]
+    async with _models_lifespan(app):
+        yield
+    # Queued feedback is written and fsynced before the worker exits
+    await asyncio.to_thread(app.state.feedback.close)
+
+
+@asynccontextmanager
+async def _models_lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    if getattr(app.state, "preloaded", False):
+        # Forked by scripts.serve: the parent already loaded everything, but
+        # threads do not survive the fork, so each worker starts its own job pool
+        app.state.jobs.start()
+        yield
+        await asyncio.to_thread(app.state.jobs.stop)
+        return
+
+    report = StartupReport()
+    app.state.startup = report
+    app.state.translators = None
+    required = required_files(config.DIRECTIONS)
     if not all(os.path.exists(p) for p in required):
         missing = [p for p in required if not os.path.exists(p)]
         logger.warning(
@@ -106,64 +544,179 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             "All /translate requests will return 503 until models are loaded.",
             ", ".join(missing),
         )
-        app.state.translators = None
+        report.finish("missing", "Translation models not found.")
         yield
         return
 
-    ki_model = fasttext.load_model(config.KI_MODEL_PATH)
-    en_model = fasttext.load_model(config.EN_MODEL_PATH)
-    W_ki_en = np.load(config.PROJ_KI_EN_PATH)
-    W_en_ki = np.load(config.PROJ_EN_KI_PATH)
+    # Load in the background so /health answers at once; /ready flips when done
+    loading = asyncio.create_task(asyncio.to_thread(_start_serving, report))
+    loading.add_done_callback(lambda _: _start_jobs(report))
+    yield
 
-    ki_sentences, en_sentences = _load_parallel_sentences()
+    if not loading.done():
+        logger.warning("Shutting down before startup finished.")
+        return
+    # Running jobs stop after their current batch and resume on the next start
+    await asyncio.to_thread(app.state.jobs.stop)
+    compute: ComputeExecutor | None = getattr(app.state, "compute", None)
+    if compute is not None:
+        compute.shutdown()
+    variants: VariantServing | None = getattr(app.state, "variants", None)
+    runs = [app.state.translators or {}]
+    if variants is not None:
+        variants.close()
+        runs = list(variants.runs.values())
+    for translators in runs:
+        for translator in translators.values():
+            close = getattr(translator.sentence_index, "close", None)
+            if close is not None:
+                close()
 
-    tgt_embs_ki = (
-        np.load(config.TGT_EMBS_KI_PATH)
-        if os.path.exists(config.TGT_EMBS_KI_PATH)
-        else None
-    )
-    tgt_embs_en = (
-        np.load(config.TGT_EMBS_EN_PATH)
-        if os.path.exists(config.TGT_EMBS_EN_PATH)
+
+app = FastAPI(
+    title="Taura 2.0 Kikuyu-English Translation API",
+    description="Cross-lingual embedding-based machine translation for Kikuyu and English.",
+    version="2.0.0",
+    lifespan=lifespan,
+)
+
+
+# Admission gates by path; keys match `serving.admission_concurrency`
+_ADMISSION_PATHS = {
+    "translate": "/translate",
+    "candidates": "/translate/candidates",
+    "document": "/translate/document",
+    "batch": "/translate/batch",
+    "candidates_batch": "/translate/candidates/batch",
+    "embed": "/embed",
+}
+
+
+def _admission_controller() -> AdmissionController:
+    gates = {
+        path: EndpointGate(
+            name,
+            config.ADMISSION_CONCURRENCY.get(name, 8),
+            config.ADMISSION_MAX_QUEUE,
+            config.ADMISSION_LATENCY_BUDGET_MS / 1000,
+        )
+        for name, path in _ADMISSION_PATHS.items()
+    }
+    rate_limiter = (
+        ClientRateLimiter(config.RATE_LIMIT_PER_S, config.RATE_LIMIT_BURST)
+        if config.RATE_LIMIT_PER_S > 0
         else None
     )
+    return AdmissionController(gates, rate_limiter)
 
-    # Precomputed embeddings cover only training sentences (val rows were held out).
-    # Trim sentence lists to match so retrieval indices are always valid.
-    if tgt_embs_en is not None and len(tgt_embs_en) < len(en_sentences):
-        en_sentences = en_sentences[: len(tgt_embs_en)]
-    if tgt_embs_ki is not None and len(tgt_embs_ki) < len(ki_sentences):
-        ki_sentences = ki_sentences[: len(tgt_embs_ki)]
 
-    translator_ki_en = CrossLingualTranslator(
-        ki_model,
-        en_model,
-        W_ki_en,
-        en_sentences,
-        precomputed_tgt_embeddings=tgt_embs_en,
-    )
-    translator_en_ki = CrossLingualTranslator(
-        en_model,
-        ki_model,
-        W_en_ki,
-        ki_sentences,
-        precomputed_tgt_embeddings=tgt_embs_ki,
-    )
+app.state.admission = _admission_controller() if config.ADMISSION else None
+app.state.adaptive = (
+    StrategySelector(config.LATENCY_SLO_MS, config.ADAPTIVE_PROBE_S)
+    if config.LATENCY_SLO_MS > 0
+    else None
+)
+app.state.feedback = FeedbackWriter(
+    config.FEEDBACK_FILE_PATH,
+    fsync_interval_s=config.FEEDBACK_FSYNC_S,
+    max_bytes=int(config.FEEDBACK_ROTATE_MB * 1024 * 1024),
+    rotate_s=config.FEEDBACK_ROTATE_HOURS * 3600,
+    max_pending=config.FEEDBACK_MAX_PENDING,
+    store=FeedbackStore(config.FEEDBACK_DB_PATH),
+)
+app.state.jobs = BulkJobs(
+    config.JOBS_DIR,
+    # Defined with the /jobs endpoints below
+    lambda direction, method, texts: _translate_job_rows(direction, method, texts),
+    workers=config.JOB_WORKERS,
+    batch_size=config.JOB_BATCH_SIZE,
+)
 
-    # Pre-build HNSW vocab indexes so word-by-word inference uses all CPU cores
-    translator_ki_en.build_vocab_hnsw_index()
-    translator_en_ki.build_vocab_hnsw_index()
+# JSON escapes (\uXXXX for a UTF-8 character, or for one control byte) take at
+# most six bytes per byte of text, so no larger body holds a document in budget
+_DOCUMENT_BODY_FACTOR = 6
 
-    app.state.translators = {"ki_en": translator_ki_en, "en_ki": translator_en_ki}
-    yield
 
+@app.middleware("http")
+async def limit_document_body(request: Request, call_next: Callable) -> Response:
+    """Rejects /translate/document bodies too large for the byte budget unparsed.
 
-app = FastAPI(
-    title="Taura 2.0 Kikuyu-English Translation API",
-    description="Cross-lingual embedding-based machine translation for Kikuyu and English.",
-    version="2.0.0",
-    lifespan=lifespan,
-)
+    The handler still checks the decoded text, which also covers bodies sent
+    without a Content-Length.
+    """
+    if request.url.path == "/translate/document":
+        try:
+            length = int(request.headers.get("content-length", "0"))
+        except ValueError:
+            length = 0
+        if length > _DOCUMENT_BODY_FACTOR * config.DOCUMENT_MAX_BYTES + 4096:
+            return JSONResponse(
+                {
+                    "detail": f"Request body is {length} bytes; the document limit "
+                    f"is {config.DOCUMENT_MAX_BYTES}."
+                },
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            )
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next: Callable) -> Response:
+    """Admits translate requests through their endpoint gate or rejects them early.
+
+    Rejections are 429 (client over its rate) or 503 (endpoint overloaded), both
+    with Retry-After. A streamed response holds its slot until the body is sent.
+    """
+    controller: AdmissionController | None = getattr(app.state, "admission", None)
+    gate = controller.gate_for(request.url.path) if controller is not None else None
+    if gate is None or request.method != "POST":
+        return await call_next(request)
+    assert controller is not None
+
+    client = client_address(
+        request.client.host if request.client else "unknown",
+        request.headers.get("x-forwarded-for"),
+        config.TRUSTED_PROXIES,
+    )
+    try:
+        # Handlers read these to pick a strategy that fits the remaining budget
+        request.state.queue_wait_s = await controller.admit(gate, client)
+        request.state.admission_gate = gate
+    except Rejected as e:
+        return JSONResponse(
+            {"detail": e.detail},
+            status_code=e.status_code,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    start = time.perf_counter()
+    released = False
+
+    def release() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            gate.release(time.perf_counter() - start)
+
+    try:
+        response = await call_next(request)
+    except BaseException:
+        release()
+        raise
+    body = getattr(response, "body_iterator", None)
+    if body is None:
+        release()
+        return response
+
+    async def body_then_release() -> AsyncGenerator[bytes, None]:
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            release()
+
+    response.body_iterator = body_then_release()  # type: ignore[attr-defined]
+    return response
 
 
 # Mount static files and templates
@@ -181,12 +734,44 @@ class FeedbackRequest(BaseModel):
     comment: Optional[str] = None
 
 
+class FeedbackTotals(BaseModel):
+    direction: str
+    method: str
+    helpful: int
+    unhelpful: int
+
+
+class RatedQuery(BaseModel):
+    direction: str
+    method: str
+    source_hash: str = Field(..., description="Hash of the normalized source text")
+    source_text: str = Field(..., description="First wording seen for this query")
+    helpful: int
+    unhelpful: int
+    last_rated_at: Optional[float] = None
+
+
+class FeedbackStatsResponse(BaseModel):
+    totals: list[FeedbackTotals]
+    most_unhelpful: list[RatedQuery]
+
+
 @app.get("/", response_class=HTMLResponse)
 def read_root(request: Request) -> HTMLResponse:
     """Serves the translation web UI."""
     return templates.TemplateResponse(request=request, name="index.html")  # type: ignore[return-value]
 
 
+@app.get("/ready")
+def read_ready() -> JSONResponse:
+    """Readiness probe: 200 once the models are loaded and warm, 503 until then."""
+    report: StartupReport | None = getattr(app.state, "startup", None)
+    if getattr(app.state, "translators", None) is not None:
+        return JSONResponse({"status": "ready"})
+    detail = report.status if report is not None else "not started"
+    return JSONResponse({"status": detail}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
 @app.get("/health")
 def read_health() -> dict[str, str]:
     """Health-check endpoint."""
@@ -195,21 +780,127 @@ def read_health() -> dict[str, str]:
 
 @app.post("/feedback")
 def submit_feedback(request: FeedbackRequest) -> dict[str, str]:
-    """Appends user translation feedback to data/feedback.jsonl."""
-    feedback_dir = os.path.dirname(config.FEEDBACK_FILE_PATH)
-    os.makedirs(feedback_dir, exist_ok=True)
-    feedback_file = config.FEEDBACK_FILE_PATH
+    """Queues user translation feedback for the background writer (data/feedback.jsonl)."""
+    entry = request.model_dump() | {"id": uuid.uuid4().hex, "created_at": time.time()}
+    if not app.state.feedback.put(entry):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too much feedback is waiting to be written; retry later.",
+        )
+    return {"status": "success", "message": "Feedback submitted successfully."}
 
-    feedback_entry = request.model_dump()
-    with open(feedback_file, "a", encoding="utf-8") as f:
-        f.write(json.dumps(feedback_entry, ensure_ascii=False) + "\n")
 
-    return {"status": "success", "message": "Feedback submitted successfully."}
+@app.get("/feedback/stats", response_model=FeedbackStatsResponse)
+def feedback_stats(
+    direction: Optional[str] = Query(None, pattern="^(ki_en|en_ki)$"),
+    method: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=1000),
+) -> FeedbackStatsResponse:
+    """Rating totals and the queries most often rated unhelpful, from the feedback store.
+
+    Counts are kept up to date as feedback is written, so this never scans the log.
+    """
+    store: FeedbackStore = app.state.feedback.store
+    return FeedbackStatsResponse(**store.stats(direction, method, limit))
+
+
+def _require_admin(token: str | None) -> None:
+    expected = os.environ.get("TAURA_ADMIN_TOKEN")
+    if not expected or token != expected:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="A valid X-Admin-Token header is required.",
+        )
+
+
+def _require_translators() -> dict[str, CrossLingualTranslator]:
+    translators = getattr(app.state, "translators", None)
+    if translators is None:
+        report: StartupReport | None = getattr(app.state, "startup", None)
+        loading = report is not None and report.status == "loading"
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Translation models are still loading."
+            if loading
+            else "Translation models are not loaded. Please run model training first.",
+        )
+    _sync_bank_additions(translators)
+    return translators  # type: ignore[no-any-return]
+
+
+@app.post("/admin/bank/pairs", response_model=BankPairsResponse)
+def add_bank_pairs(
+    request: BankPairsRequest, x_admin_token: Optional[str] = Header(None)
+) -> BankPairsResponse:
+    """Adds parallel pairs to the retrieval bank without a restart.
+
+    Pairs are appended to the run directory's additions log, which every worker
+    picks up within `serving.bank_sync_interval_s`, so restarts keep them and they
+    are searchable on this worker as soon as the call returns. They are merged into
+    the main index in the background once `serving.bank_compact_segments` deltas
+    have accumulated.
+    """
+    _require_admin(x_admin_token)
+    translators = _require_translators()
+
+    pairs = [p.model_dump() for p in request.pairs]
+    bank_log().append(pairs)
+    scheduled = _sync_bank_additions(translators, force=True)
+    result_cache: SQLiteResultCache | None = getattr(app.state, "result_cache", None)
+    if result_cache is not None:
+        result_cache.clear()
+
+    return BankPairsResponse(
+        added=len(pairs),
+        delta_segments=max(len(t.delta_segments) for t in translators.values()),
+        compaction_scheduled=scheduled,
+    )
+
+
+@app.post("/admin/bank/compact", response_model=BankPairsResponse)
+def compact_bank(x_admin_token: Optional[str] = Header(None)) -> BankPairsResponse:
+    """Starts a background merge of all delta segments into the main index.
+
+    Covers every loaded run, so A/B and shadow variants are compacted too.
+    """
+    _require_admin(x_admin_token)
+    translators = _require_translators()
+    scheduled = False
+    for run in _loaded_runs(translators):
+        for translator in run.values():
+            if translator.delta_segments:
+                scheduled = translator.schedule_compaction() or scheduled
+    return BankPairsResponse(
+        added=0,
+        delta_segments=max(len(t.delta_segments) for t in translators.values()),
+        compaction_scheduled=scheduled,
+    )
+
+
+def _client_key(http_request: Request) -> str:
+    """Key keeping a client on one run: the X-Client-Key header, else its address."""
+    key = http_request.headers.get("x-client-key")
+    if key:
+        return key
+    return http_request.client.host if http_request.client else "unknown"
+
+
+def _shadow_translation(
+    translator: CrossLingualTranslator, method: str, text: str, domains: list[str] | None
+) -> str:
+    """What a run answers to a `/translate` request at full strategy, bypassing caches."""
+    return translate_sentences(translator, method, [text], domains)[0]
 
 
 @app.post("/translate", response_model=TranslationResponse)
-def translate(request: TranslationRequest) -> TranslationResponse:
-    """Performs bidirectional translation (Kikuyu <-> English)."""
+def translate(
+    request: TranslationRequest, http_request: Request, response: Response
+) -> TranslationResponse:
+    """Performs bidirectional translation (Kikuyu <-> English).
+
+    With `serving.variants` set, the client's run answers (named in the
+    ``X-Taura-Run`` header) and sampled shadow runs answer too, in the background.
+    """
     # 1. Validation
     src = request.source_lang.strip().lower()
     tgt = request.target_lang.strip().lower()
@@ -234,36 +925,96 @@ def translate(request: TranslationRequest) -> TranslationResponse:
         )
 
     # 2. Check if translators are initialized
-    if not hasattr(app.state, "translators") or app.state.translators is None:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Translation models are not loaded. Please run model training first.",
-        )
+    translators = _require_translators()
 
     # 3. Perform translation
     key = f"{src}_{tgt}"
-    translator = app.state.translators.get(key)
+    translator = _translator_for(translators, key)
     if not translator:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Translator for {src} to {tgt} is not loaded.",
         )
-
-    if method == "retrieval":
-        translated_text = translator.translate_sentence_retrieval(request.text)
+    variants: VariantServing | None = getattr(app.state, "variants", None)
+    # Results are cached, and strategy latencies kept, per run ("" is the primary)
+    cache_direction, lane = key, ""
+    if variants is not None:
+        run, translator = variants.route(_client_key(http_request), key, translator)
+        response.headers["X-Taura-Run"] = run
+        if run != variants.primary:
+            cache_direction, lane = f"{key}@{run}", run
+    start = time.perf_counter()
+
+    strategy = _choose_strategy(
+        http_request, translator, method, request.deadline_ms, run=lane
+    )
+    if strategy == "word_table":
+        translated_text = _timed(
+            method,
+            strategy,
+            lambda: translator.translate_with_word_table(request.text),
+            lane,
+        )()
+    elif method == "retrieval":
+        try:
+            top = _retrieve_top_k(
+                translator,
+                cache_direction,
+                request.text,
+                1,
+                _strategy_shortlist(strategy, request.shortlist),
+                request.domains,
+                strategy,
+                lane,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        translated_text = top[0].text if top else ""
     else:
-        translated_text = translator.translate_word_by_word(request.text)
+        ef = config.ADAPTIVE_REDUCED_EF if strategy == "reduced_ef" else None
+        translated_text = _cached(
+            cache_direction,
+            "word-by-word",
+            request.text,
+            1,
+            {"ef": ef} if ef is not None else {},
+            _compute(
+                "query",
+                _timed(
+                    method,
+                    strategy,
+                    lambda: translator.translate_word_by_word(request.text, ef=ef),
+                    lane,
+                ),
+            ),
+        )
+
+    if variants is not None:
+        variants.observe(run, time.perf_counter() - start)
+        # Shadows answer at full strategy; cheaper answers would count as disagreement
+        exact = strategy == "full" and request.shortlist is None
+        variants.shadow(
+            run,
+            key,
+            translated_text if exact else None,
+            lambda shadow: _shadow_translation(
+                shadow, method, request.text, request.domains
+            ),
+        )
 
     return TranslationResponse(
         translated_text=translated_text,
         source_lang=src,
         target_lang=tgt,
         method=method,
+        strategy=strategy,
     )
 
 
 @app.post("/translate/candidates", response_model=CandidatesResponse)
-def translate_candidates(request: CandidatesRequest) -> CandidatesResponse:
+def translate_candidates(
+    request: CandidatesRequest, http_request: Request
+) -> CandidatesResponse:
     """Returns top-K candidate translations ranked by cosine similarity."""
     src = request.source_lang.strip().lower()
     tgt = request.target_lang.strip().lower()
@@ -280,66 +1031,711 @@ def translate_candidates(request: CandidatesRequest) -> CandidatesResponse:
             detail="Source and target languages must be different.",
         )
 
-    if not hasattr(app.state, "translators") or app.state.translators is None:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Translation models are not loaded. Please run model training first.",
-        )
+    translators = _require_translators()
 
     key = f"{src}_{tgt}"
-    translator = app.state.translators.get(key)
+    translator = _translator_for(translators, key)
     if not translator:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Translator for {src} to {tgt} is not loaded.",
         )
 
-    candidates = _retrieve_top_k(translator, request.text, request.k)
+    # A word-by-word gloss is not a ranked candidate, so this stops at the shortlist
+    strategy = _choose_strategy(
+        http_request, translator, "retrieval", request.deadline_ms, word_table=False
+    )
+    try:
+        candidates = _retrieve_top_k(
+            translator,
+            key,
+            request.text,
+            request.k,
+            _strategy_shortlist(strategy, request.shortlist),
+            request.domains,
+            strategy,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return CandidatesResponse(
         candidates=candidates,
         source_lang=src,
         target_lang=tgt,
+        strategy=strategy,
+    )
+
+
+def _choose_strategy(
+    http_request: Request,
+    translator: CrossLingualTranslator,
+    method: str,
+    deadline_ms: int | None,
+    word_table: bool = True,
+    run: str = "",
+) -> str:
+    """Most exact strategy expected to fit the SLO/deadline after queueing."""
+    selector: StrategySelector | None = getattr(app.state, "adaptive", None)
+    if selector is None:
+        return "full"
+    available = ["full"]
+    index = translator.sentence_index
+    if method == "retrieval" and index is not None and index.kind in ("cascade", "pq"):
+        available.append("shortlist")
+    if method == "word-by-word" and getattr(translator, "vocab_ef", None) is not None:
+        available.append("reduced_ef")
+    if word_table and getattr(translator, "word_table", None):
+        available.append("word_table")
+
+    waited = getattr(http_request.state, "queue_wait_s", 0.0)
+    gate: EndpointGate | None = getattr(http_request.state, "admission_gate", None)
+    pressure = gate.queued / gate.concurrency if gate is not None else 0.0
+    return selector.choose(
+        method, available, selector.budget(deadline_ms, waited), pressure, run
+    )
+
+
+def _strategy_shortlist(strategy: str, shortlist: int | None) -> int | None:
+    if strategy != "shortlist":
+        return shortlist
+    return min(shortlist or config.ADAPTIVE_SHORTLIST, config.ADAPTIVE_SHORTLIST)
+
+
+def _timed(
+    method: str, strategy: str, compute: Callable[[], Any], run: str = ""
+) -> Callable[[], Any]:
+    """Wraps `compute` so each call records its latency for the strategy selector.
+
+    Only computations are timed, never cache hits, so the averages the selector
+    sees reflect what a miss would cost. `run` names a variant run ("" for the
+    primary), whose latencies are kept apart.
+    """
+
+    def timed() -> Any:
+        start = time.perf_counter()
+        value = compute()
+        selector: StrategySelector | None = getattr(app.state, "adaptive", None)
+        if selector is not None:
+            selector.observe(method, strategy, time.perf_counter() - start, run)
+        return value
+
+    return timed
+
+
+def _compute(site: str, fn: Callable[[], Any]) -> Callable[[], Any]:
+    """Wraps `fn` to run on the bounded compute executor under `site`'s BLAS limit.
+
+    Runs inline when no executor is set up (tests that install translators directly).
+    """
+    compute: ComputeExecutor | None = getattr(app.state, "compute", None)
+    if compute is None:
+        return fn
+    return lambda: compute.run(site, fn)
+
+
+async def _acompute(site: str, fn: Callable[..., Any], *args: Any) -> Any:
+    """Awaits `fn(*args)` on the compute executor (the threadpool before startup)."""
+    compute: ComputeExecutor | None = getattr(app.state, "compute", None)
+    if compute is None:
+        return await run_in_threadpool(fn, *args)
+    return await compute.arun(site, fn, *args)
+
+
+def _cached(
+    direction: str,
+    method: str,
+    text: str,
+    k: int,
+    options: dict,
+    compute: Callable[[], Any],
+) -> Any:
+    """Returns a cached result for the request, computing and storing it on a miss.
+
+    Keys use the `normalize_text` form, which is all the embedding and word lookup
+    ever see, so casing and punctuation variants share one entry. The in-process
+    LRU is checked first, then the shared SQLite cache.
+    """
+    canonical = normalize_text(text)
+
+    def shared() -> Any:
+        cache: SQLiteResultCache | None = getattr(app.state, "result_cache", None)
+        if cache is None:
+            return compute()
+        key = cache_key(direction, method, canonical, k, options)
+        value = cache.get(key)
+        if value is None:
+            value = compute()
+            cache.put(key, value)
+        return value
+
+    lru: LRUResultCache | None = getattr(app.state, "lru_cache", None)
+    if lru is None:
+        return shared()
+    # k is left out of the key: a cached top-k also answers any smaller k
+    return lru.get_or_compute(
+        cache_key(direction, method, canonical, None, options), k, shared
     )
 
 
 def _retrieve_top_k(
-    translator: CrossLingualTranslator, src_sentence: str, k: int
+    translator: CrossLingualTranslator,
+    direction: str,
+    src_sentence: str,
+    k: int,
+    shortlist: int | None = None,
+    domains: list[str] | None = None,
+    strategy: str = "full",
+    run: str = "",
 ) -> list[TranslationCandidate]:
     """Computes CSLS-adjusted similarity scores and returns the top-K target candidates."""
-    if not translator.tgt_sentences:
-        return []
+    options = {"shortlist": shortlist, "domains": sorted(domains) if domains else None}
+    pairs = _cached(
+        direction,
+        "retrieval",
+        src_sentence,
+        k,
+        options,
+        _compute(
+            "query",
+            _timed(
+                "retrieval",
+                strategy,
+                lambda: translator.retrieve_top_k(
+                    src_sentence, k, shortlist=shortlist, domains=domains
+                ),
+                run,
+            ),
+        ),
+    )
+    return [TranslationCandidate(text=text, score=score) for text, score in pairs]
+
+
+def _resolve_translator(
+    source_lang: str, target_lang: str
+) -> tuple[str, CrossLingualTranslator]:
+    """Validates a language pair and returns (direction key, loaded translator)."""
+    src = source_lang.strip().lower()
+    tgt = target_lang.strip().lower()
+    if src not in ("ki", "en") or tgt not in ("ki", "en"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Supported language codes are 'ki' (Kikuyu) and 'en' (English).",
+        )
+    if src == tgt:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Source and target languages must be different.",
+        )
+    key = f"{src}_{tgt}"
+    translator = _translator_for(_require_translators(), key)
+    if not translator:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Translator for {src} to {tgt} is not loaded.",
+        )
+    return key, translator
 
-    # Mirror translate_sentence_retrieval: apply source segmentation then CSLS
-    segment_fn = getattr(translator, "src_segment_fn", None)
-    sentence_to_embed = segment_fn(src_sentence) if segment_fn is not None else src_sentence
-    src_emb = get_sentence_embedding(translator.src_model, sentence_to_embed)
-    projected = translator.projection_matrix @ src_emb
 
-    norm_projected = np.linalg.norm(projected)
-    if norm_projected < 1e-8:
-        return [TranslationCandidate(text=translator.tgt_sentences[0], score=0.0)]
+BatchRequest = TypeVar(
+    "BatchRequest", BatchTranslationRequest, BatchCandidatesRequest, EmbedRequest
+)
+NPY_MEDIA_TYPE = "application/x-npy"
+
+
+def _batch_openapi(model: type[BaseModel]) -> dict[str, Any]:
+    """Documents a batch body read by hand: the JSON model or a binary frame."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": model.model_json_schema()},
+                BINARY_BATCH: {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    }
+
+
+def _parse_batch(content_type: str, body: bytes, model: type[BatchRequest]) -> BatchRequest:
+    """Validates a JSON or binary batch body with the same model and limits."""
+    try:
+        if content_type.split(";")[0].strip() == BINARY_BATCH:
+            header, texts, _, _ = decode_batch(body)
+            return model.model_validate(header | {"texts": texts})
+        return model.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+async def _read_batch(http_request: Request, model: type[BatchRequest]) -> BatchRequest:
+    body = await http_request.body()
+    content_type = http_request.headers.get("content-type", "")
+    # Large batches take milliseconds to parse, so keep them off the event loop
+    return await run_in_threadpool(_parse_batch, content_type, body, model)
+
+
+def _accepts_binary(http_request: Request) -> bool:
+    return BINARY_BATCH in http_request.headers.get("accept", "")
+
+
+async def _batch_translator(
+    source_lang: str, target_lang: str, domains: list[str] | None
+) -> tuple[str, CrossLingualTranslator]:
+    # May load the direction lazily, so keep it off the event loop
+    key, translator = await run_in_threadpool(_resolve_translator, source_lang, target_lang)
+    try:
+        translator.check_domains(domains)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return key, translator
+
+
+@app.post(
+    "/translate/batch",
+    response_model=BatchTranslationResponse,
+    openapi_extra=_batch_openapi(BatchTranslationRequest),
+)
+async def translate_batch(http_request: Request) -> Response | BatchTranslationResponse:
+    """Translates many texts in one request, each as `/translate` would.
+
+    Bodies are JSON or, with ``Content-Type: application/x-taura-batch``, a binary
+    frame (see `app.serve.binary`) whose header holds the other fields. Responses
+    are binary when the ``Accept`` header lists that type.
+    """
+    request = await _read_batch(http_request, BatchTranslationRequest)
+    method = request.method.strip().lower()
+    if method not in ("retrieval", "word-by-word"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Supported translation methods are 'retrieval' and 'word-by-word'.",
+        )
+    key, translator = await _batch_translator(
+        request.source_lang, request.target_lang, request.domains
+    )
+    translations = await _acompute(
+        "batch", translate_sentences, translator, method, request.texts, request.domains
+    )
+    src, tgt = key.split("_")
+    if _accepts_binary(http_request):
+        header = {"source_lang": src, "target_lang": tgt, "method": method}
+        frame = await run_in_threadpool(encode_batch, header, translations)
+        return Response(frame, media_type=BINARY_BATCH)
+    return BatchTranslationResponse(
+        translations=translations, source_lang=src, target_lang=tgt, method=method
+    )
 
-    norms_tgt = np.linalg.norm(translator.tgt_embeddings, axis=1)
-    norms_tgt[norms_tgt < 1e-8] = 1.0
 
-    scores = np.dot(translator.tgt_embeddings, projected) / (norms_tgt * norm_projected)
-    if hasattr(translator, "tgt_csls_penalty"):
-        scores = 2 * scores - translator.tgt_csls_penalty
+@app.post(
+    "/translate/candidates/batch",
+    response_model=BatchCandidatesResponse,
+    openapi_extra=_batch_openapi(BatchCandidatesRequest),
+)
+async def translate_candidates_batch(
+    http_request: Request,
+) -> Response | BatchCandidatesResponse:
+    """Top-K candidates for many texts in one request, JSON or binary like `/translate/batch`.
+
+    A binary response carries the candidates of all texts back to back, with
+    ``counts[i]`` candidates for text i and their scores as a float32 array.
+    """
+    request = await _read_batch(http_request, BatchCandidatesRequest)
+    key, translator = await _batch_translator(
+        request.source_lang, request.target_lang, request.domains
+    )
+    results = await _acompute(
+        "batch",
+        translator.retrieve_top_k_many,
+        request.texts,
+        request.k,
+        request.shortlist,
+        request.domains,
+    )
+    src, tgt = key.split("_")
+    if _accepts_binary(http_request):
+        header = {"source_lang": src, "target_lang": tgt, "k": request.k}
+        frame = await run_in_threadpool(
+            encode_batch,
+            header,
+            [text for hits in results for text, _ in hits],
+            [len(hits) for hits in results],
+            [score for hits in results for _, score in hits],
+        )
+        return Response(frame, media_type=BINARY_BATCH)
+    return BatchCandidatesResponse(
+        results=[
+            [TranslationCandidate(text=text, score=score) for text, score in hits]
+            for hits in results
+        ],
+        source_lang=src,
+        target_lang=tgt,
+    )
 
-    top_k_indices = np.argsort(scores)[::-1][: min(k, len(translator.tgt_sentences))]
 
-    return [
-        TranslationCandidate(
-            text=translator.tgt_sentences[int(idx)],
-            score=float(scores[int(idx)]),
+@app.post(
+    "/embed", response_model=EmbedResponse, openapi_extra=_batch_openapi(EmbedRequest)
+)
+async def embed(http_request: Request) -> Response:
+    """Unit sentence vectors in one language's space, comparable across languages.
+
+    Texts in the `space` language are embedded like the retrieval bank and texts in
+    the other language are projected into it like queries, so cosine similarity
+    compares Kikuyu and English directly. Rows for texts without a known word are
+    zeros. The body is JSON or a binary frame like `/translate/batch`; with
+    ``Accept: application/x-npy`` the response is the matrix as a `.npy` file.
+    """
+    request = await _read_batch(http_request, EmbedRequest)
+    other = "en" if request.space == "ki" else "ki"
+    # The direction into `space` holds both its model and the projection into it
+    _, translator = await run_in_threadpool(_resolve_translator, other, request.space)
+    embed_texts = (
+        translator.embed_targets
+        if request.lang == request.space
+        else translator.embed_queries
+    )
+    vectors = await _acompute("batch", embed_texts, request.texts)
+    vectors = vectors.astype(request.dtype)
+    if NPY_MEDIA_TYPE in http_request.headers.get("accept", ""):
+        buffer = io.BytesIO()
+        np.save(buffer, vectors)
+        return Response(buffer.getvalue(), media_type=NPY_MEDIA_TYPE)
+    # Millions of floats: skip re-validating them through the response model
+    return JSONResponse({
+        "vectors": vectors.tolist(),
+        "dim": vectors.shape[1],
+        "lang": request.lang,
+        "space": request.space,
+        "dtype": request.dtype,
+    })
+
+
+@app.post("/translate/document")
+async def translate_document(
+    request: DocumentRequest, http_request: Request
+) -> StreamingResponse:
+    """Translates a multi-paragraph document sentence by sentence, streamed as NDJSON.
+
+    Each line is ``{"paragraph", "sentence", "source", "translation"}`` in document
+    order, followed by a final ``{"done": true, ...}`` summary. Sentences are
+    translated in batches and work stops as soon as the client disconnects.
+    """
+    method = request.method.strip().lower()
+    if method not in ("retrieval", "word-by-word"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Supported translation methods are 'retrieval' and 'word-by-word'.",
+        )
+    size = len(request.text.encode("utf-8"))
+    if size > config.DOCUMENT_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Document is {size} bytes; the limit is {config.DOCUMENT_MAX_BYTES}.",
         )
-        for idx in top_k_indices
+    # May load the direction lazily, so keep it off the event loop
+    _, translator = await run_in_threadpool(
+        _resolve_translator, request.source_lang, request.target_lang
+    )
+    try:
+        translator.check_domains(request.domains)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    paragraphs = segment_document(request.text)
+    items = [
+        (p, s, sentence)
+        for p, sentences in enumerate(paragraphs)
+        for s, sentence in enumerate(sentences)
     ]
 
+    async def stream() -> AsyncGenerator[str, None]:
+        batch_size = config.DOCUMENT_BATCH_SIZE
+        for start in range(0, len(items), batch_size):
+            if await http_request.is_disconnected():
+                logger.info(
+                    "Client disconnected after %d of %d document sentences.",
+                    start,
+                    len(items),
+                )
+                return
+            batch = items[start : start + batch_size]
+            translations = await _acompute(
+                "batch",
+                translate_sentences,
+                translator,
+                method,
+                [sentence for *_, sentence in batch],
+                request.domains,
+            )
+            for (p, s, sentence), translation in zip(batch, translations, strict=True):
+                line = {
+                    "paragraph": p,
+                    "sentence": s,
+                    "source": sentence,
+                    "translation": translation,
+                }
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+        summary = {"done": True, "paragraphs": len(paragraphs), "sentences": len(items)}
+        yield json.dumps(summary) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def _translate_job_rows(direction: str, method: str, texts: list[str]) -> list[str]:
+    """Translates one batch of a bulk job on the compute executor's batch site."""
+    translator = _translator_for(_require_translators(), direction)
+    if translator is None:
+        raise RuntimeError(f"Translator for {direction} is not loaded.")
+    return _compute("batch", lambda: translate_sentences(translator, method, texts, None))()
+
+
+def _job_status(state: dict[str, Any]) -> JobStatus:
+    return JobStatus(job_id=state["id"], **state)
+
+
+def _job_state(job_id: str) -> dict[str, Any]:
+    state = app.state.jobs.status(job_id)
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found."
+        )
+    return state  # type: ignore[no-any-return]
+
+
+@app.post("/jobs", response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    request: Request,
+    column: str = Query(..., min_length=1, description="Header of the column to translate"),
+    source_lang: str = Query("ki"),
+    target_lang: str = Query("en"),
+    method: str = Query("retrieval"),
+    file_format: Optional[str] = Query(None, alias="format", pattern="^(csv|tsv)$"),
+) -> JobStatus:
+    """Queues a bulk translation of one column of a CSV/TSV file sent as the body.
+
+    The upload is streamed to the job's folder, never held in memory. The format
+    comes from `format`, else from a ``text/tab-separated-values`` content type,
+    else CSV. Poll `GET /jobs/{job_id}` and download `GET /jobs/{job_id}/result`.
+    """
+    method = method.strip().lower()
+    if method not in ("retrieval", "word-by-word"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Supported translation methods are 'retrieval' and 'word-by-word'.",
+        )
+    if file_format is None:
+        content_type = request.headers.get("content-type", "")
+        file_format = "tsv" if "tab-separated-values" in content_type else "csv"
+    direction, _ = await run_in_threadpool(_resolve_translator, source_lang, target_lang)
+
+    jobs: BulkJobs = app.state.jobs
+    max_bytes = int(config.JOB_MAX_MB * 1024 * 1024)
+    job_id, path = await run_in_threadpool(jobs.new_job)
+    try:
+        size = 0
+        with open(path, "wb") as f:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                        detail=f"Uploads are limited to {config.JOB_MAX_MB:g} MB.",
+                    )
+                await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        jobs.discard(job_id)
+        raise
+    try:
+        state = await run_in_threadpool(
+            jobs.submit, job_id, column, direction, method, file_format
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    logger.info("Queued translation job %s (%d bytes, %s).", job_id, size, direction)
+    return _job_status(state)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+def job_status(job_id: str) -> JobStatus:
+    """Progress of a bulk translation job, read from its saved state."""
+    return _job_status(_job_state(job_id))
+
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str) -> FileResponse:
+    """Downloads a completed job's file: the input columns plus `translation`."""
+    state = _job_state(job_id)
+    if state["status"] != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job {job_id} is {state['status']}, not completed.",
+        )
+    tsv = state["format"] == "tsv"
+    return FileResponse(
+        app.state.jobs.output_path(job_id),
+        media_type="text/tab-separated-values" if tsv else "text/csv",
+        filename=f"{job_id}.{state['format']}",
+    )
+
+
+@app.websocket("/ws/translate")
+async def translate_as_you_type(websocket: WebSocket) -> None:
+    """As-you-type translation over a WebSocket.
+
+    Each client message is a `TypeAheadMessage` holding the whole current input.
+    Only the newest message is processed: inputs that arrive while a translation
+    runs replace each other, a stage whose input was superseded before it started
+    is skipped, and a result whose input was superseded is dropped instead of
+    sent. For every processed input the server pushes
+    ``{"seq", "stage": "word-by-word", "translated_text"}`` and then
+    ``{"seq", "stage": "retrieval", "candidates"}``. Token vectors are cached per
+    connection and direction so each keystroke only looks up new words; the shared
+    result caches are bypassed since every prefix would be a new key.
+    """
+    await websocket.accept()
+    pending: list[dict] = []  # holds at most the newest unprocessed message
+    wake = asyncio.Event()
+    generation = 0
+    caches: dict[str, TokenVectorCache] = {}
+    counts = {"processed": 0, "superseded": 0}
+
+    async def reply(gen: int, message: dict) -> bool:
+        if gen != generation:
+            counts["superseded"] += 1
+            return False
+        await websocket.send_json(message)
+        return True
+
+    async def process(gen: int, message: dict) -> None:
+        seq = message.get("seq") if isinstance(message.get("seq"), int) else None
+        try:
+            request = TypeAheadMessage.model_validate(message)
+            key, translator = await run_in_threadpool(
+                _resolve_translator, request.source_lang, request.target_lang
+            )
+            translator.check_domains(request.domains)
+        except ValidationError as e:
+            await reply(gen, {"seq": seq, "error": e.errors(include_url=False)[0]["msg"]})
+            return
+        except HTTPException as e:
+            await reply(gen, {"seq": seq, "error": e.detail})
+            return
+        except ValueError as e:
+            await reply(gen, {"seq": seq, "error": str(e)})
+            return
+
+        text = request.text.strip()
+        cache = caches.setdefault(key, TokenVectorCache())
+
+        def unless_superseded(fn: Callable[..., Any], *args: Any) -> Any:
+            # Checked again on the compute thread: a stage still queued when a newer
+            # input arrived is skipped instead of computed and thrown away
+            return None if gen != generation else fn(*args)
+
+        async def stage(fn: Callable[..., Any], *args: Any) -> Any:
+            if gen != generation:
+                return None
+            return await _acompute("query", unless_superseded, fn, *args)
+
+        words = await stage(translator.translate_word_by_word, text, cache) if text else ""
+        if words is None:
+            counts["superseded"] += 1
+            return
+        message = {"seq": seq, "stage": "word-by-word", "translated_text": words}
+        if not await reply(gen, message):
+            return
+        top = (
+            await stage(
+                translator.retrieve_top_k, text, request.k, None, request.domains, cache
+            )
+            if text
+            else []
+        )
+        if top is None:
+            counts["superseded"] += 1
+            return
+        candidates = [{"text": t, "score": score} for t, score in top]
+        if await reply(gen, {"seq": seq, "stage": "retrieval", "candidates": candidates}):
+            counts["processed"] += 1
+
+    async def work() -> None:
+        while True:
+            await wake.wait()
+            wake.clear()
+            if not pending:
+                continue
+            message = pending.pop()
+            try:
+                await process(generation, message)
+            except WebSocketDisconnect:
+                return
+            except Exception:
+                logger.exception("As-you-type translation failed.")
+                with suppress(RuntimeError, WebSocketDisconnect):
+                    await websocket.send_json({"seq": None, "error": "Translation failed."})
+
+    worker = asyncio.create_task(work())
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = json.loads(raw)
+            except json.JSONDecodeError:
+                message = None
+            if not isinstance(message, dict):
+                await websocket.send_json({"seq": None, "error": "Expected a JSON object."})
+                continue
+            # Anything queued or in flight is now stale
+            generation += 1
+            pending[:] = [message]
+            wake.set()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        worker.cancel()
+        with suppress(asyncio.CancelledError):
+            await worker
+        logger.info(
+            "As-you-type session closed: %d inputs translated, %d superseded.",
+            counts["processed"],
+            counts["superseded"],
+        )
+
+
+@app.get("/metrics")
+def metrics() -> dict[str, Any]:
+    """Serving counters for this worker (cache hit rates, admission and shedding)."""
+    return {
+        name: cache.stats() if cache is not None else None
+        for name, cache in (
+            ("lru_cache", getattr(app.state, "lru_cache", None)),
+            ("result_cache", getattr(app.state, "result_cache", None)),
+            ("admission", getattr(app.state, "admission", None)),
+            ("adaptive", getattr(app.state, "adaptive", None)),
+            ("compute", getattr(app.state, "compute", None)),
+            ("feedback", getattr(app.state, "feedback", None)),
+            ("jobs", getattr(app.state, "jobs", None)),
+            ("variants", getattr(app.state, "variants", None)),
+        )
+    } | {"process": _process_stats()}
+
+
+def _process_stats() -> dict[str, Any]:
+    """Memory of the worker that answered; USS excludes pages shared with the parent."""
+    uss = unique_memory_mb(os.getpid())
+    return {
+        "pid": os.getpid(),
+        "rss_mb": round(current_rss_mb(), 1),
+        "uss_mb": None if uss is None else round(uss, 1),
+    }
+
 
 @app.get("/model/info", response_model=ModelInfoResponse)
 def model_info() -> ModelInfoResponse:
-    """Returns model version, hyperparameters, and current evaluation metrics."""
+    """Returns model version, hyperparameters, and current evaluation metrics.
+
+    `domains` lists the domains of the loaded bank, pairs added since startup
+    included.
+    """
+    translators = getattr(app.state, "translators", None) or {}
     metrics: dict = {}
     if os.path.exists(config.METRICS_JSON_PATH):
         try:
@@ -356,4 +1752,7 @@ def model_info() -> ModelInfoResponse:
         window_size=config.FASTTEXT_WS,
         min_count=config.FASTTEXT_MIN_COUNT,
         metrics=metrics,
+        domains=sorted({d for t in translators.values() for d in t.bank_domains}),
+        startup=report.as_dict() if (report := getattr(app.state, "startup", None)) else {},
+        directions=sorted(translators),
     )
@@ -0,0 +1,132 @@
+"""Bulk translation in-process, without the HTTP server.
+
+`translate_many` loads a direction once with the server's own loader in
+`app.serve.loading` (the same sentence index, tuned HNSW settings and replayed
+bank additions, without building the HTTP app), so its output is the same as
+`/translate`'s. Retrieval runs in large batches through `retrieve_top_k_many`,
+one matrix product per block of queries on every BLAS thread. Word-by-word is a
+Python loop over tokens, so it runs on a pool of forked processes that share the
+loaded models copy-on-write (the bank strings and any PQ codes are memory-mapped
+from the run directory already). Results are yielded in input order while the
+input is still being read.
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+from collections import deque
+from multiprocessing.pool import AsyncResult
+from typing import Iterable, Iterator
+
+from app.api.embeddings import CrossLingualTranslator
+from app.serve.compute import find_blas_libraries
+from app.serve.loading import load_translators, loaded_models, translate_sentences
+from app.serve.startup import StartupReport
+from app.shared.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+METHODS = ("retrieval", "word-by-word")
+
+_translators: dict[str, CrossLingualTranslator] = {}
+_load_lock = threading.Lock()
+# Read by forked pool workers; set in the parent just before the pool forks
+_pool_translator: CrossLingualTranslator | None = None
+
+
+def load_translator(direction: str) -> CrossLingualTranslator:
+    """Loads `direction` of the latest run once per process, reusing loaded fastText models."""
+    with _load_lock:
+        if direction not in _translators:
+            loaded = load_translators(
+                StartupReport(), [direction], loaded_models(_translators)
+            )
+            _translators[direction] = loaded[direction]
+    return _translators[direction]
+
+
+def translate_many(
+    texts: Iterable[str],
+    source_lang: str = "ki",
+    target_lang: str = "en",
+    method: str = "retrieval",
+    batch_size: int = 1024,
+    processes: int | None = None,
+) -> Iterator[str]:
+    """Translates `texts` lazily, yielding one translation per text in order.
+
+    Blank texts translate to "". `processes` (default: one per CPU) only applies
+    to word-by-word; retrieval batches are already spread over the BLAS threads.
+    """
+    src = source_lang.strip().lower()
+    tgt = target_lang.strip().lower()
+    if {src, tgt} != {"ki", "en"}:
+        raise ValueError("Translate between 'ki' (Kikuyu) and 'en' (English).")
+    if method not in METHODS:
+        raise ValueError(f"Supported translation methods are {METHODS}.")
+    translator = load_translator(f"{src}_{tgt}")
+    batches = _batches(texts, batch_size)
+    processes = processes or os.cpu_count() or 1
+    if method == "word-by-word" and processes > 1 and _can_fork():
+        return _translate_in_pool(translator, batches, processes)
+    return (
+        translation
+        for batch in batches
+        for translation in _translate_batch(translator, method, batch)
+    )
+
+
+def _batches(texts: Iterable[str], size: int) -> Iterator[list[str]]:
+    it = iter(texts)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
+
+
+def _translate_batch(
+    translator: CrossLingualTranslator, method: str, texts: list[str]
+) -> list[str]:
+    """The server's batched path, skipping blank texts (which the API rejects)."""
+    wanted = [i for i, text in enumerate(texts) if text.strip()]
+    translations = [""] * len(texts)
+    if wanted:
+        done = translate_sentences(translator, method, [texts[i] for i in wanted], None)
+        for i, translation in zip(wanted, done, strict=True):
+            translations[i] = translation
+    return translations
+
+
+def _can_fork() -> bool:
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def _init_worker() -> None:
+    # Each process handles one batch at a time; nested BLAS threads only contend
+    for library in find_blas_libraries():
+        library.set_threads(1)
+
+
+def _translate_words(texts: list[str]) -> list[str]:
+    assert _pool_translator is not None
+    return _translate_batch(_pool_translator, "word-by-word", texts)
+
+
+def _translate_in_pool(
+    translator: CrossLingualTranslator, batches: Iterator[list[str]], processes: int
+) -> Iterator[str]:
+    """Word-by-word on forked workers, keeping at most two batches per worker in flight.
+
+    `Pool.imap` would read the whole input ahead of the workers; bounding the
+    pending batches keeps memory flat however large the input is.
+    """
+    global _pool_translator
+    _pool_translator = translator
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(processes, initializer=_init_worker) as pool:
+        pending: deque[AsyncResult] = deque()
+        for batch in batches:
+            pending.append(pool.apply_async(_translate_words, (batch,)))
+            if len(pending) >= 2 * processes:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
@@ -0,0 +1,110 @@
+"""Startup stage timings, exposed on `/model/info` and behind `/ready`."""
+
+import sys
+import threading
+import time
+from typing import Any, Callable
+
+from app.shared.logger import setup_logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+logger = setup_logger(__name__)
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def unique_memory_mb(pid: int) -> float | None:
+    """Unique set size (private pages) of a process in MB, or None if unavailable.
+
+    Pages still shared copy-on-write with a parent count towards RSS but not USS,
+    so USS is what each extra worker really costs. Needs Linux `smaps_rollup`.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+            private_kb = sum(
+                int(line.split()[1])
+                for line in f
+                if line.startswith(("Private_Clean:", "Private_Dirty:"))
+            )
+    except (OSError, ValueError):
+        return None
+    return private_kb / 1024
+
+
+class StartupReport:
+    """Records when each startup stage ran and how long it took.
+
+    Stages may run concurrently on a thread pool; offsets are seconds since the
+    report was created, so overlapping stages are visible in the report.
+    """
+
+    def __init__(self) -> None:
+        self.status = "loading"
+        self.error: str | None = None
+        self.total_seconds: float | None = None
+        self.rss_mb: float | None = None
+        self.stages: dict[str, dict[str, float]] = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def run(self, name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Calls `fn` and records its timing under `name`."""
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        end = time.perf_counter()
+        with self._lock:
+            self.stages[name] = {
+                "start_s": round(start - self._started, 3),
+                "seconds": round(end - start, 3),
+            }
+        logger.info("Startup stage %s took %.2fs.", name, end - start)
+        return result
+
+    def include(self, other: "StartupReport", prefix: str) -> None:
+        """Adds the stages of another report under `prefix`, on this report's timeline."""
+        shift = other._started - self._started
+        with self._lock:
+            for name, stage in other.stages.items():
+                self.stages[prefix + name] = {
+                    "start_s": round(stage["start_s"] + shift, 3),
+                    "seconds": stage["seconds"],
+                }
+
+    def finish(self, status: str, error: str | None = None) -> None:
+        self.status = status
+        self.error = error
+        self.total_seconds = round(time.perf_counter() - self._started, 3)
+        self.rss_mb = round(current_rss_mb(), 1)
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            stages = dict(sorted(self.stages.items(), key=lambda s: s[1]["start_s"]))
+        return {
+            "status": self.status,
+            "error": self.error,
+            "total_seconds": self.total_seconds,
+            "rss_mb": self.rss_mb,
+            "stages": stages,
+        }
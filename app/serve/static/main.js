@@ -144,25 +144,7 @@ document.addEventListener("DOMContentLoaded", () => {
             }
 
             const data = await response.json();
-            
-            // Render translated text
-            targetTextDiv.textContent = data.translated_text;
-            targetTextDiv.classList.remove("hidden");
-            loadingSpinner.classList.add("hidden");
-            copyBtn.disabled = false;
-
-            // Cache translation for feedback
-            currentTranslation = {
-                source_text: text,
-                target_text: data.translated_text,
-                source_lang: sourceLang,
-                target_lang: targetLang,
-                method: method
-            };
-
-            // Show panels
-            renderDetails(currentTranslation);
-            feedbackCard.classList.remove("hidden");
+            showTranslation(text, data.translated_text, sourceLang, targetLang, method);
 
         } catch (error) {
             loadingSpinner.classList.add("hidden");
@@ -171,8 +153,107 @@ document.addEventListener("DOMContentLoaded", () => {
         }
     }
 
+    function showTranslation(text, translatedText, sourceLang, targetLang, method) {
+        // Render translated text
+        targetTextPlaceholder.classList.add("hidden");
+        targetTextDiv.textContent = translatedText;
+        targetTextDiv.classList.remove("hidden");
+        loadingSpinner.classList.add("hidden");
+        copyBtn.disabled = false;
+
+        // Cache translation for feedback
+        currentTranslation = {
+            source_text: text,
+            target_text: translatedText,
+            source_lang: sourceLang,
+            target_lang: targetLang,
+            method: method
+        };
+
+        // Show panels
+        renderDetails(currentTranslation);
+        feedbackCard.classList.remove("hidden");
+    }
+
     translateBtn.addEventListener("click", performTranslation);
 
+    // 4b. As-you-type translation over a WebSocket. The server only answers the
+    // newest input, so replies for older sequence numbers are ignored here too.
+    const LIVE_DEBOUNCE_MS = 250;
+    // Give up after this many connection attempts in a row that never opened
+    const LIVE_MAX_FAILURES = 3;
+    let liveSocket = null;
+    let liveFailures = 0;
+    let liveSeq = 0;
+    let liveRequest = null;
+    let debounceTimer = null;
+
+    function connectLive() {
+        const scheme = window.location.protocol === "https:" ? "wss" : "ws";
+        const socket = new WebSocket(`${scheme}://${window.location.host}/ws/translate`);
+        socket.addEventListener("open", () => {
+            liveSocket = socket;
+            liveFailures = 0;
+        });
+        socket.addEventListener("message", (event) => {
+            const data = JSON.parse(event.data);
+            if (!liveRequest || data.seq !== liveRequest.seq || data.error) return;
+            const wanted = liveRequest.method === "retrieval" ? "retrieval" : "word-by-word";
+            if (data.stage !== wanted) return;
+            const translatedText = data.stage === "retrieval"
+                ? (data.candidates[0] ? data.candidates[0].text : "")
+                : data.translated_text;
+            showTranslation(
+                liveRequest.text,
+                translatedText,
+                liveRequest.sourceLang,
+                liveRequest.targetLang,
+                liveRequest.method
+            );
+        });
+        socket.addEventListener("close", () => {
+            // Fall back to the Translate button until the server is reachable again;
+            // a server without WebSocket support never opens, so stop retrying then
+            if (liveSocket !== socket) liveFailures += 1;
+            liveSocket = null;
+            if (liveFailures < LIVE_MAX_FAILURES) {
+                setTimeout(connectLive, 5000 * 2 ** liveFailures);
+            }
+        });
+    }
+
+    function sendLive() {
+        const text = sourceTextarea.value.trim();
+        if (!text || !liveSocket || liveSocket.readyState !== WebSocket.OPEN) return;
+        liveSeq += 1;
+        liveRequest = {
+            seq: liveSeq,
+            text: text,
+            sourceLang: sourceLangSelect.value,
+            targetLang: targetLangSelect.value,
+            method: methodRetrieval.checked ? "retrieval" : "word-by-word"
+        };
+        liveSocket.send(JSON.stringify({
+            seq: liveRequest.seq,
+            text: text,
+            source_lang: liveRequest.sourceLang,
+            target_lang: liveRequest.targetLang
+        }));
+    }
+
+    sourceTextarea.addEventListener("input", () => {
+        clearTimeout(debounceTimer);
+        debounceTimer = setTimeout(sendLive, LIVE_DEBOUNCE_MS);
+    });
+
+    [sourceLangSelect, targetLangSelect, methodRetrieval, methodWbw].forEach(el => {
+        el.addEventListener("change", sendLive);
+    });
+
+    if ("WebSocket" in window) {
+        connectLive();
+    }
+
     // Trigger translate on Ctrl+Enter
     sourceTextarea.addEventListener("keydown", (e) => {
         if ((e.ctrlKey || e.metaKey) && e.key === "Enter") {
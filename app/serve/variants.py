@@ -0,0 +1,286 @@
+"""A/B and shadow serving of several training runs side by side.
+
+The latest run is the primary. Other runs listed under `serving.variants` are
+loaded next to it; a file that is the same file as one already loaded (often the
+fastText models or the bank, hard-linked or symlinked between runs) is loaded
+once and shared read-only. Each client key is assigned to a run by hashing, so a
+client keeps seeing the same run while the weights stay the same. Shadow runs
+also answer a sample of requests, off the request path, and never reply: a small
+bounded pool hands their work to the server's compute executor, so at most
+`workers` shadow evaluations hold it. Per-run latency, and agreement with the
+primary, show which run to roll out.
+"""
+
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import accumulate
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+from app.shared.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Recent latencies kept per run and kind for the exported percentiles
+_LATENCY_SAMPLES = 1024
+
+
+class SharedArtifacts:
+    """Loaded read-only artifacts keyed by the identity of the files they came from.
+
+    Keys pair a kind of artifact with the device, inode, size and mtime of each
+    input file, so two runs share an object when its files are the same file
+    (a hard link or symlink) at the same version. Only a `stat` per file is needed,
+    so keys are cheap however large the models are.
+    """
+
+    def __init__(self) -> None:
+        self.reused = 0
+        self._values: dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def identity(path: str) -> tuple[int, int, int, int] | None:
+        """(device, inode, size, mtime) of a file, or None when it does not exist."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+    def key(self, kind: str, paths: Sequence[str]) -> tuple:
+        return (kind, *(self.identity(p) for p in paths))
+
+    def get(self, key: tuple) -> Any | None:
+        with self._lock:
+            value = self._values.get(key)
+            if value is not None:
+                self.reused += 1
+            return value
+
+    def put(self, key: tuple, value: Any) -> None:
+        with self._lock:
+            self._values.setdefault(key, value)
+
+    def future(self, kind: str, paths: Sequence[str], load: Callable[[], Future]) -> Future:
+        """The future of an earlier identical load, or of `load()` started now."""
+        key = self.key(kind, paths)
+        future = self.get(key)
+        if future is None:
+            future = load()
+            self.put(key, future)
+        return future
+
+
+class VariantRouter:
+    """Assigns client keys to runs by weight and samples the runs to shadow.
+
+    Clients not assigned to a weighted run go to the primary. The primary also
+    re-answers `compare_rate` of the requests a weighted run served, so that run's
+    agreement is measured too.
+    """
+
+    def __init__(
+        self,
+        primary: str,
+        weights: dict[str, float],
+        shadows: dict[str, float],
+        compare_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        if sum(weights.values()) > 1:
+            raise ValueError(f"Variant weights add up to more than 1: {weights}")
+        self.primary = primary
+        self.weights = {run: w for run, w in weights.items() if w > 0}
+        self.shadows = {run: rate for run, rate in shadows.items() if rate > 0}
+        self.compare_rate = compare_rate
+        self._random = random.Random(seed)
+        self._bounds = list(
+            zip(self.weights, accumulate(self.weights.values()), strict=True)
+        )
+
+    @property
+    def primary_weight(self) -> float:
+        return 1 - sum(self.weights.values())
+
+    def assign(self, client_key: str) -> str:
+        """The run serving `client_key`, the same for as long as the weights are."""
+        digest = hashlib.sha1(client_key.encode("utf-8")).digest()
+        point = int.from_bytes(digest[:8], "big") / 2**64
+        for run, upper in self._bounds:
+            if point < upper:
+                return run
+        return self.primary
+
+    def shadow_runs(self, served: str) -> list[str]:
+        """Runs that should also answer a request `served` answered, off the request path."""
+        runs = [
+            run
+            for run, rate in self.shadows.items()
+            if run != served and self._random.random() < rate
+        ]
+        if served != self.primary and self._random.random() < self.compare_rate:
+            runs.append(self.primary)
+        return runs
+
+
+class RunMetrics:
+    """Latency and agreement counters for one run."""
+
+    def __init__(self) -> None:
+        self.served = 0
+        self.shadowed = 0
+        self.failed = 0
+        self.compared = 0
+        self.agreed = 0
+        self.served_s: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self.shadow_s: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+
+    def stats(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "served": self.served,
+            "shadowed": self.shadowed,
+            "failed": self.failed,
+        }
+        for kind, samples in (("served", self.served_s), ("shadow", self.shadow_s)):
+            ms = 1000 * np.array(samples) if samples else np.zeros(1)
+            out[f"{kind}_ms_p50"] = float(np.percentile(ms, 50))
+            out[f"{kind}_ms_p95"] = float(np.percentile(ms, 95))
+        out["compared"] = self.compared
+        out["agreement"] = self.agreed / self.compared if self.compared else None
+        return out
+
+
+class VariantServing:
+    """Routes requests between loaded runs and runs shadow evaluations in the background.
+
+    `runs` maps run names to their translators by direction and includes the
+    primary's dict, which may still gain lazily loaded directions. Shadow work
+    beyond `max_pending` queued evaluations is dropped rather than queued.
+    `compute` runs each evaluation and returns its result (the server passes its
+    compute executor); by default evaluations run on the shadow pool itself.
+    """
+
+    def __init__(
+        self,
+        primary: str,
+        runs: dict[str, dict[str, Any]],
+        router: VariantRouter,
+        workers: int = 1,
+        max_pending: int = 256,
+        compute: Callable[[Callable[[], Any]], Any] | None = None,
+    ) -> None:
+        self.primary = primary
+        self.runs = runs
+        self.router = router
+        self.max_pending = max_pending
+        self.pending = 0
+        self.dropped = 0
+        self._compute = compute or (lambda fn: fn())
+        self._metrics = {run: RunMetrics() for run in runs}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shadow")
+
+    def route(self, client_key: str, direction: str, primary: Any) -> tuple[str, Any]:
+        """(run, translator) answering `client_key`; the primary when its run lacks one."""
+        run = self.router.assign(client_key)
+        translator = self.runs[run].get(direction) if run != self.primary else None
+        if translator is None:
+            return self.primary, primary
+        return run, translator
+
+    def observe(self, run: str, seconds: float) -> None:
+        with self._lock:
+            metrics = self._metrics[run]
+            metrics.served += 1
+            metrics.served_s.append(seconds)
+
+    def shadow(
+        self,
+        served: str,
+        direction: str,
+        answer: Any,
+        evaluate: Callable[[Any], Any],
+    ) -> None:
+        """Has sampled runs compute `evaluate(translator)` off the request path.
+
+        Their answers are compared with `answer`, the one returned by `served`,
+        when one side is the primary; pass None as `answer` to record latency only.
+        """
+        for run in self.router.shadow_runs(served):
+            translator = self.runs[run].get(direction)
+            if translator is None:
+                continue
+            with self._lock:
+                if self.pending >= self.max_pending:
+                    self.dropped += 1
+                    continue
+                self.pending += 1
+            try:
+                self._pool.submit(self._evaluate, run, served, translator, answer, evaluate)
+            except RuntimeError:  # shutting down
+                with self._lock:
+                    self.pending -= 1
+
+    def _evaluate(
+        self,
+        run: str,
+        served: str,
+        translator: Any,
+        answer: Any,
+        evaluate: Callable[[Any], Any],
+    ) -> None:
+        def timed() -> tuple[Any, float]:
+            # Timed where it runs, so waiting for a compute slot is not counted
+            start = time.perf_counter()
+            return evaluate(translator), time.perf_counter() - start
+
+        try:
+            try:
+                output, seconds = self._compute(timed)
+            except Exception:
+                logger.exception("Shadow evaluation on %s failed.", run)
+                with self._lock:
+                    self._metrics[run].failed += 1
+                return
+            with self._lock:
+                metrics = self._metrics[run]
+                metrics.shadowed += 1
+                metrics.shadow_s.append(seconds)
+                # Agreement is always that of a non-primary run with the primary
+                if answer is not None and self.primary in (run, served):
+                    compared = self._metrics[served if run == self.primary else run]
+                    compared.compared += 1
+                    compared.agreed += output == answer
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            runs = {
+                run: {
+                    "weight": self.router.primary_weight
+                    if run == self.primary
+                    else self.router.weights.get(run, 0.0),
+                    "shadow_rate": self.router.shadows.get(run, 0.0),
+                }
+                | metrics.stats()
+                for run, metrics in self._metrics.items()
+            }
+            return {
+                "primary": self.primary,
+                "pending": self.pending,
+                "dropped": self.dropped,
+                "runs": runs,
+            }
+
+    def close(self) -> None:
+        """Stops the shadow pool; queued evaluations are discarded."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
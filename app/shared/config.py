@@ -28,6 +28,8 @@ _cfg = _load()
 _paths = _cfg["paths"]
 _train = _cfg["training"]
 _ds = _cfg.get("datasets", {})
+_serve = _cfg.get("serving", {})
+_sources = _cfg.get("data_sources", {})
 
 # ── Directories & files ───────────────────────────────────────────────────
 PARALLEL_DATA_DIR: str = _abs(_paths["parallel_data_dir"])
@@ -35,6 +37,11 @@ MODELS_DIR: str = _abs(_paths["models_dir"])
 MONOLINGUAL_DIR: str = _abs(_paths["monolingual_dir"])
 SEED_DICTIONARY_PATH: str = _abs(_paths["seed_dictionary"])
 FEEDBACK_FILE_PATH: str = _abs(_paths["feedback_file"])
+FEEDBACK_DB_PATH: str = _abs(_paths.get("feedback_db", "data/feedback.sqlite3"))
+JOBS_DIR: str = _abs(_paths.get("jobs_dir", "data/jobs"))
+
+# Domain name -> directory; a CSV belongs to the deepest source directory containing it
+DATA_SOURCES: dict[str, str] = {name: _abs(path) for name, path in _sources.items()}
 
 TRAIN_KI_TXT: str = str(Path(MONOLINGUAL_DIR) / "train.kikuyu")
 TRAIN_EN_TXT: str = str(Path(MONOLINGUAL_DIR) / "train.english")
@@ -50,6 +57,86 @@ ALIGNMENT_REFINEMENT_ITERS: int = int(_train["alignment_refinement_iters"])
 FASTTEXT_MINN: int = int(_train.get("fasttext_minn", 3))
 FASTTEXT_MAXN: int = int(_train.get("fasttext_maxn", 6))
 VAL_SIZE: int = int(_train["val_size"])
+PCA_COMPONENTS: int = int(_train.get("pca_components", 64))
+
+# ── Serving ───────────────────────────────────────────────────────────────
+SENTENCE_INDEX: str = str(_serve.get("sentence_index", "exact"))
+PQ_RERANK_FACTOR: int = int(_serve.get("pq_rerank_factor", 10))
+CASCADE_SHORTLIST: int = int(_serve.get("cascade_shortlist", 200))
+SHARDS: int = int(_serve.get("shards", 4))
+SHARD_TIMEOUT_MS: int = int(_serve.get("shard_timeout_ms", 500))
+DOCUMENT_MAX_BYTES: int = int(_serve.get("document_max_bytes", 262_144))
+DOCUMENT_BATCH_SIZE: int = int(_serve.get("document_batch_size", 32))
+LRU_CACHE_ENTRIES: int = int(_serve.get("lru_cache_entries", 4096))
+LRU_CACHE_TTL_S: float = float(_serve.get("lru_cache_ttl_s", 3600))
+RESULT_CACHE: bool = bool(_serve.get("result_cache", False))
+RESULT_CACHE_PATH: str = _abs(_serve.get("result_cache_path", "data/cache/results.sqlite3"))
+RESULT_CACHE_MAX_ENTRIES: int = int(_serve.get("result_cache_max_entries", 100_000))
+BANK_COMPACT_SEGMENTS: int = int(_serve.get("bank_compact_segments", 8))
+BANK_SYNC_INTERVAL_S: float = float(_serve.get("bank_sync_interval_s", 1.0))
+DIRECTIONS: list[str] = [str(d) for d in _serve.get("directions", ["ki_en", "en_ki"])]
+if not DIRECTIONS or set(DIRECTIONS) - {"ki_en", "en_ki"}:
+    raise ValueError(
+        f"serving.directions must list 'ki_en' and/or 'en_ki', got {DIRECTIONS}"
+    )
+LAZY_DIRECTIONS: bool = bool(_serve.get("lazy_directions", False))
+STARTUP_WORKERS: int = int(_serve.get("startup_workers", 4))
+ADMISSION: bool = bool(_serve.get("admission", True))
+ADMISSION_CONCURRENCY: dict[str, int] = {
+    name: int(limit)
+    for name, limit in _serve.get(
+        "admission_concurrency",
+        {
+            "translate": 8,
+            "candidates": 8,
+            "document": 2,
+            "batch": 2,
+            "candidates_batch": 2,
+            "embed": 2,
+        },
+    ).items()
+}
+ADMISSION_MAX_QUEUE: int = int(_serve.get("admission_max_queue", 64))
+ADMISSION_LATENCY_BUDGET_MS: int = int(_serve.get("admission_latency_budget_ms", 1000))
+LATENCY_SLO_MS: float = float(_serve.get("latency_slo_ms", 0))
+ADAPTIVE_SHORTLIST: int = int(_serve.get("adaptive_shortlist", 50))
+ADAPTIVE_REDUCED_EF: int = int(_serve.get("adaptive_reduced_ef", 16))
+ADAPTIVE_PROBE_S: float = float(_serve.get("adaptive_probe_s", 5.0))
+WORD_TABLE_SIZE: int = int(_serve.get("word_table_size", 10_000))
+RATE_LIMIT_PER_S: float = float(_serve.get("rate_limit_per_s", 0))
+RATE_LIMIT_BURST: float = float(_serve.get("rate_limit_burst", 40))
+TRUSTED_PROXIES: frozenset[str] = frozenset(
+    str(p) for p in _serve.get("trusted_proxies", None) or []
+)
+COMPUTE_WORKERS: int = int(_serve.get("compute_workers", 0)) or os.cpu_count() or 1
+BLAS_THREADS: dict[str, int] = {
+    site: max(1, int(threads))
+    for site, threads in (
+        {"query": 1, "batch": 1} | (_serve.get("blas_threads") or {})
+    ).items()
+}
+HNSW_THREADS: int = int(_serve.get("hnsw_threads", 1))
+FEEDBACK_FSYNC_S: float = float(_serve.get("feedback_fsync_s", 1.0))
+FEEDBACK_ROTATE_MB: float = float(_serve.get("feedback_rotate_mb", 64))
+FEEDBACK_ROTATE_HOURS: float = float(_serve.get("feedback_rotate_hours", 24))
+FEEDBACK_MAX_PENDING: int = int(_serve.get("feedback_max_pending", 10_000))
+JOB_WORKERS: int = int(_serve.get("job_workers", 1))
+JOB_BATCH_SIZE: int = int(_serve.get("job_batch_size", 64))
+JOB_MAX_MB: float = float(_serve.get("job_max_mb", 100))
+BATCH_MAX_TEXTS: int = int(_serve.get("batch_max_texts", 10_000))
+# Run name under MODELS_DIR -> {"weight": share of clients, "shadow": share of requests}
+VARIANTS: dict[str, dict[str, float]] = {
+    str(run): {
+        "weight": float((options or {}).get("weight", 0)),
+        "shadow": float((options or {}).get("shadow", 0)),
+    }
+    for run, options in (_serve.get("variants") or {}).items()
+}
+if sum(v["weight"] for v in VARIANTS.values()) > 1:
+    raise ValueError(f"serving.variants weights must add up to at most 1, got {VARIANTS}")
+VARIANT_COMPARE_RATE: float = float(_serve.get("variant_compare_rate", 0.1))
+SHADOW_WORKERS: int = int(_serve.get("shadow_workers", 1))
+SHADOW_MAX_PENDING: int = int(_serve.get("shadow_max_pending", 256))
 
 # ── HuggingFace repos ─────────────────────────────────────────────────────
 REPO_CGIAR: str = str(_ds.get("repo_cgiar", "CGIAR/KikuyuEnglish_translation"))
@@ -81,3 +168,16 @@ TGT_EMBS_KI_PATH: str = os.path.join(LATEST_RUN_DIR, "tgt_embs_ki.npy")
 TGT_EMBS_EN_PATH: str = os.path.join(LATEST_RUN_DIR, "tgt_embs_en.npy")
 METRICS_JSON_PATH: str = os.path.join(LATEST_RUN_DIR, "evaluation_metrics.json")
 SP_MODEL_PATH: str = os.path.join(LATEST_RUN_DIR, "sentencepiece.model")
+PCA_KI_PATH: str = os.path.join(LATEST_RUN_DIR, "pca_ki.npz")
+PCA_EN_PATH: str = os.path.join(LATEST_RUN_DIR, "pca_en.npz")
+PQ_INDEX_KI_PATH: str = os.path.join(LATEST_RUN_DIR, "pq_ki.npz")
+PQ_INDEX_EN_PATH: str = os.path.join(LATEST_RUN_DIR, "pq_en.npz")
+PQ_REPORT_PATH: str = os.path.join(LATEST_RUN_DIR, "pq_report.json")
+# String-store stems: <stem>.data.npy + <stem>.offsets.npy
+BANK_STRINGS_KI_PATH: str = os.path.join(LATEST_RUN_DIR, "bank_ki")
+BANK_STRINGS_EN_PATH: str = os.path.join(LATEST_RUN_DIR, "bank_en")
+BANK_DOMAINS_PATH: str = os.path.join(LATEST_RUN_DIR, "bank_domains.npz")
+HNSW_CONFIG_PATH: str = os.path.join(LATEST_RUN_DIR, "hnsw_config.json")
+SHARD_LAYOUT_KI_PATH: str = os.path.join(LATEST_RUN_DIR, "shards_ki.json")
+SHARD_LAYOUT_EN_PATH: str = os.path.join(LATEST_RUN_DIR, "shards_en.json")
+BANK_ADDITIONS_PATH: str = os.path.join(LATEST_RUN_DIR, "bank_additions.jsonl")
@@ -0,0 +1,140 @@
+"""Compares request throughput under different compute thread and BLAS settings.
+
+Replays corpus sentences through one direction of the latest run from
+`--clients` concurrent callers (standing in for Starlette's threadpool), once per
+configuration:
+
+- ``threadpool``: compute runs on the caller threads with the BLAS default
+  (one thread per core), as before the compute executor existed;
+- ``threadpool+blas1``: the same with BLAS limited to one thread;
+- ``executor``: compute goes through a `ComputeExecutor` of `--workers` threads
+  with ``--blas-threads`` BLAS threads per task (each value is one configuration).
+
+    uv run python -m scripts.benchmark_compute --clients 40 --requests 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+import numpy as np
+
+from app.api.embeddings import CrossLingualTranslator
+from app.serve import main as serving
+from app.serve.compute import ComputeExecutor, find_blas_libraries
+from app.shared import config
+from app.shared.logger import setup_logger
+from scripts.evaluate import load_all_parallel_csvs
+
+logger = setup_logger(__name__)
+
+
+def make_query(translator: CrossLingualTranslator, method: str) -> Callable[[str], Any]:
+    """One uncached request's compute, as the endpoints run it."""
+    if method == "word-by-word":
+        return translator.translate_word_by_word
+    return lambda text: translator.retrieve_top_k(text, 5)
+
+
+def run_config(
+    query: Callable[[str], Any],
+    texts: list[str],
+    clients: int,
+    executor: ComputeExecutor | None,
+) -> dict[str, float]:
+    """Throughput and latency percentiles of `texts` sent by `clients` callers."""
+
+    def request(text: str) -> float:
+        start = time.perf_counter()
+        if executor is None:
+            query(text)
+        else:
+            executor.run("query", query, text)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as callers:
+        latencies_ms = 1000 * np.array(list(callers.map(request, texts)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests_per_s": round(len(texts) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--direction", default="ki_en", choices=["ki_en", "en_ki"])
+    parser.add_argument(
+        "--method", default="retrieval", choices=["retrieval", "word-by-word"]
+    )
+    parser.add_argument("--clients", type=int, default=40, help="Concurrent callers")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--blas-threads",
+        type=int,
+        nargs="+",
+        default=sorted({1, os.cpu_count() or 1}),
+        help="BLAS threads per executor task; one configuration per value",
+    )
+    args = parser.parse_args()
+
+    # Only the benchmarked direction, and no caches: every request computes
+    config.DIRECTIONS = [args.direction]
+    config.RESULT_CACHE = False
+    config.LRU_CACHE_ENTRIES = 0
+    if not serving.preload():
+        logger.error("Models failed to load. Train models first.")
+        return
+    translator = serving.app.state.translators[args.direction]
+    all_ki, all_en = load_all_parallel_csvs(config.PARALLEL_DATA_DIR)
+    sources = all_ki if args.direction == "ki_en" else all_en
+    rng = random.Random(0)
+    texts = [sources[rng.randrange(len(sources))] for _ in range(args.requests)]
+    query = make_query(translator, args.method)
+    libraries = find_blas_libraries()
+    cores = os.cpu_count() or 1
+
+    results = []
+    for name, blas_threads, executor in [
+        ("threadpool", cores, None),
+        ("threadpool+blas1", 1, None),
+        *(
+            (
+                f"executor x{args.workers}, blas {n}",
+                n,
+                ComputeExecutor(args.workers, {"query": n}, libraries),
+            )
+            for n in args.blas_threads
+        ),
+    ]:
+        if executor is None:
+            # Callers run compute themselves under a fixed process-wide BLAS setting
+            for library in libraries:
+                library.set_threads(blas_threads)
+        run_config(query, texts[: max(1, len(texts) // 10)], args.clients, executor)
+        stats = run_config(query, texts, args.clients, executor)
+        if executor is not None:
+            executor.shutdown()
+        results.append({"config": name, "blas_threads": blas_threads, **stats})
+        logger.info("%-28s %s", name, stats)
+
+    report = {
+        "direction": args.direction,
+        "method": args.method,
+        "clients": args.clients,
+        "cores": cores,
+        "blas_libraries": [os.path.basename(lib.path) for lib in libraries],
+        "results": results,
+    }
+    logger.info("Compute benchmark:\n%s", json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
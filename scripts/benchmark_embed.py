@@ -0,0 +1,102 @@
+"""Measures `/embed` throughput on large batches of corpus sentences.
+
+For each batch size it reports sentences per second for:
+
+- ``per_sentence``: `embed_query` one sentence at a time, as downstream code
+  reimplementing the embedding and projection did;
+- ``batched``: `embed_queries`, the path `/embed` uses (one lookup per distinct token
+  and one projection per batch);
+- ``http_json`` / ``http_npy``: the whole `/embed` request in-process, answered as
+  JSON or as a float16 ``.npy`` file.
+
+    uv run python -m scripts.benchmark_embed --sizes 1000 10000
+"""
+
+import argparse
+import json
+import random
+import time
+from functools import partial
+from typing import Any, Callable
+
+from fastapi.testclient import TestClient
+
+from app.serve import main as serving
+from app.shared import config
+from app.shared.logger import setup_logger
+from scripts.evaluate import load_all_parallel_csvs
+
+logger = setup_logger(__name__)
+
+
+def rate(fn: Callable[[], Any], count: int) -> float:
+    """Sentences per second for one call of `fn` over `count` sentences."""
+    start = time.perf_counter()
+    fn()
+    return round(count / (time.perf_counter() - start), 1)
+
+
+def per_sentence(translator: Any, texts: list[str]) -> None:
+    for text in texts:
+        translator.embed_query(text)
+
+
+def post_embed(client: TestClient, body: dict[str, Any], accept: str) -> bytes:
+    return client.post("/embed", json=body, headers={"accept": accept}).content
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000])
+    parser.add_argument("--lang", default="ki", choices=["ki", "en"])
+    args = parser.parse_args()
+
+    # Only the direction projecting `--lang` into the other language's space
+    space = "en" if args.lang == "ki" else "ki"
+    config.DIRECTIONS = [f"{args.lang}_{space}"]
+    config.BATCH_MAX_TEXTS = max(config.BATCH_MAX_TEXTS, *args.sizes)
+    if not serving.preload():
+        logger.error("Models failed to load. Train models first.")
+        return
+    # A benchmark client would be rate limited like any other
+    serving.app.state.admission = None
+    translator = serving.app.state.translators[config.DIRECTIONS[0]]
+    client = TestClient(serving.app)
+
+    all_ki, all_en = load_all_parallel_csvs(config.PARALLEL_DATA_DIR)
+    sources = [s[:2000] for s in (all_ki if args.lang == "ki" else all_en) if s]
+    rng = random.Random(0)
+
+    results = []
+    for size in args.sizes:
+        texts = [sources[rng.randrange(len(sources))] for _ in range(size)]
+        body = {"texts": texts, "lang": args.lang, "space": space}
+        row = {
+            "batch_size": size,
+            "per_sentence": rate(partial(per_sentence, translator, texts), size),
+            "batched": rate(partial(translator.embed_queries, texts), size),
+            "http_json": rate(partial(post_embed, client, body, "application/json"), size),
+            "http_npy": rate(
+                partial(
+                    post_embed,
+                    client,
+                    {**body, "dtype": "float16"},
+                    serving.NPY_MEDIA_TYPE,
+                ),
+                size,
+            ),
+        }
+        results.append(row)
+        logger.info("%s", row)
+
+    report = {
+        "lang": args.lang,
+        "space": space,
+        "dim": int(translator.projection_matrix.shape[0]),
+        "results": results,
+    }
+    logger.info("Embedding throughput (sentences/s):\n%s", json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
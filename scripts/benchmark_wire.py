@@ -0,0 +1,105 @@
+"""Compares JSON and binary-frame serialization cost for the batch endpoints.
+
+For each batch size, a `/translate/candidates/batch` round trip is serialized
+both ways without any model work. The request is encoded by the client and
+parsed and validated by the server. The k candidates per text are built into the
+response, encoded by the server and decoded by the client. JSON goes through
+the same Pydantic models and `json` calls as FastAPI; binary uses
+`app.serve.binary` frames. Texts are corpus sentences (synthetic when the corpus
+is missing).
+
+    uv run python -m scripts.benchmark_wire --sizes 1 100 10000
+"""
+
+import argparse
+import json
+import random
+import time
+from functools import partial
+from typing import Any, Callable
+
+from app.serve.binary import decode_batch, encode_batch
+from app.serve.main import (
+    BatchCandidatesRequest,
+    BatchCandidatesResponse,
+    TranslationCandidate,
+)
+from app.shared import config
+from app.shared.logger import setup_logger
+from scripts.evaluate import load_all_parallel_csvs
+
+logger = setup_logger(__name__)
+
+OPTIONS = {"source_lang": "ki", "target_lang": "en", "k": 5}
+
+
+def json_round_trip(texts: list[str], hits: list[list[tuple[str, float]]]) -> int:
+    body = json.dumps({**OPTIONS, "texts": texts}).encode("utf-8")
+    request = BatchCandidatesRequest.model_validate_json(body)
+    response = BatchCandidatesResponse(
+        results=[[TranslationCandidate(text=t, score=s) for t, s in row] for row in hits],
+        source_lang=request.source_lang,
+        target_lang=request.target_lang,
+    )
+    payload = json.dumps(response.model_dump(mode="json"), ensure_ascii=False).encode()
+    json.loads(payload)
+    return len(body) + len(payload)
+
+
+def binary_round_trip(texts: list[str], hits: list[list[tuple[str, float]]]) -> int:
+    body = encode_batch(OPTIONS, texts)
+    header, decoded, _, _ = decode_batch(body)
+    request = BatchCandidatesRequest.model_validate(header | {"texts": decoded})
+    payload = encode_batch(
+        {"source_lang": request.source_lang, "target_lang": request.target_lang},
+        [t for row in hits for t, _ in row],
+        [len(row) for row in hits],
+        [s for row in hits for _, s in row],
+    )
+    decode_batch(payload)
+    return len(body) + len(payload)
+
+
+def measure(fn: Callable[[], int], min_seconds: float) -> dict[str, Any]:
+    """Median milliseconds per call over repeated runs of at least `min_seconds`."""
+    size = fn()
+    timings = []
+    deadline = time.perf_counter() + min_seconds
+    while len(timings) < 3 or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {"ms": round(1000 * timings[len(timings) // 2], 3), "bytes": size}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time per case")
+    args = parser.parse_args()
+
+    ki, en = load_all_parallel_csvs(config.PARALLEL_DATA_DIR)
+    sources = [s[:2000] for s in ki if s] or [f"Mũndũ ũmwe nĩ {i}" for i in range(1000)]
+    targets = [s[:2000] for s in en if s] or [f"One person {i}" for i in range(1000)]
+    rng = random.Random(0)
+
+    results = []
+    for size in args.sizes:
+        texts = [sources[rng.randrange(len(sources))] for _ in range(size)]
+        hits = [
+            [(targets[rng.randrange(len(targets))], rng.random()) for _ in range(5)]
+            for _ in texts
+        ]
+        row: dict[str, Any] = {"batch_size": size}
+        for name, fn in (("json", json_round_trip), ("binary", binary_round_trip)):
+            row[name] = measure(partial(fn, texts, hits), args.seconds)
+        row["speedup"] = round(row["json"]["ms"] / max(row["binary"]["ms"], 1e-6), 1)
+        results.append(row)
+        logger.info("%s", row)
+
+    logger.info("Serialization benchmark:\n%s", json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
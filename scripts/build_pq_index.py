@@ -0,0 +1,145 @@
+"""Trains product-quantization sentence indexes for the latest run and reports their quality.
+
+Indexes are built from the run's saved bank embeddings (``tgt_embs_*.npy``), so
+their rows line up with the bank the server loads; the sentences, in the same
+domain-aware order as training, are only embedded again when those are missing.
+"""
+
+import argparse
+import json
+import os
+import time
+
+import fasttext
+import numpy as np
+
+from app.api.bank import load_parallel_bank
+from app.api.embeddings import (
+    get_sentence_embedding,
+    get_sentence_embeddings_parallel,
+    streamed_csls_penalty,
+)
+from app.api.pq import PQSentenceIndex, evaluate_pq_recall
+from app.api.retrieval import normalize_rows
+from app.shared import config
+from app.shared.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def load_or_embed_bank(model_path: str, sentences: list[str], embs_path: str) -> np.ndarray:
+    """Reuses the run's precomputed bank embeddings, computing and saving them if absent.
+
+    Saved embeddings are memory-mapped rather than read into RAM.
+    """
+    if os.path.exists(embs_path):
+        embs = np.load(embs_path, mmap_mode="r")
+        if len(embs) == len(sentences):
+            return embs  # type: ignore[no-any-return]
+        logger.warning(
+            "%s has %d rows but the bank has %d sentences; recomputing.",
+            embs_path,
+            len(embs),
+            len(sentences),
+        )
+    logger.info("Embedding %d bank sentences with %s...", len(sentences), model_path)
+    embs = get_sentence_embeddings_parallel(model_path, sentences, dim=config.EMBEDDING_DIM)
+    np.save(embs_path, embs.astype(np.float32))
+    return embs  # type: ignore[no-any-return]
+
+
+def build_direction(
+    src_model: fasttext.FastText._FastText,
+    projection: np.ndarray,
+    bank_embs: np.ndarray,
+    queries: list[str],
+    out_path: str,
+    args: argparse.Namespace,
+) -> dict[str, float]:
+    """Builds, saves and evaluates the PQ index for one translation direction."""
+    penalty = streamed_csls_penalty(bank_embs, [bank_embs], k=10)
+
+    start = time.perf_counter()
+    index = PQSentenceIndex.build(
+        bank_embs,
+        penalty,
+        n_subvectors=args.subvectors,
+        n_centroids=args.centroids,
+        n_iter=args.iters,
+    )
+    build_seconds = time.perf_counter() - start
+    index.save(out_path)
+
+    projected = np.array([
+        projection @ get_sentence_embedding(src_model, q) for q in queries
+    ])
+    query_vecs = normalize_rows(projected)
+    report: dict[str, float] = {
+        "rows": len(index),
+        "subvectors": index.quantizer.m,
+        "centroids": index.quantizer.n_centroids,
+        "build_seconds": build_seconds,
+        "compression_ratio": index.compression_ratio(),
+    }
+    index.rerank_vectors = None
+    report.update({
+        f"adc_{k}": v for k, v in evaluate_pq_recall(index, bank_embs, query_vecs).items()
+    })
+    index.rerank_vectors = bank_embs
+    report.update({
+        f"reranked_{k}": v
+        for k, v in evaluate_pq_recall(index, bank_embs, query_vecs).items()
+    })
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subvectors", type=int, default=50, help="PQ sub-spaces (m)")
+    parser.add_argument(
+        "--centroids", type=int, default=256, help="Centroids per sub-space"
+    )
+    parser.add_argument("--iters", type=int, default=20, help="k-means iterations")
+    args = parser.parse_args()
+
+    for path in [
+        config.KI_MODEL_PATH,
+        config.EN_MODEL_PATH,
+        config.PROJ_KI_EN_PATH,
+        config.PROJ_EN_KI_PATH,
+    ]:
+        if not os.path.exists(path):
+            logger.error("Required file %s is missing. Train models first.", path)
+            return
+
+    # The same rows, in the same order, as training used for the saved bank
+    all_ki, all_en, _ = load_parallel_bank(config.PARALLEL_DATA_DIR, config.DATA_SOURCES)
+    val_size = config.VAL_SIZE
+    bank_ki, bank_en = all_ki[:-val_size], all_en[:-val_size]
+    val_ki, val_en = all_ki[-val_size:], all_en[-val_size:]
+
+    ki_model = fasttext.load_model(config.KI_MODEL_PATH)
+    en_model = fasttext.load_model(config.EN_MODEL_PATH)
+    W_ki_en = np.load(config.PROJ_KI_EN_PATH)
+    W_en_ki = np.load(config.PROJ_EN_KI_PATH)
+
+    embs_en = load_or_embed_bank(config.EN_MODEL_PATH, bank_en, config.TGT_EMBS_EN_PATH)
+    embs_ki = load_or_embed_bank(config.KI_MODEL_PATH, bank_ki, config.TGT_EMBS_KI_PATH)
+
+    report = {
+        "kikuyu_to_english": build_direction(
+            ki_model, W_ki_en, embs_en, val_ki, config.PQ_INDEX_EN_PATH, args
+        ),
+        "english_to_kikuyu": build_direction(
+            en_model, W_en_ki, embs_ki, val_en, config.PQ_INDEX_KI_PATH, args
+        ),
+    }
+
+    with open(config.PQ_REPORT_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logger.info("PQ index report:\n%s", json.dumps(report, indent=2))
+    logger.info("Saved PQ report to %s", config.PQ_REPORT_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Exports positively rated feedback pairs as a parallel CSV for the corpus.
+
+Pairs whose ratings sum to at least `--min-net` are written with the
+`Kikuyu,English` header used under `data/parallel`; review the file, then move it
+into a `data/parallel` source folder to train on it. `--ingest` first adds the
+JSONL feedback logs (including rotated ones) to the store, e.g. feedback logged
+before the store existed; entries already stored are skipped.
+
+    uv run python -m scripts.export_feedback --ingest
+"""
+
+import argparse
+import glob
+import os
+
+from app.serve.feedback import FeedbackStore
+from app.shared import config
+from app.shared.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--output",
+        default=os.path.join(config.DATA_DIR, "processed", "feedback_pairs.csv"),
+    )
+    parser.add_argument(
+        "--min-net", type=int, default=1, help="Minimum sum of ratings for a pair"
+    )
+    parser.add_argument(
+        "--ingest", action="store_true", help="Add the JSONL feedback logs first"
+    )
+    args = parser.parse_args()
+
+    store = FeedbackStore(config.FEEDBACK_DB_PATH)
+    if args.ingest:
+        logs = [config.FEEDBACK_FILE_PATH, *glob.glob(f"{config.FEEDBACK_FILE_PATH}.*")]
+        for path in sorted(
+            p for p in logs if os.path.isfile(p) and not p.endswith(".lock")
+        ):
+            logger.info("Ingested %d new entries from %s.", store.ingest_jsonl(path), path)
+
+    count = store.export_positive_pairs(args.output, args.min_net)
+    logger.info("Exported %d positively rated pairs to %s.", count, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Serves the API from several worker processes that share one copy of the models.
+
+The models are loaded once in this parent process, then N workers are forked from
+it. The read-only arrays (embeddings, projections, indexes, string stores) stay on
+pages shared copy-on-write, so each extra worker costs its unique memory (USS)
+rather than a full model load. Linux/macOS only (needs `os.fork`).
+
+    uv run python -m scripts.serve --workers 4 --port 8000
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+
+from app.serve import main as serving
+from app.serve.startup import current_rss_mb, unique_memory_mb
+from app.shared import config
+from app.shared.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """One listening socket, inherited by every worker so the kernel spreads accepts."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, log_level: str) -> None:
+    """Runs uvicorn on the inherited socket in a forked child; never returns."""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    server = uvicorn.Server(uvicorn.Config(serving.app, log_level=log_level))
+    try:
+        server.run(sockets=[sock])
+    finally:
+        os._exit(0)
+
+
+def spawn(sock: socket.socket, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        run_worker(sock, log_level)
+    logger.info("Started worker %d.", pid)
+    return pid
+
+
+def report_memory(workers: list[int]) -> None:
+    """Logs each worker's unique memory; the rest of its RSS is shared with the parent."""
+    parts = []
+    for pid in workers:
+        uss = unique_memory_mb(pid)
+        parts.append(f"{pid}: {'n/a' if uss is None else f'{uss:.0f}MB'}")
+    logger.info("Parent RSS %.0fMB; worker USS %s.", current_rss_mb(), ", ".join(parts))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=60.0,
+        help="Seconds between per-worker memory reports (0 disables them)",
+    )
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if config.SENTENCE_INDEX == "sharded":
+        # Shard workers are processes with pipes owned by the parent; forked servers
+        # would share them. Use plain uvicorn for sharded serving.
+        logger.error("sentence_index 'sharded' is not supported with preforked workers.")
+        return
+    if config.LAZY_DIRECTIONS:
+        logger.warning(
+            "Lazy directions are loaded per worker after the fork and are not shared."
+        )
+
+    if not serving.preload():
+        logger.error("Models failed to load; see the startup report above.")
+        return
+    # Move everything loaded so far out of the collector's reach: a collection in a
+    # worker would otherwise write to the GC headers of every object it scans,
+    # copying the pages holding them.
+    gc.collect()
+    gc.freeze()
+    logger.info(
+        "Models loaded (RSS %.0fMB); forking %d workers.", current_rss_mb(), args.workers
+    )
+
+    sock = bind_socket(args.host, args.port)
+    workers = [spawn(sock, args.log_level) for _ in range(args.workers)]
+
+    stopping = False
+
+    def stop(signum: int, _frame: object) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    last_report = time.monotonic()
+    while workers:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            workers.remove(pid)
+            if not stopping:
+                logger.warning("Worker %d exited (status %d); restarting it.", pid, status)
+                workers.append(spawn(sock, args.log_level))
+            continue
+        if args.report_interval and time.monotonic() - last_report >= args.report_interval:
+            report_memory(workers)
+            last_report = time.monotonic()
+        time.sleep(0.5)
+    sock.close()
+    logger.info("All workers stopped.")
+
+
+if __name__ == "__main__":
+    main()
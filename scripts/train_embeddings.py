@@ -14,6 +14,7 @@ import fasttext
 import numpy as np
 import pandas as pd
 
+from app.api.bank import load_parallel_bank
 from app.api.embeddings import (
     CrossLingualTranslator,
     extract_identical_string_dictionary,
@@ -23,6 +24,8 @@ from app.api.embeddings import (
     iterative_procrustes,
     learn_alignment_matrix,
 )
+from app.api.retrieval import PCABasis
+from app.api.strings import LabelArray, StringStore
 from app.shared import config
 from app.shared.logger import setup_logger
 from scripts.evaluate import calculate_translation_scores, evaluate_retrieval_accuracy
@@ -49,28 +52,6 @@ def load_sentences(tsv_path: str) -> tuple[list[str], list[str]]:
     return ki_list, en_list
 
 
-def load_all_parallel_csvs(parallel_dir: str) -> tuple[list[str], list[str]]:
-    """Loads all parallel CSV files from a directory, returning (ki_list, en_list)."""
-    ki_list: list[str] = []
-    en_list: list[str] = []
-    csv_files = sorted(Path(parallel_dir).rglob("*.csv"))
-    if not csv_files:
-        raise FileNotFoundError(f"No CSV files found in {parallel_dir}")
-    for csv_path in csv_files:
-        with open(csv_path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                ki = row.get("Kikuyu", "").strip()
-                en = row.get("English", "").strip()
-                if ki and en:
-                    ki_list.append(ki)
-                    en_list.append(en)
-    logger.info(
-        f"Loaded {len(ki_list)} sentence pairs from {len(csv_files)} CSV files in {parallel_dir}"
-    )
-    return ki_list, en_list
-
-
 def write_monolingual_txt(sentences: list[str], path: str) -> None:
     """Writes one sentence per line to a plain-text file for FastText training."""
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -158,6 +139,18 @@ def setup_and_get_state() -> tuple[dict, str]:
         config.TGT_EMBS_EN_PATH = os.path.join(new_run, "tgt_embs_en.npy")
         config.METRICS_JSON_PATH = os.path.join(new_run, "evaluation_metrics.json")
         config.SP_MODEL_PATH = os.path.join(new_run, "sentencepiece.model")
+        config.PCA_KI_PATH = os.path.join(new_run, "pca_ki.npz")
+        config.PCA_EN_PATH = os.path.join(new_run, "pca_en.npz")
+        config.PQ_INDEX_KI_PATH = os.path.join(new_run, "pq_ki.npz")
+        config.PQ_INDEX_EN_PATH = os.path.join(new_run, "pq_en.npz")
+        config.PQ_REPORT_PATH = os.path.join(new_run, "pq_report.json")
+        config.BANK_STRINGS_KI_PATH = os.path.join(new_run, "bank_ki")
+        config.BANK_STRINGS_EN_PATH = os.path.join(new_run, "bank_en")
+        config.BANK_DOMAINS_PATH = os.path.join(new_run, "bank_domains.npz")
+        config.HNSW_CONFIG_PATH = os.path.join(new_run, "hnsw_config.json")
+        config.SHARD_LAYOUT_KI_PATH = os.path.join(new_run, "shards_ki.json")
+        config.SHARD_LAYOUT_EN_PATH = os.path.join(new_run, "shards_en.json")
+        config.BANK_ADDITIONS_PATH = os.path.join(new_run, "bank_additions.jsonl")
         state_file = os.path.join(new_run, "training_state.json")
         state = {"status": "in_progress", "steps": []}
         with open(state_file, "w", encoding="utf-8") as f:
@@ -193,11 +186,15 @@ def main() -> None:
 
     # Load all parallel CSVs and split: last VAL_SIZE pairs held out for evaluation
     parallel_dir = config.PARALLEL_DATA_DIR
-    all_ki, all_en = load_all_parallel_csvs(parallel_dir)
+    all_ki, all_en, all_domains = load_parallel_bank(parallel_dir, config.DATA_SOURCES)
+    if not all_ki:
+        raise FileNotFoundError(f"No parallel sentence pairs found in {parallel_dir}")
+    logger.info(f"Loaded {len(all_ki)} sentence pairs from {parallel_dir}")
 
     VAL_SIZE = config.VAL_SIZE
     train_ki_sentences = all_ki[:-VAL_SIZE]
     train_en_sentences = all_en[:-VAL_SIZE]
+    train_domains = all_domains[:-VAL_SIZE]
     val_ki = all_ki[-VAL_SIZE:]
     val_en = all_en[-VAL_SIZE:]
     logger.info(
@@ -332,7 +329,49 @@ def main() -> None:
             state["steps"].append("align_models")
             save_state(state_file, state)
 
-    # 3. Full evaluation on the held-out val set
+    # 3. Retrieval artifacts: the served sentence banks and their PCA bases
+    retrieval_paths = [
+        config.TGT_EMBS_KI_PATH,
+        config.TGT_EMBS_EN_PATH,
+        config.PCA_KI_PATH,
+        config.PCA_EN_PATH,
+    ]
+    if all(os.path.exists(p) for p in retrieval_paths):
+        logger.info("Retrieval artifacts already exist. Skipping bank embedding.")
+    else:
+        for sentences, model_path, embs_path, pca_path in [
+            (
+                train_en_sentences,
+                config.EN_MODEL_PATH,
+                config.TGT_EMBS_EN_PATH,
+                config.PCA_EN_PATH,
+            ),
+            (
+                train_ki_sentences,
+                config.KI_MODEL_PATH,
+                config.TGT_EMBS_KI_PATH,
+                config.PCA_KI_PATH,
+            ),
+        ]:
+            logger.info(f"Embedding {len(sentences)} bank sentences for {embs_path}...")
+            bank_embs = get_sentence_embeddings_parallel(model_path, sentences, dim=dim)
+            np.save(embs_path, bank_embs.astype(np.float32))
+            PCABasis.fit(bank_embs, n_components=config.PCA_COMPONENTS).save(pca_path)
+            logger.info(f"Saved {config.PCA_COMPONENTS}-d PCA basis to {pca_path}")
+            del bank_embs
+            gc.collect()
+        if "retrieval_artifacts" not in state["steps"]:
+            state["steps"].append("retrieval_artifacts")
+            save_state(state_file, state)
+
+    # Compact string stores let the server start without re-reading the CSVs
+    if not os.path.exists(config.BANK_DOMAINS_PATH):
+        StringStore.from_strings(train_ki_sentences).save(config.BANK_STRINGS_KI_PATH)
+        StringStore.from_strings(train_en_sentences).save(config.BANK_STRINGS_EN_PATH)
+        LabelArray.from_labels(train_domains).save(config.BANK_DOMAINS_PATH)
+        logger.info(f"Saved sentence-bank string stores to {config.LATEST_RUN_DIR}")
+
+    # 4. Full evaluation on the held-out val set
     logger.info(f"Evaluating on {len(val_ki)} validation sentences...")
 
     val_tgt_en = get_sentence_embeddings_parallel(config.EN_MODEL_PATH, val_en, dim=dim)
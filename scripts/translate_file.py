@@ -0,0 +1,84 @@
+"""Translates a text file line by line with the latest run, without the HTTP server.
+
+Each input line gets one output line, in order; blank lines stay blank. Lines are
+streamed through `app.serve.offline.translate_many`, so output matches `/translate`
+and memory stays flat for any file size. Progress and sentences per second are
+logged every `--progress-s` seconds. Use `-` for stdin/stdout.
+
+    uv run python -m scripts.translate_file sentences.ki.txt sentences.en.txt
+    uv run python -m scripts.translate_file in.txt out.txt --method word-by-word
+"""
+
+import argparse
+import sys
+import time
+from typing import Iterator, TextIO
+
+from app.serve.offline import METHODS, load_translator, translate_many
+from app.shared.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def read_lines(f: TextIO) -> Iterator[str]:
+    for line in f:
+        yield line.rstrip("\r\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", help="Text file with one sentence per line, or -")
+    parser.add_argument("output", help="File to write translations to, or -")
+    parser.add_argument("--source-lang", default="ki", choices=["ki", "en"])
+    parser.add_argument("--target-lang", default="en", choices=["ki", "en"])
+    parser.add_argument("--method", default="retrieval", choices=METHODS)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Word-by-word worker processes (default: one per CPU)",
+    )
+    parser.add_argument("--progress-s", type=float, default=5.0)
+    args = parser.parse_args()
+    if args.source_lang == args.target_lang:
+        parser.error("--source-lang and --target-lang must differ")
+
+    start = time.perf_counter()
+    load_translator(f"{args.source_lang}_{args.target_lang}")
+    logger.info("Loaded the models in %.1fs.", time.perf_counter() - start)
+
+    fin = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    fout = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    count = 0
+    start = last_report = time.perf_counter()
+    try:
+        for translation in translate_many(
+            read_lines(fin),
+            args.source_lang,
+            args.target_lang,
+            args.method,
+            batch_size=args.batch_size,
+            processes=args.processes,
+        ):
+            fout.write(translation + "\n")
+            count += 1
+            now = time.perf_counter()
+            if now - last_report >= args.progress_s:
+                last_report = now
+                logger.info("%d sentences, %.0f sentences/s.", count, count / (now - start))
+    finally:
+        for f in (fin, fout):
+            if f not in (sys.stdin, sys.stdout):
+                f.close()
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Translated %d sentences in %.1fs (%.0f sentences/s).",
+        count,
+        elapsed,
+        count / elapsed if elapsed else 0.0,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Sweeps HNSW vocab-index parameters and records the best trade-off for serving.
+
+For each direction the script measures, against the exact brute-force CSLS word
+lookup, how often the HNSW shortlist re-ranked with CSLS returns the same word
+(recall@1), together with per-query latency and index build time. The Pareto
+front over (recall, latency) is written to `hnsw_config.json` in the run directory
+along with the selected configuration, which the server uses at startup.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+
+import fasttext
+import numpy as np
+
+from app.api.embeddings import CrossLingualTranslator
+from app.api.preprocessing import normalize_text, tokenize_text
+from app.api.retrieval import normalize_rows
+from app.shared import config
+from app.shared.logger import setup_logger
+from scripts.evaluate import load_all_parallel_csvs
+
+logger = setup_logger(__name__)
+
+# Rows of the query x vocab score matrix computed at once for the exact answers
+_EXACT_CHUNK = 256
+
+
+def query_vectors(
+    src_model: fasttext.FastText._FastText,
+    projection: np.ndarray,
+    sentences: list[str],
+    limit: int,
+) -> np.ndarray:
+    """Projected unit vectors for the distinct words of `sentences`, as served."""
+    words = dict.fromkeys(
+        t for s in sentences for t in tokenize_text(normalize_text(s)) if t
+    )
+    vectors = []
+    for word in list(words)[:limit]:
+        projected = projection @ src_model.get_word_vector(word)
+        if np.linalg.norm(projected) >= 1e-8:
+            vectors.append(projected)
+    return normalize_rows(np.array(vectors))
+
+
+def exact_answers(
+    vocab: np.ndarray, penalty: np.ndarray, queries: np.ndarray
+) -> np.ndarray:
+    """Best target word per query under exact CSLS over the whole vocabulary."""
+    best = np.empty(len(queries), dtype=np.int64)
+    for start in range(0, len(queries), _EXACT_CHUNK):
+        scores = 2 * (queries[start : start + _EXACT_CHUNK] @ vocab.T) - penalty
+        best[start : start + _EXACT_CHUNK] = np.argmax(scores, axis=1)
+    return best
+
+
+def evaluate_config(
+    translator: CrossLingualTranslator,
+    queries: np.ndarray,
+    expected: np.ndarray,
+    ef: int,
+    shortlist: int,
+) -> tuple[float, float]:
+    """Returns (recall@1, mean query ms) for one ef/shortlist setting."""
+    index = translator._vocab_hnsw_index
+    index.set_ef(max(ef, shortlist))
+    vocab = translator.tgt_vocab_embeddings
+    penalty = translator.tgt_word_csls_penalty
+    hits = 0
+    start = time.perf_counter()
+    for q, answer in zip(queries, expected, strict=True):
+        # Same per-word path as translate_word_by_word
+        labels, _ = index.knn_query(q.reshape(1, -1), k=shortlist)
+        cand = labels[0]
+        best = cand[np.argmax(2 * (vocab[cand] @ q) - penalty[cand])]
+        hits += int(best == answer)
+    elapsed = time.perf_counter() - start
+    return hits / max(len(queries), 1), 1000 * elapsed / max(len(queries), 1)
+
+
+def pareto_front(results: list[dict]) -> list[dict]:
+    """Configs not beaten on both recall and latency by any other, fastest first."""
+    front = [
+        r
+        for r in results
+        if not any(
+            o["recall_at_1"] >= r["recall_at_1"]
+            and o["query_ms"] <= r["query_ms"]
+            and (o["recall_at_1"] > r["recall_at_1"] or o["query_ms"] < r["query_ms"])
+            for o in results
+        )
+    ]
+    return sorted(front, key=lambda r: r["query_ms"])
+
+
+def select_config(front: list[dict], target_recall: float) -> dict:
+    """Fastest front config reaching `target_recall`, else the most accurate one."""
+    for r in front:
+        if r["recall_at_1"] >= target_recall:
+            return r
+    return max(front, key=lambda r: r["recall_at_1"])
+
+
+def tune_direction(
+    translator: CrossLingualTranslator, queries: np.ndarray, args: argparse.Namespace
+) -> dict:
+    results = []
+    expected: np.ndarray | None = None
+    for M, ef_construction in itertools.product(args.M, args.ef_construction):
+        start = time.perf_counter()
+        translator.build_vocab_hnsw_index(ef_construction=ef_construction, M=M)
+        build_seconds = time.perf_counter() - start
+        if expected is None:
+            # Vocab vectors and penalties are cached on the first build
+            expected = exact_answers(
+                translator.tgt_vocab_embeddings, translator.tgt_word_csls_penalty, queries
+            )
+        for ef, shortlist in itertools.product(args.ef, args.shortlist):
+            if shortlist > ef:
+                continue
+            recall, query_ms = evaluate_config(translator, queries, expected, ef, shortlist)
+            results.append({
+                "M": M,
+                "ef_construction": ef_construction,
+                "ef": ef,
+                "shortlist": shortlist,
+                "recall_at_1": recall,
+                "query_ms": query_ms,
+                "build_seconds": build_seconds,
+            })
+            logger.info(
+                "M=%d ef_c=%d ef=%d shortlist=%d: recall@1=%.4f, %.3f ms/query",
+                M,
+                ef_construction,
+                ef,
+                shortlist,
+                recall,
+                query_ms,
+            )
+    front = pareto_front(results)
+    return {
+        "selected": select_config(front, args.target_recall),
+        "pareto": front,
+        "queries": len(queries),
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--M", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=[100, 200, 400])
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--shortlist", type=int, nargs="+", default=[8, 16, 32, 64])
+    parser.add_argument(
+        "--queries", type=int, default=2000, help="Distinct source words to query"
+    )
+    parser.add_argument(
+        "--target-recall",
+        type=float,
+        default=0.99,
+        help="Pick the fastest Pareto config with at least this recall@1",
+    )
+    args = parser.parse_args()
+
+    for path in [
+        config.KI_MODEL_PATH,
+        config.EN_MODEL_PATH,
+        config.PROJ_KI_EN_PATH,
+        config.PROJ_EN_KI_PATH,
+    ]:
+        if not os.path.exists(path):
+            logger.error("Required file %s is missing. Train models first.", path)
+            return
+
+    all_ki, all_en = load_all_parallel_csvs(config.PARALLEL_DATA_DIR)
+    ki_model = fasttext.load_model(config.KI_MODEL_PATH)
+    en_model = fasttext.load_model(config.EN_MODEL_PATH)
+    W_ki_en = np.load(config.PROJ_KI_EN_PATH)
+    W_en_ki = np.load(config.PROJ_EN_KI_PATH)
+
+    report = {}
+    for key, src_model, tgt_model, W, sentences in [
+        ("ki_en", ki_model, en_model, W_ki_en, all_ki),
+        ("en_ki", en_model, ki_model, W_en_ki, all_en),
+    ]:
+        translator = CrossLingualTranslator(src_model, tgt_model, W, [])
+        queries = query_vectors(src_model, W, sentences, args.queries)
+        logger.info("Tuning %s with %d word queries...", key, len(queries))
+        report[key] = tune_direction(translator, queries, args)
+        logger.info("Selected for %s: %s", key, report[key]["selected"])
+
+    with open(config.HNSW_CONFIG_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logger.info("Saved HNSW tuning results to %s", config.HNSW_CONFIG_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,27 @@
 """Integration tests for the translation API endpoints."""
 
+import io
+import os
+import tempfile
+import threading
+import time
 import unittest
+from unittest.mock import MagicMock, patch
 
+import numpy as np
 from fastapi.testclient import TestClient
 from givenpy import given, then, when
 from hamcrest import assert_that, equal_to, has_key, is_
 
-from app.serve.main import app
+from app.serve.adaptive import StrategySelector
+from app.serve.additions import BankAdditionsLog
+from app.serve.admission import AdmissionController, ClientRateLimiter, EndpointGate
+from app.serve.binary import MEDIA_TYPE as BINARY_BATCH
+from app.serve.binary import decode_batch, encode_batch
+from app.serve.feedback import FeedbackStore, FeedbackWriter
+from app.serve.jobs import BulkJobs
+from app.serve.main import app, preload
+from app.serve.variants import VariantRouter, VariantServing
 
 
 class TestTranslationAPI(unittest.TestCase):
@@ -164,3 +179,812 @@ class TestTranslationAPI(unittest.TestCase):
             data = response.json()
             assert_that(data["status"], is_(equal_to("success")))
             assert_that(data["message"], is_(equal_to("Feedback submitted successfully.")))
+
+    def test_admin_bank_pairs_requires_token(self):
+        """Adding bank pairs without a valid admin token is forbidden."""
+        with given([]) as _:
+            payload = {"pairs": [{"kikuyu": "marigū", "english": "Bananas"}]}
+
+        with when("posting pairs without an X-Admin-Token header"):
+            response = self.client.post("/admin/bank/pairs", json=payload)
+
+        with then("a 403 error is returned"):
+            assert_that(response.status_code, is_(equal_to(403)))
+
+    def test_metrics_endpoint(self):
+        """Metrics endpoint reports the result cache section."""
+        with when("sending GET request to metrics"):
+            response = self.client.get("/metrics")
+
+        with then("it returns 200 with a result_cache entry"):
+            assert_that(response.status_code, is_(equal_to(200)))
+            assert_that(response.json(), has_key("result_cache"))
+
+    def test_document_endpoint_rejects_oversized_documents(self):
+        """Documents over the byte budget are rejected with 413."""
+        with given([]) as _:
+            payload = {
+                "text": "Mũndũ ũmwe. " * 100_000,
+                "source_lang": "ki",
+                "target_lang": "en",
+            }
+
+        with when("posting the document"):
+            response = self.client.post("/translate/document", json=payload)
+
+        with then("a 413 error is returned"):
+            assert_that(response.status_code, is_(equal_to(413)))
+
+    def test_document_body_over_budget_is_rejected_before_parsing(self):
+        """A Content-Length too large for the byte budget is refused unread."""
+        with given([]) as _:
+            body = b"{" + b" " * 10_000 + b"}"  # not even a valid request
+
+        with when("posting it with a small document budget"):
+            with patch("app.shared.config.DOCUMENT_MAX_BYTES", 100):
+                response = self.client.post(
+                    "/translate/document",
+                    content=body,
+                    headers={"Content-Type": "application/json"},
+                )
+
+        with then("it is a 413, not a validation error"):
+            assert_that(response.status_code, is_(equal_to(413)))
+
+
+class TestFeedbackStats(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self._writer = app.state.feedback
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        app.state.feedback = FeedbackWriter(
+            os.path.join(tmpdir.name, "feedback.jsonl"),
+            store=FeedbackStore(os.path.join(tmpdir.name, "feedback.sqlite3")),
+        )
+
+    def tearDown(self):
+        app.state.feedback.close()
+        app.state.feedback = self._writer
+
+    def test_unhelpful_queries_are_ranked(self):
+        """Ratings posted to /feedback show up in /feedback/stats, worst query first."""
+        with given([]) as _:
+            base = {
+                "target_text": "Are you well",
+                "source_lang": "ki",
+                "target_lang": "en",
+                "method": "retrieval",
+            }
+
+        with when("rating one query down twice and another once"):
+            for text in ("wĩ mwega", "Wĩ mwega!", "nĩ wega"):
+                self.client.post(
+                    "/feedback", json={**base, "source_text": text, "rating": -1}
+                )
+            app.state.feedback.close()
+            response = self.client.get("/feedback/stats", params={"direction": "ki_en"})
+
+        with then("the twice-downvoted query leads"):
+            assert_that(response.status_code, is_(equal_to(200)))
+            worst = response.json()["most_unhelpful"]
+            assert_that(
+                [(q["source_text"], q["unhelpful"]) for q in worst],
+                is_(equal_to([("wĩ mwega", 2), ("nĩ wega", 1)])),
+            )
+
+    def test_rejects_unknown_direction(self):
+        """Directions other than ki_en and en_ki are a validation error."""
+        with when("asking for a direction that does not exist"):
+            response = self.client.get("/feedback/stats", params={"direction": "fr_en"})
+
+        with then("it is 422"):
+            assert_that(response.status_code, is_(equal_to(422)))
+
+
+class TestBulkJobs(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self._translators = getattr(app.state, "translators", None)
+        self._jobs = app.state.jobs
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        translator = MagicMock()
+        translator.retrieve_top_k_many.side_effect = lambda texts, k, domains: [
+            [(t.upper(), 1.0)] for t in texts
+        ]
+        app.state.translators = {"ki_en": translator, "en_ki": MagicMock()}
+        app.state.jobs = BulkJobs(tmpdir.name, self._jobs.translate, batch_size=2)
+
+    def tearDown(self):
+        app.state.jobs.stop()
+        app.state.jobs = self._jobs
+        app.state.translators = self._translators
+
+    def test_upload_poll_and_download(self):
+        """A TSV upload is queued, runs in the background and downloads as TSV."""
+        with given([]) as _:
+            body = "id\ttext\n1\twĩ mwega\n2\tnĩ wega\n3\tmarigū\n".encode()
+
+        with when("submitting the job, polling until it is done and downloading it"):
+            submitted = self.client.post(
+                "/jobs",
+                params={"column": "text", "source_lang": "ki", "target_lang": "en"},
+                content=body,
+                headers={"content-type": "text/tab-separated-values"},
+            )
+            job_id = submitted.json()["job_id"]
+            early = self.client.get(f"/jobs/{job_id}/result").status_code
+            app.state.jobs.start()
+            for _ in range(100):
+                state = self.client.get(f"/jobs/{job_id}").json()
+                if state["status"] == "completed":
+                    break
+                time.sleep(0.02)
+            result = self.client.get(f"/jobs/{job_id}/result")
+
+        with then("it was accepted, finished and has a translation column"):
+            assert_that(submitted.status_code, is_(equal_to(202)))
+            assert_that(early, is_(equal_to(409)))
+            assert_that((state["rows_done"], state["progress"]), is_(equal_to((3, 1.0))))
+            assert_that(
+                result.headers["content-type"].startswith("text/tab-separated-values"),
+                is_(True),
+            )
+            assert_that(
+                result.text.splitlines(),
+                is_(
+                    equal_to([
+                        "id\ttext\ttranslation",
+                        "1\twĩ mwega\tWĨ MWEGA",
+                        "2\tnĩ wega\tNĨ WEGA",
+                        "3\tmarigū\tMARIGŪ",
+                    ])
+                ),
+            )
+
+    def test_rejects_bad_uploads(self):
+        """Unknown columns are 400, oversized uploads 413 and unknown jobs 404."""
+        with when("sending a file without the column, an oversized one and a bad id"):
+            missing = self.client.post(
+                "/jobs", params={"column": "text"}, content=b"english\nhello\n"
+            )
+            with patch("app.shared.config.JOB_MAX_MB", 0.00001):
+                large = self.client.post(
+                    "/jobs", params={"column": "text"}, content=b"text\n" + b"x" * 100
+                )
+            unknown = self.client.get(f"/jobs/{'0' * 32}")
+
+        with then("each is refused and nothing is left queued"):
+            assert_that(missing.status_code, is_(equal_to(400)))
+            assert_that(large.status_code, is_(equal_to(413)))
+            assert_that(unknown.status_code, is_(equal_to(404)))
+            assert_that(os.listdir(app.state.jobs.root), is_(equal_to([])))
+
+
+class TestBatchEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self._translators = getattr(app.state, "translators", None)
+        translator = MagicMock()
+        translator.retrieve_top_k_many.side_effect = lambda texts, k, *_, **__: [
+            [(f"{t.upper()} {i}", 1.0 - i / 4) for i in range(k)] for t in texts
+        ]
+        translator.translate_word_by_word.side_effect = str.lower
+        app.state.translators = {"ki_en": translator, "en_ki": translator}
+        self.options = {"source_lang": "ki", "target_lang": "en"}
+
+    def tearDown(self):
+        app.state.translators = self._translators
+
+    def test_binary_and_json_give_the_same_translations(self):
+        """A binary request and response carry what the JSON endpoint returns."""
+        with given([]) as _:
+            texts = ["Wĩ mwega", "Nĩ wega mũno"]
+            options = {**self.options, "method": "word-by-word"}
+
+        with when("posting the batch both ways"):
+            as_json = self.client.post("/translate/batch", json={**options, "texts": texts})
+            as_binary = self.client.post(
+                "/translate/batch",
+                content=encode_batch(options, texts),
+                headers={"content-type": BINARY_BATCH, "accept": BINARY_BATCH},
+            )
+
+        with then("both hold the same translations"):
+            assert_that(
+                as_json.json()["translations"], is_(equal_to(["wĩ mwega", "nĩ wega mũno"]))
+            )
+            assert_that(as_binary.headers["content-type"], is_(equal_to(BINARY_BATCH)))
+            header, translations, _, _ = decode_batch(as_binary.content)
+            assert_that(translations, is_(equal_to(as_json.json()["translations"])))
+            assert_that(header["method"], is_(equal_to("word-by-word")))
+
+    def test_binary_candidates_are_grouped_by_counts(self):
+        """Candidates of all texts come back flat with per-text counts and scores."""
+        with when("asking for two candidates each for three texts"):
+            response = self.client.post(
+                "/translate/candidates/batch",
+                json={**self.options, "texts": ["a", "b", "c"], "k": 2},
+                headers={"accept": BINARY_BATCH},
+            )
+            _, texts, counts, scores = decode_batch(response.content)
+
+        with then("counts split the flat candidate list per text"):
+            assert_that(counts.tolist(), is_(equal_to([2, 2, 2])))
+            assert_that(texts[2:4], is_(equal_to(["B 0", "B 1"])))
+            assert_that(scores.tolist(), is_(equal_to([1.0, 0.75] * 3)))
+
+    def test_embed_projects_the_other_language_into_the_space(self):
+        """Texts in the space language use its model; the other language is projected."""
+        with given([]) as _:
+            translator = app.state.translators["ki_en"]
+            translator.embed_targets.side_effect = lambda texts: np.ones((len(texts), 4))
+            translator.embed_queries.side_effect = lambda texts: np.full(
+                (len(texts), 4), 0.5
+            )
+
+        with when("embedding English as JSON and Kikuyu as a float16 .npy"):
+            english = self.client.post(
+                "/embed", json={"texts": ["maize", "beans"], "lang": "en"}
+            )
+            kikuyu = self.client.post(
+                "/embed",
+                json={"texts": ["mbembe"], "lang": "ki", "dtype": "float16"},
+                headers={"accept": "application/x-npy"},
+            )
+
+        with then("each went through its path with the requested encoding"):
+            body = english.json()
+            assert_that((body["dim"], body["space"]), is_(equal_to((4, "en"))))
+            assert_that(body["vectors"], is_(equal_to([[1.0] * 4] * 2)))
+            matrix = np.load(io.BytesIO(kikuyu.content))
+            assert_that((matrix.dtype, matrix.shape), is_(equal_to((np.float16, (1, 4)))))
+            assert_that(matrix.tolist(), is_(equal_to([[0.5] * 4])))
+
+    def test_binary_requests_are_validated_like_json(self):
+        """Limits apply to frames as to JSON bodies; broken frames are 400."""
+        with when("sending an over-long text and a truncated frame"):
+            too_long = self.client.post(
+                "/translate/batch",
+                content=encode_batch(self.options, ["x" * 2001]),
+                headers={"content-type": BINARY_BATCH},
+            )
+            broken = self.client.post(
+                "/translate/batch",
+                content=encode_batch(self.options, ["wĩ mwega"])[:-3],
+                headers={"content-type": BINARY_BATCH},
+            )
+            as_json = self.client.post(
+                "/translate/batch", json={**self.options, "texts": ["x" * 2001]}
+            )
+
+        with then("the limit is a 422 either way and the broken frame a 400"):
+            assert_that(too_long.status_code, is_(equal_to(422)))
+            assert_that(as_json.status_code, is_(equal_to(422)))
+            assert_that(broken.status_code, is_(equal_to(400)))
+
+
+class TestBankAdditionsAcrossWorkers(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self._translators = getattr(app.state, "translators", None)
+        path = os.path.join(tempfile.mkdtemp(), "bank_additions.jsonl")
+        for name, value in (("BANK_ADDITIONS_PATH", path), ("BANK_SYNC_INTERVAL_S", 0)):
+            patcher = patch(f"app.shared.config.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.path = path
+
+    def tearDown(self):
+        app.state.translators = self._translators
+
+    def test_pairs_added_by_another_worker_are_picked_up(self):
+        """Each worker applies the shared log's new lines before its next request."""
+        with given([]) as _:
+            translator = MagicMock()
+            translator.delta_segments = []
+            translator.retrieve_top_k.return_value = [("Bananas", 0.9)]
+            app.state.translators = {"ki_en": translator}
+            payload = {"text": "marigū", "source_lang": "ki", "target_lang": "en"}
+            self.client.post("/translate", json=payload)
+            pairs = [{"kikuyu": "marigū", "english": "Bananas", "domain": "general"}]
+
+        with when("another worker adds a pair, this one serves two requests"):
+            BankAdditionsLog(self.path).append(pairs)
+            self.client.post("/translate", json=payload)
+            self.client.post("/translate", json=payload)
+
+        with then("the pair was added to this worker's bank once"):
+            translator.add_sentences.assert_called_once_with(["Bananas"], ["general"])
+
+    def test_admin_pairs_are_logged_and_applied_once(self):
+        """The receiving worker applies its own addition through the log too."""
+        with given([]) as _:
+            translator = MagicMock()
+            translator.delta_segments = []
+            app.state.translators = {"en_ki": translator}
+            payload = {"pairs": [{"kikuyu": "Mbembe", "english": "Maize"}]}
+
+        with when("posting a pair with the admin token"):
+            with patch.dict(os.environ, {"TAURA_ADMIN_TOKEN": "secret"}):
+                response = self.client.post(
+                    "/admin/bank/pairs", json=payload, headers={"X-Admin-Token": "secret"}
+                )
+
+        with then("the pair is in the log and in the bank once"):
+            assert_that(response.status_code, is_(equal_to(200)))
+            logged = BankAdditionsLog(self.path).read_new()
+            assert_that([p["kikuyu"] for p in logged], is_(equal_to(["Mbembe"])))
+            translator.add_sentences.assert_called_once_with(["Mbembe"], ["other"])
+
+    def test_pairs_reach_every_loaded_run(self):
+        """A/B and shadow variants apply the shared log's pairs as well."""
+        with given([]) as _:
+            primary, variant = MagicMock(), MagicMock()
+            primary.delta_segments = variant.delta_segments = []
+            primary.retrieve_top_k.return_value = [("Bananas", 0.9)]
+            app.state.translators = {"ki_en": primary}
+            variants = MagicMock()
+            variants.runs = {"latest": app.state.translators, "b": {"ki_en": variant}}
+            variants.route.return_value = ("latest", primary)
+            pairs = [{"kikuyu": "marigū", "english": "Bananas", "domain": "other"}]
+
+        with when("another worker adds a pair and this one serves a request"):
+            BankAdditionsLog(self.path).append(pairs)
+            with patch.object(app.state, "variants", variants, create=True):
+                self.client.post(
+                    "/translate",
+                    json={"text": "marigū", "source_lang": "ki", "target_lang": "en"},
+                )
+
+        with then("both runs' banks received the pair"):
+            primary.add_sentences.assert_called_once_with(["Bananas"], ["other"])
+            variant.add_sentences.assert_called_once_with(["Bananas"], ["other"])
+
+    def test_model_info_lists_the_loaded_bank_domains(self):
+        """Domains come from the bank segments, pairs added since startup included."""
+        with given([]) as _:
+            translator = MagicMock()
+            translator.bank_domains = {"bible", "other"}
+            other = MagicMock()
+            other.bank_domains = {"bible", "medicine"}
+            app.state.translators = {"ki_en": translator, "en_ki": other}
+
+        with when("reading the model info"):
+            info = self.client.get("/model/info").json()
+
+        with then("it lists every direction's domains once"):
+            assert_that(info["domains"], is_(equal_to(["bible", "medicine", "other"])))
+
+    def test_log_is_checked_at_most_once_per_interval(self):
+        """Requests inside the sync interval do not look at the log."""
+        with given([]) as _:
+            translator = MagicMock()
+            translator.delta_segments = []
+            translator.retrieve_top_k.return_value = [("Bananas", 0.9)]
+            app.state.translators = {"ki_en": translator}
+            payload = {"text": "marigū", "source_lang": "ki", "target_lang": "en"}
+            self.client.post("/translate", json=payload)
+            pairs = [{"kikuyu": "marigū", "english": "Bananas", "domain": "other"}]
+
+        with when("a pair is logged and a request follows within the interval"):
+            BankAdditionsLog(self.path).append(pairs)
+            with patch("app.shared.config.BANK_SYNC_INTERVAL_S", 3600):
+                self.client.post("/translate", json=payload)
+
+        with then("the pair is not applied yet"):
+            translator.add_sentences.assert_not_called()
+
+
+class TestAsYouTypeWebSocket(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self._translators = getattr(app.state, "translators", None)
+
+    def tearDown(self):
+        app.state.translators = self._translators
+
+    def test_rejects_unsupported_languages(self):
+        """Invalid inputs get an error message instead of closing the socket."""
+        with when("sending an unsupported language pair"):
+            with self.client.websocket_connect("/ws/translate") as ws:
+                ws.send_json({
+                    "seq": 1,
+                    "text": "hi",
+                    "source_lang": "fr",
+                    "target_lang": "en",
+                })
+                reply = ws.receive_json()
+
+        with then("the error is echoed with the sequence number"):
+            assert_that(reply["seq"], is_(equal_to(1)))
+            assert_that("Supported language codes" in reply["error"], is_(True))
+
+    def test_superseded_inputs_are_skipped(self):
+        """Inputs typed while a translation runs only produce the newest result."""
+        with given([]) as _:
+            started, release = threading.Event(), threading.Event()
+            translator = MagicMock()
+
+            def word_by_word(text, cache):
+                if text == "m":
+                    started.set()
+                    release.wait(timeout=5)
+                return text.upper()
+
+            translator.translate_word_by_word.side_effect = word_by_word
+            translator.retrieve_top_k.return_value = [("Bananas", 0.9)]
+            app.state.translators = {"ki_en": translator}
+
+        with when("typing three keystrokes while the first is being translated"):
+            with self.client.websocket_connect("/ws/translate") as ws:
+                for seq, text in enumerate(["m", "ma", "mar"], start=1):
+                    ws.send_json({
+                        "seq": seq,
+                        "text": text,
+                        "source_lang": "ki",
+                        "target_lang": "en",
+                    })
+                    if seq == 1:
+                        started.wait(timeout=5)
+                time.sleep(0.2)
+                release.set()
+                first = ws.receive_json()
+                second = ws.receive_json()
+
+        with then("only the last input is answered, with both stages"):
+            assert_that(
+                first,
+                is_(
+                    equal_to({
+                        "seq": 3,
+                        "stage": "word-by-word",
+                        "translated_text": "MAR",
+                    })
+                ),
+            )
+            assert_that(
+                second["candidates"], is_(equal_to([{"text": "Bananas", "score": 0.9}]))
+            )
+            texts = [c.args[0] for c in translator.translate_word_by_word.call_args_list]
+            assert_that(texts, is_(equal_to(["m", "mar"])))
+            searched = [c.args[0] for c in translator.retrieve_top_k.call_args_list]
+            assert_that(searched, is_(equal_to(["mar"])))
+
+
+class TestAdmissionControl(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self._admission = app.state.admission
+
+    def tearDown(self):
+        app.state.admission = self._admission
+
+    def test_rate_limited_client_gets_429_with_retry_after(self):
+        """A client past its token bucket is rejected before the handler runs."""
+        with given([]) as _:
+            app.state.admission = AdmissionController(
+                {"/translate": EndpointGate("translate", 8, 64, 1.0)},
+                ClientRateLimiter(rate=0.1, burst=1),
+            )
+            payload = {"text": "hi", "source_lang": "fr", "target_lang": "en"}
+
+        with when("sending two requests back to back"):
+            first = self.client.post("/translate", json=payload)
+            second = self.client.post("/translate", json=payload)
+
+        with then("the second is a 429 and both are counted"):
+            assert_that(first.status_code, is_(equal_to(400)))
+            assert_that(second.status_code, is_(equal_to(429)))
+            assert_that(second.headers["Retry-After"], is_(equal_to("10")))
+            stats = self.client.get("/metrics").json()["admission"]
+            assert_that(stats["rate_limited"], is_(equal_to(1)))
+            assert_that(stats["endpoints"]["/translate"]["admitted"], is_(equal_to(1)))
+            assert_that(stats["endpoints"]["/translate"]["in_flight"], is_(equal_to(0)))
+
+
+class TestAdaptiveStrategy(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self._translators = getattr(app.state, "translators", None)
+        self._adaptive = app.state.adaptive
+
+    def tearDown(self):
+        app.state.translators = self._translators
+        app.state.adaptive = self._adaptive
+
+    def test_tight_deadline_reports_the_fallback_strategy(self):
+        """When the full path is too slow for the deadline, the word table answers."""
+        with given([]) as _:
+            translator = MagicMock()
+            translator.sentence_index.kind = "exact"
+            translator.word_table = {"mũndũ": "person"}
+            translator.translate_with_word_table.return_value = "person"
+            translator.retrieve_top_k.return_value = [("A person", 1.0)]
+            app.state.translators = {"ki_en": translator}
+            app.state.adaptive = StrategySelector(slo_ms=1000)
+            app.state.adaptive.observe("retrieval", "full", 0.5)
+            payload = {"text": "Mũndũ", "source_lang": "ki", "target_lang": "en"}
+
+        with when("translating with a loose and a tight deadline"):
+            loose = self.client.post("/translate", json={**payload, "deadline_ms": 900})
+            tight = self.client.post("/translate", json={**payload, "deadline_ms": 50})
+
+        with then("the strategy used is reported with each answer"):
+            assert_that(loose.json()["strategy"], is_(equal_to("full")))
+            assert_that(loose.json()["translated_text"], is_(equal_to("A person")))
+            assert_that(tight.json()["strategy"], is_(equal_to("word_table")))
+            assert_that(tight.json()["translated_text"], is_(equal_to("person")))
+
+    def test_candidates_never_fall_back_to_the_word_table(self):
+        """A word-by-word gloss is not a ranked candidate, so k candidates still come back."""
+        with given([]) as _:
+            translator = MagicMock()
+            translator.sentence_index.kind = "exact"
+            translator.word_table = {"mũndũ": "person"}
+            translator.retrieve_top_k.return_value = [("A person", 0.9), ("A man", 0.8)]
+            app.state.translators = {"ki_en": translator}
+            app.state.adaptive = StrategySelector(slo_ms=1000)
+            app.state.adaptive.observe("retrieval", "full", 0.5)
+
+        with when("asking for candidates with a tight deadline"):
+            response = self.client.post(
+                "/translate/candidates",
+                json={
+                    "text": "Mũndũ wa kũandĩka",
+                    "source_lang": "ki",
+                    "target_lang": "en",
+                    "k": 2,
+                    "deadline_ms": 50,
+                },
+            )
+
+        with then("the full search answers with both candidates"):
+            assert_that(response.json()["strategy"], is_(equal_to("full")))
+            assert_that(len(response.json()["candidates"]), is_(equal_to(2)))
+            translator.translate_with_word_table.assert_not_called()
+
+
+class TestVariantServing(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self._state = {
+            name: getattr(app.state, name, None)
+            for name in ("translators", "adaptive", "admission", "variants")
+        }
+        runs = {}
+        for run, answer in (("run_a", "A person"), ("run_b", "Someone")):
+            translator = MagicMock()
+            translator.sentence_index.kind = "exact"
+            translator.retrieve_top_k.return_value = [(answer, 1.0)]
+            translator.retrieve_top_k_many.side_effect = lambda texts, *_, a=answer, **__: [
+                [(a, 1.0)] for _ in texts
+            ]
+            runs[run] = {"ki_en": translator}
+        app.state.translators = runs["run_a"]
+        app.state.adaptive = None
+        app.state.admission = None
+        app.state.variants = VariantServing(
+            "run_a", runs, VariantRouter("run_a", {"run_b": 0.5}, {}, compare_rate=1.0)
+        )
+
+    def tearDown(self):
+        app.state.variants.close()
+        for name, value in self._state.items():
+            setattr(app.state, name, value)
+
+    def test_clients_stick_to_a_run_and_the_primary_checks_agreement(self):
+        """Each client key gets one run's answers; the primary re-answers off the path."""
+        with given([]) as _:
+            payload = {"text": "Mũndũ", "source_lang": "ki", "target_lang": "en"}
+            keys = [f"client-{i}" for i in range(20)]
+
+        with when("every client translates twice"):
+            replies = {
+                key: [
+                    self.client.post(
+                        "/translate", json=payload, headers={"x-client-key": key}
+                    )
+                    for _ in range(2)
+                ]
+                for key in keys
+            }
+            deadline = time.monotonic() + 5
+            while app.state.variants.pending and time.monotonic() < deadline:
+                time.sleep(0.01)
+            stats = self.client.get("/metrics").json()["variants"]["runs"]
+
+        with then("answers follow the run named in the header, the same for each client"):
+            answers = {"run_a": "A person", "run_b": "Someone"}
+            for first, second in replies.values():
+                run = first.headers["x-taura-run"]
+                assert_that(second.headers["x-taura-run"], is_(equal_to(run)))
+                assert_that(first.json()["translated_text"], is_(equal_to(answers[run])))
+            served_b = stats["run_b"]["served"]
+            assert_that(0 < served_b < 40, is_(True))
+            assert_that(stats["run_a"]["served"] + served_b, is_(equal_to(40)))
+            assert_that(stats["run_b"]["compared"], is_(equal_to(served_b)))
+            assert_that(stats["run_b"]["agreement"], is_(equal_to(0.0)))
+
+    def test_strategy_latencies_are_kept_per_run(self):
+        """A request served by a variant run is timed under that run, not the primary."""
+        with given([]) as _:
+            app.state.adaptive = StrategySelector(slo_ms=1000)
+            payload = {"text": "Mũndũ", "source_lang": "ki", "target_lang": "en"}
+            router = app.state.variants.router
+            keys = {router.assign(f"client-{i}"): f"client-{i}" for i in range(20)}
+
+        with when("one client of each run translates"):
+            for key in keys.values():
+                self.client.post("/translate", json=payload, headers={"x-client-key": key})
+
+        with then("the selector has one entry for the primary and one for run_b"):
+            strategies = app.state.adaptive.stats()["strategies"]
+            assert_that(
+                sorted(strategies),
+                is_(equal_to(["retrieval:full", "retrieval:full@run_b"])),
+            )
+
+
+class TestReadiness(unittest.TestCase):
+    def tearDown(self):
+        # The lifespan publishes to the shared app state; later tests expect none
+        app.state.translators = None
+        del app.state.startup
+
+    def test_ready_flips_once_background_loading_finishes(self):
+        """/health answers while models load; /ready is 503 until they are loaded."""
+        with given([]) as _:
+            release = threading.Event()
+            tmpdir = tempfile.TemporaryDirectory()
+            self.addCleanup(tmpdir.cleanup)
+            paths = {}
+            for name in (
+                "KI_MODEL_PATH",
+                "EN_MODEL_PATH",
+                "PROJ_KI_EN_PATH",
+                "PROJ_EN_KI_PATH",
+            ):
+                paths[name] = os.path.join(tmpdir.name, name)
+                open(paths[name], "w").close()
+
+            def slow_load(report, directions, loaded_models):
+                release.wait(timeout=5)
+                return {"ki_en": MagicMock(), "en_ki": MagicMock()}
+
+        with when("starting the app and polling before and after loading"):
+            with (
+                patch.multiple("app.shared.config", **paths, LRU_CACHE_ENTRIES=0),
+                patch("app.serve.main.load_translators", side_effect=slow_load),
+                TestClient(app) as client,
+            ):
+                health = client.get("/health").status_code
+                before = client.get("/ready")
+                release.set()
+                for _ in range(50):
+                    after = client.get("/ready")
+                    if after.status_code == 200:
+                        break
+                    time.sleep(0.05)
+                startup = client.get("/model/info").json()["startup"]
+
+        with then("readiness follows the load and the report is exposed"):
+            assert_that(health, is_(equal_to(200)))
+            assert_that(before.status_code, is_(equal_to(503)))
+            assert_that(before.json()["status"], is_(equal_to("loading")))
+            assert_that(after.status_code, is_(equal_to(200)))
+            assert_that(startup["status"], is_(equal_to("ready")))
+
+    def test_ready_reports_missing_models(self):
+        """Without trained models the app stays unready with status 'missing'."""
+        with when("starting the app without model files"):
+            with (
+                patch("app.shared.config.KI_MODEL_PATH", "/nonexistent/ki.bin"),
+                TestClient(app) as client,
+            ):
+                response = client.get("/ready")
+
+        with then("it is 503 with status missing"):
+            assert_that(response.status_code, is_(equal_to(503)))
+            assert_that(response.json()["status"], is_(equal_to("missing")))
+
+
+class TestPreload(unittest.TestCase):
+    def tearDown(self):
+        app.state.translators = None
+        app.state.preloaded = False
+        del app.state.startup
+
+    def test_preloaded_app_starts_ready_without_loading_again(self):
+        """After `preload`, forked workers' lifespans reuse the loaded translators."""
+        with given([]) as _:
+            tmpdir = tempfile.TemporaryDirectory()
+            self.addCleanup(tmpdir.cleanup)
+            paths = {}
+            for name in (
+                "KI_MODEL_PATH",
+                "EN_MODEL_PATH",
+                "PROJ_KI_EN_PATH",
+                "PROJ_EN_KI_PATH",
+            ):
+                paths[name] = os.path.join(tmpdir.name, name)
+                open(paths[name], "w").close()
+            load = MagicMock(return_value={"ki_en": MagicMock(), "en_ki": MagicMock()})
+
+        with when("preloading and then starting the app"):
+            with (
+                patch.multiple("app.shared.config", **paths, LRU_CACHE_ENTRIES=0),
+                patch("app.serve.main.load_translators", load),
+            ):
+                preloaded = preload()
+                with TestClient(app) as client:
+                    ready = client.get("/ready").status_code
+
+        with then("the app is ready at once and the models were loaded once"):
+            assert_that(preloaded, is_(True))
+            assert_that(ready, is_(equal_to(200)))
+            assert_that(load.call_count, is_(equal_to(1)))
+
+
+class TestServedDirections(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self._translators = getattr(app.state, "translators", None)
+        self.payload = {"text": "wĩ mwega", "source_lang": "en", "target_lang": "ki"}
+
+    def tearDown(self):
+        app.state.translators = self._translators
+
+    def _serve_ki_en_only(self) -> MagicMock:
+        translator = MagicMock()
+        translator.sentence_index.kind = "exact"
+        translator.retrieve_top_k.return_value = [("Are you well", 1.0)]
+        app.state.translators = {"ki_en": translator}
+        return translator
+
+    def test_unlisted_direction_is_not_served(self):
+        """A single-direction deployment answers 404 for the other direction."""
+        with given([]) as _:
+            self._serve_ki_en_only()
+
+        with when("requesting the unlisted direction"):
+            with patch("app.shared.config.DIRECTIONS", ["ki_en"]):
+                response = self.client.post("/translate", json=self.payload)
+
+        with then("it is a 404"):
+            assert_that(response.status_code, is_(equal_to(404)))
+
+    def test_unlisted_direction_loads_once_on_first_request(self):
+        """With lazy loading the first request loads the direction and later ones reuse it."""
+        with given([]) as _:
+            ki_en = self._serve_ki_en_only()
+            en_ki = MagicMock()
+            en_ki.sentence_index.kind = "exact"
+            en_ki.retrieve_top_k.return_value = [("Wĩ mwega", 1.0)]
+            tmpdir = tempfile.TemporaryDirectory()
+            self.addCleanup(tmpdir.cleanup)
+            paths = {}
+            for name in ("KI_MODEL_PATH", "EN_MODEL_PATH", "PROJ_EN_KI_PATH"):
+                paths[name] = os.path.join(tmpdir.name, name)
+                open(paths[name], "w").close()
+
+        with when("requesting the lazy direction twice"):
+            with (
+                patch.multiple(
+                    "app.shared.config", DIRECTIONS=["ki_en"], LAZY_DIRECTIONS=True, **paths
+                ),
+                patch(
+                    "app.serve.main.load_translators", return_value={"en_ki": en_ki}
+                ) as load,
+            ):
+                first = self.client.post("/translate", json=self.payload)
+                second = self.client.post("/translate", json=self.payload)
+
+        with then("both succeed, the load ran once and reused the loaded models"):
+            assert_that(first.json()["translated_text"], is_(equal_to("Wĩ mwega")))
+            assert_that(second.status_code, is_(equal_to(200)))
+            assert_that(load.call_count, is_(equal_to(1)))
+            _, directions, models = load.call_args.args
+            assert_that(directions, is_(equal_to(["en_ki"])))
+            assert_that(models["ki"], is_(ki_en.src_model))
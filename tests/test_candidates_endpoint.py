@@ -106,6 +106,7 @@ class TestModelInfoEndpoint(unittest.TestCase):
             assert_that(data, has_key("embedding_dim"))
             assert_that(data, has_key("model_type"))
             assert_that(data, has_key("metrics"))
+            assert_that(data, has_key("domains"))
 
     def test_model_info_metrics_contains_accuracy(self) -> None:
         """Model info metrics should return 200."""
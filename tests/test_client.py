@@ -0,0 +1,110 @@
+"""Tests for the Python client, run against the app through httpx's ASGI transport."""
+
+import asyncio
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import httpx
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, greater_than_or_equal_to, is_
+
+from app.client import AsyncTauraClient, TauraClient, TauraError
+from app.serve.admission import AdmissionController, ClientRateLimiter, EndpointGate
+from app.serve.main import app
+
+
+class TestClientSDK(unittest.TestCase):
+    def setUp(self) -> None:
+        self._state = {
+            name: getattr(app.state, name, None) for name in ("translators", "admission")
+        }
+        self.translator = MagicMock()
+        self.translator.retrieve_top_k_many.side_effect = lambda texts, k, *_, **__: [
+            [(f"{t.upper()} {i}", 1.0 - i / 4) for i in range(k)] for t in texts
+        ]
+        app.state.translators = {"ki_en": self.translator, "en_ki": self.translator}
+        app.state.admission = None
+
+    def tearDown(self) -> None:
+        for name, value in self._state.items():
+            setattr(app.state, name, value)
+
+    def client_options(self) -> dict:
+        return {"base_url": "http://taura", "transport": httpx.ASGITransport(app=app)}
+
+    def test_concurrent_calls_share_one_batch_request(self):
+        """Individual calls made together go out as one request per option set."""
+
+        async def scenario():
+            async with AsyncTauraClient(**self.client_options()) as client:
+                texts = await asyncio.gather(
+                    client.translate("wĩ mwega"),
+                    client.translate("nĩ wega"),
+                    client.translate("wĩ mwega"),
+                    client.candidates("wĩ mwega", k=2),
+                )
+                again = await client.translate("nĩ wega")
+                return texts, again, client.stats
+
+        with when("translating concurrently and then repeating a text"):
+            (one, two, three, candidates), again, stats = asyncio.run(scenario())
+
+        with then("texts and candidates each took one request; the repeat was cached"):
+            assert_that(
+                [one, two, three], is_(equal_to(["WĨ MWEGA 0", "NĨ WEGA 0"] + [one]))
+            )
+            assert_that(
+                candidates, is_(equal_to([("WĨ MWEGA 0", 1.0), ("WĨ MWEGA 1", 0.75)]))
+            )
+            assert_that(again, is_(equal_to("NĨ WEGA 0")))
+            assert_that(stats["requests"], is_(equal_to(2)))
+            assert_that(stats["cache_hits"], is_(equal_to(1)))
+            batches = [
+                call.args[0] for call in self.translator.retrieve_top_k_many.mock_calls
+            ]
+            assert_that(sorted(map(len, batches)), is_(equal_to([1, 2])))
+
+    def test_sync_client_batches_large_inputs_in_order(self):
+        """The blocking client splits at `max_batch` and keeps input order."""
+        with given([]) as _:
+            texts = [f"text {i}" if i % 10 else " " for i in range(25)]
+
+        with when("translating them in batches of at most eight"):
+            with TauraClient(max_batch=8, **self.client_options()) as client:
+                out = client.translate_many(texts)
+
+        with then("blank texts stay blank and the rest map in place"):
+            expected = [f"TEXT {i} 0" if i % 10 else "" for i in range(25)]
+            assert_that(out, is_(equal_to(expected)))
+            assert_that(client.stats["requests"], is_(equal_to(3)))
+
+    def test_waits_for_retry_after_then_succeeds(self):
+        """A 429 from admission control is retried once its Retry-After has passed."""
+        with given([]) as _:
+            app.state.admission = AdmissionController(
+                {"/translate/batch": EndpointGate("batch", 2, 8, 10.0)},
+                ClientRateLimiter(rate=2.0, burst=1.0),
+            )
+
+        with when("sending two batches back to back"):
+            start = time.monotonic()
+            with TauraClient(max_batch=1, **self.client_options()) as client:
+                out = client.translate_many(["a", "b"])
+            elapsed = time.monotonic() - start
+
+        with then("the rate-limited batch waited the advertised second and went through"):
+            assert_that(out, is_(equal_to(["A 0", "B 0"])))
+            assert_that(client.stats["retries"], is_(equal_to(1)))
+            assert_that(elapsed, is_(greater_than_or_equal_to(1.0)))
+
+    def test_client_errors_are_raised_without_retrying(self):
+        """A 400 is not worth retrying and reaches the caller as TauraError."""
+        with when("asking for a translation into the same language"):
+            with TauraClient(**self.client_options()) as client:
+                with self.assertRaises(TauraError) as raised:
+                    client.translate("wĩ mwega", source_lang="ki", target_lang="ki")
+
+        with then("the status and detail come through"):
+            assert_that(raised.exception.status_code, is_(equal_to(400)))
+            assert_that(client.stats["retries"], is_(equal_to(0)))
@@ -0,0 +1,109 @@
+"""Unit tests for the latency-driven strategy selector."""
+
+import unittest
+from unittest.mock import patch
+
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, is_
+
+from app.serve.adaptive import StrategySelector
+
+RETRIEVAL = ["full", "shortlist", "word_table"]
+
+
+class TestStrategySelector(unittest.TestCase):
+    def test_unobserved_strategies_default_to_full(self):
+        """With no latency history the most exact strategy is used."""
+        with given([]) as _:
+            selector = StrategySelector(slo_ms=100)
+
+        with then("full is chosen"):
+            assert_that(selector.choose("retrieval", RETRIEVAL, 0.1), is_(equal_to("full")))
+
+    def test_slow_strategies_are_skipped_for_tight_budgets(self):
+        """A deadline shorter than the full scan falls back to the next cheaper fit."""
+        with given([]) as _:
+            selector = StrategySelector(slo_ms=1000)
+            selector.observe("retrieval", "full", 0.200)
+            selector.observe("retrieval", "shortlist", 0.020)
+            selector.observe("retrieval", "word_table", 0.001)
+
+        with when("choosing for a 50 ms deadline, a 5 ms deadline and a loose one"):
+            tight = selector.choose("retrieval", RETRIEVAL, selector.budget(50, 0.0))
+            tighter = selector.choose("retrieval", RETRIEVAL, selector.budget(5, 0.0))
+            loose = selector.choose("retrieval", RETRIEVAL, selector.budget(None, 0.0))
+
+        with then("each gets the most exact strategy that fits"):
+            assert_that(tight, is_(equal_to("shortlist")))
+            assert_that(tighter, is_(equal_to("word_table")))
+            assert_that(loose, is_(equal_to("full")))
+
+    def test_queue_pressure_and_waiting_shrink_the_budget(self):
+        """Time already queued and a backlog behind the request push towards cheaper modes."""
+        with given([]) as _:
+            selector = StrategySelector(slo_ms=100)
+            selector.observe("retrieval", "full", 0.040)
+            selector.observe("retrieval", "shortlist", 0.010)
+
+        with when("choosing after queueing 70 ms, and with a long queue behind"):
+            waited = selector.choose("retrieval", RETRIEVAL, selector.budget(None, 0.070))
+            backlog = selector.choose("retrieval", RETRIEVAL, 0.1, queue_pressure=2.0)
+
+        with then("both degrade to the shortlist"):
+            assert_that(waited, is_(equal_to("shortlist")))
+            assert_that(backlog, is_(equal_to("shortlist")))
+
+    def test_unavailable_strategies_are_never_chosen(self):
+        """The exact index has no shortlist mode, so the ladder skips it."""
+        with given([]) as _:
+            selector = StrategySelector(slo_ms=100)
+            selector.observe("retrieval", "full", 1.0)
+
+        with then("the cheapest available strategy is used when nothing fits"):
+            assert_that(
+                selector.choose("retrieval", ["full", "word_table"], 0.1),
+                is_(equal_to("word_table")),
+            )
+            assert_that(selector.choose("retrieval", ["full"], 0.1), is_(equal_to("full")))
+
+    def test_a_demoted_strategy_is_probed_and_recovers(self):
+        """One slow run does not demote the full search for good."""
+        with given([]) as _:
+            selector = StrategySelector(slo_ms=100, probe_interval_s=5.0)
+            selector.observe("retrieval", "full", 0.400)
+            selector.observe("retrieval", "shortlist", 0.010)
+
+        with when("choosing now, after the probe interval, and after a fast probe"):
+            demoted = selector.choose("retrieval", RETRIEVAL, 0.1)
+            later = patch("app.serve.adaptive.time.monotonic", return_value=1e9)
+            with later:
+                probe = selector.choose("retrieval", RETRIEVAL, 0.1)
+                again = selector.choose("retrieval", RETRIEVAL, 0.1)
+                for _ in range(10):
+                    selector.observe("retrieval", "full", 0.020)
+                recovered = selector.choose("retrieval", RETRIEVAL, 0.1)
+
+        with then("one request re-measures full, and full is used once it is fast"):
+            assert_that(demoted, is_(equal_to("shortlist")))
+            assert_that(probe, is_(equal_to("full")))
+            assert_that(again, is_(equal_to("shortlist")))
+            assert_that(recovered, is_(equal_to("full")))
+
+    def test_a_slow_variant_run_does_not_demote_the_primary(self):
+        """Latencies are kept per run, so only the slow run falls back."""
+        with given([]) as _:
+            selector = StrategySelector(slo_ms=100)
+            selector.observe("retrieval", "full", 0.020)
+            selector.observe("retrieval", "full", 0.400, run="run_b")
+
+        with when("choosing for the primary and for the variant run"):
+            primary = selector.choose("retrieval", RETRIEVAL, 0.1)
+            variant = selector.choose("retrieval", RETRIEVAL, 0.1, run="run_b")
+
+        with then("only the variant degrades, and both are reported apart"):
+            assert_that(primary, is_(equal_to("full")))
+            assert_that(variant, is_(equal_to("shortlist")))
+            assert_that(
+                sorted(selector.stats()["strategies"]),
+                is_(equal_to(["retrieval:full", "retrieval:full@run_b"])),
+            )
@@ -0,0 +1,64 @@
+"""Unit tests for the shared bank additions log."""
+
+import os
+import tempfile
+import unittest
+
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, is_
+
+from app.serve.additions import BankAdditionsLog
+
+
+def pair(english: str) -> dict:
+    return {"kikuyu": f"ki {english}", "english": english, "domain": "general"}
+
+
+class TestBankAdditionsLog(unittest.TestCase):
+    def test_each_worker_reads_every_append_once(self):
+        """Appends from any worker reach every worker, in order and only once."""
+        with given([]) as _:
+            path = os.path.join(tempfile.mkdtemp(), "bank_additions.jsonl")
+            first, second = BankAdditionsLog(path), BankAdditionsLog(path)
+            first.append([pair("a")])
+
+        with when("each worker reads, the second appends, and both read again"):
+            initial = (first.read_new(), second.read_new())
+            second.append([pair("b"), pair("c")])
+            later = (first.read_new(), second.read_new())
+            again = first.read_new()
+
+        with then("both saw the same pairs in the same order"):
+            assert_that(initial, is_(equal_to(([pair("a")], [pair("a")]))))
+            assert_that(later[0], is_(equal_to([pair("b"), pair("c")])))
+            assert_that(later[1], is_(equal_to(later[0])))
+            assert_that(again, is_(equal_to([])))
+            assert_that(first.has_new(), is_(False))
+
+    def test_a_line_still_being_written_is_left_for_later(self):
+        """A partial last line is not consumed until its newline arrives."""
+        with given([]) as _:
+            path = os.path.join(tempfile.mkdtemp(), "bank_additions.jsonl")
+            log = BankAdditionsLog(path)
+            log.append([pair("a")])
+            with open(path, "a", encoding="utf-8") as f:
+                f.write('{"kikuyu": "ki b", ')
+
+        with when("reading before and after the line is finished"):
+            before = log.read_new()
+            with open(path, "a", encoding="utf-8") as f:
+                f.write('"english": "b", "domain": "general"}\n')
+            after = log.read_new()
+
+        with then("the pair is read whole, once"):
+            assert_that(before, is_(equal_to([pair("a")])))
+            assert_that(after, is_(equal_to([pair("b")])))
+
+    def test_a_missing_log_has_nothing_new(self):
+        """Runs without additions read nothing."""
+        with given([]) as _:
+            log = BankAdditionsLog(os.path.join(tempfile.mkdtemp(), "none.jsonl"))
+
+        with then("nothing is pending or read"):
+            assert_that(log.has_new(), is_(False))
+            assert_that(log.read_new(), is_(equal_to([])))
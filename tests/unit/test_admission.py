@@ -0,0 +1,118 @@
+"""Unit tests for admission control."""
+
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, greater_than, is_
+
+from app.serve.admission import (
+    ClientRateLimiter,
+    EndpointGate,
+    Rejected,
+    TokenBucket,
+    client_address,
+)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_refill(self):
+        """A full bucket admits `burst` requests, then waits for the refill rate."""
+        with given([]) as _:
+            with patch("app.serve.admission.time.monotonic", return_value=0.0):
+                bucket = TokenBucket(rate=2.0, burst=2)
+
+        with when("taking three tokens at once and one after half a second"):
+            waits = [bucket.take(0.0) for _ in range(3)]
+            later = bucket.take(0.5)
+
+        with then("the third waits half a second and the refill admits the fourth"):
+            assert_that(waits, is_(equal_to([0.0, 0.0, 0.5])))
+            assert_that(later, is_(equal_to(0.0)))
+
+    def test_clients_are_limited_independently(self):
+        """One client exhausting its bucket does not affect another."""
+        with given([]) as _:
+            limiter = ClientRateLimiter(rate=1.0, burst=1)
+
+        with when("one client sends twice and another once"):
+            limiter.check("a")
+            with self.assertRaises(Rejected) as rejected:
+                limiter.check("a")
+            limiter.check("b")
+
+        with then("only the repeat is a 429 with a Retry-After"):
+            assert_that(rejected.exception.status_code, is_(equal_to(429)))
+            assert_that(rejected.exception.retry_after, is_(equal_to(1)))
+            assert_that(limiter.limited, is_(equal_to(1)))
+
+
+class TestEndpointGate(unittest.TestCase):
+    def test_sheds_when_queue_is_full(self):
+        """Past the concurrency limit requests queue, and past max_queue get a 503."""
+
+        async def scenario() -> tuple[list[int], EndpointGate]:
+            gate = EndpointGate(
+                "translate", concurrency=1, max_queue=1, latency_budget_s=10
+            )
+            await gate.acquire()
+            waiter = asyncio.create_task(gate.acquire())
+            await asyncio.sleep(0)
+            statuses = []
+            try:
+                await gate.acquire()
+            except Rejected as e:
+                statuses.append(e.status_code)
+            gate.release(0.05)
+            await waiter
+            gate.release(0.05)
+            return statuses, gate
+
+        with when("three requests arrive for one slot and one queue place"):
+            statuses, gate = asyncio.run(scenario())
+
+        with then("the third is shed and the queued one runs after the first"):
+            assert_that(statuses, is_(equal_to([503])))
+            stats = gate.stats()
+            assert_that((stats["admitted"], stats["shed"]), is_(equal_to((2, 1))))
+            assert_that(stats["in_flight"], is_(equal_to(0)))
+
+    def test_sheds_when_estimated_wait_exceeds_budget(self):
+        """Slow recent requests make a queued arrival exceed the latency budget."""
+
+        async def scenario() -> Rejected | None:
+            gate = EndpointGate(
+                "translate", concurrency=1, max_queue=100, latency_budget_s=1
+            )
+            gate.service_s = 2.0
+            await gate.acquire()
+            try:
+                await gate.acquire()
+            except Rejected as e:
+                return e
+            return None
+
+        with when("a request arrives behind one expected to take two seconds"):
+            rejected = asyncio.run(scenario())
+
+        with then("it is shed with a Retry-After covering the wait"):
+            assert rejected is not None
+            assert_that(rejected.status_code, is_(equal_to(503)))
+            assert_that(rejected.retry_after, greater_than(1))
+
+
+class TestClientAddress(unittest.TestCase):
+    def test_forwarded_for_is_used_only_behind_trusted_proxies(self):
+        """X-Forwarded-For names the client only when a trusted proxy sent it."""
+        with given([]) as _:
+            trusted = frozenset({"10.0.0.1", "10.0.0.2"})
+            chain = "6.6.6.6, 203.0.113.7, 10.0.0.2"
+
+        with when("resolving the same header from a trusted and an untrusted peer"):
+            proxied = client_address("10.0.0.1", chain, trusted)
+            direct = client_address("198.51.100.4", chain, trusted)
+
+        with then("the first untrusted hop from the right, else the peer itself"):
+            assert_that(proxied, is_(equal_to("203.0.113.7")))
+            assert_that(direct, is_(equal_to("198.51.100.4")))
@@ -0,0 +1,150 @@
+"""Unit tests for the segmented sentence bank (append-only deltas and compaction)."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, is_
+
+from app.api.embeddings import (
+    CrossLingualTranslator,
+    compute_csls_penalty,
+    streamed_csls_penalty,
+)
+
+_VECTORS = {
+    "psalm": np.array([1.0, 0.0]),
+    "coffee": np.array([0.6, 0.8]),
+    "maize": np.array([0.0, 1.0]),
+    "beans": np.array([0.95, 0.3]),
+    "query": np.array([1.0, 0.2]),
+}
+
+
+def _translator(
+    sentences: list[str], domains: list[str] | None = None, compact_dir: str | None = None
+):
+    model = MagicMock()
+    model.get_word_vector.side_effect = lambda w: _VECTORS.get(w, np.zeros(2))
+    return CrossLingualTranslator(
+        src_model=model,
+        tgt_model=model,
+        projection_matrix=np.eye(2),
+        tgt_sentences=sentences,
+        csls_k=2,
+        tgt_domains=domains,
+        compact_dir=compact_dir,
+    )
+
+
+class TestBankSegments(unittest.TestCase):
+    def test_added_sentences_are_searchable_immediately(self):
+        """Sentences appended as a delta segment are merged into search results."""
+        with given([]) as _:
+            translator = _translator(["psalm", "maize"])
+
+        with when("appending a sentence closer to the query"):
+            translator.add_sentences(["beans"])
+            results = translator.retrieve_top_k("query", 3)
+
+        with then("results merge the base and the delta segment"):
+            assert_that(len(translator.delta_segments), is_(equal_to(1)))
+            assert_that(
+                sorted(text for text, _ in results),
+                is_(equal_to(["beans", "maize", "psalm"])),
+            )
+
+    def test_compaction_keeps_the_segmented_results(self):
+        """Compaction folds the deltas into the base without changing any result."""
+        with given([]) as _:
+            translator = _translator(["psalm", "maize"])
+            translator.add_sentences(["coffee"])
+            translator.add_sentences(["beans"])
+            before = translator.retrieve_top_k("query", 4)
+
+        with when("compacting the deltas into the base"):
+            compacted = translator.compact()
+
+        with then("one segment remains and results are unchanged"):
+            assert_that(compacted, is_(True))
+            assert_that(translator.delta_segments, is_(equal_to(())))
+            assert_that(
+                list(translator.tgt_sentences),
+                is_(equal_to(["psalm", "maize", "coffee", "beans"])),
+            )
+            got = translator.retrieve_top_k("query", 4)
+            assert_that([t for t, _ in got], is_(equal_to([t for t, _ in before])))
+            np.testing.assert_allclose([s for _, s in got], [s for _, s in before])
+
+    def test_compaction_memory_maps_the_merged_bank(self):
+        """With a compact_dir the merged bank is written to disk and memory-mapped."""
+        with given([]) as _:
+            spill = tempfile.TemporaryDirectory()
+            self.addCleanup(spill.cleanup)
+            translator = _translator(["psalm", "maize"], compact_dir=spill.name)
+            translator.add_sentences(["coffee", "beans"])
+            before = translator.retrieve_top_k("query", 4)
+
+        with when("compacting"):
+            translator.compact()
+
+        with then("the base is a memory map and no spill file is left behind"):
+            assert_that(isinstance(translator.tgt_embeddings, np.memmap), is_(True))
+            assert_that(len(translator.tgt_embeddings), is_(equal_to(4)))
+            assert_that(os.listdir(spill.name), is_(equal_to([])))
+            assert_that(translator.retrieve_top_k("query", 4), is_(equal_to(before)))
+
+    def test_streamed_penalty_matches_the_stacked_one(self):
+        """Penalties streamed over several arrays equal those against their stack."""
+        with given([]) as _:
+            rng = np.random.default_rng(0)
+            embs = rng.normal(size=(5, 4)).astype(np.float32)
+            parts = [rng.normal(size=(7, 4)).astype(np.float32), embs]
+
+        with when("computing the penalty both ways"):
+            streamed = streamed_csls_penalty(embs, parts, k=3)
+            stacked = compute_csls_penalty(embs, np.vstack(parts), k=3)
+
+        with then("they agree"):
+            np.testing.assert_allclose(streamed, stacked, rtol=1e-5)
+
+    def test_domain_filter_spans_segments(self):
+        """A domain present only in a delta segment is accepted and filters correctly."""
+        with given([]) as _:
+            translator = _translator(["psalm", "maize"], ["bible", "agriculture"])
+            translator.add_sentences(["coffee", "beans"], ["agriculture", "medicine"])
+
+        with when("filtering by a base domain and by a delta-only domain"):
+            agriculture = translator.retrieve_top_k("query", 5, domains=["agriculture"])
+            medicine = translator.retrieve_top_k("query", 5, domains=["medicine"])
+
+        with then("each filter returns only its rows from every segment"):
+            assert_that(
+                sorted(t for t, _ in agriculture), is_(equal_to(["coffee", "maize"]))
+            )
+            assert_that([t for t, _ in medicine], is_(equal_to(["beans"])))
+
+    def test_bank_domains_include_delta_segments(self):
+        """bank_domains covers the base tags and those of appended pairs."""
+        with given([]) as _:
+            translator = _translator(["psalm", "maize"], ["bible", "agriculture"])
+
+        with when("appending a pair tagged with a new domain"):
+            translator.add_sentences(["beans"], ["medicine"])
+
+        with then("the new domain is listed with the base ones"):
+            assert_that(
+                translator.bank_domains,
+                is_(equal_to({"bible", "agriculture", "medicine"})),
+            )
+
+    def test_compaction_without_deltas_is_a_no_op(self):
+        """compact() reports False when there is nothing to merge."""
+        with given([]) as _:
+            translator = _translator(["psalm"])
+
+        with then("nothing is compacted"):
+            assert_that(translator.compact(), is_(False))
@@ -0,0 +1,47 @@
+"""Unit tests for the binary batch frames."""
+
+import struct
+import unittest
+
+import numpy as np
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, is_
+
+from app.serve.binary import decode_batch, encode_batch
+
+
+class TestBatchFrames(unittest.TestCase):
+    def test_round_trips_texts_counts_and_scores(self):
+        """Non-ASCII and empty strings, counts and float32 scores survive a round trip."""
+        with given([]) as _:
+            texts = ["Mũndũ ũmwe", "", "nĩ wega", "the man"]
+            header = {"source_lang": "ki", "target_lang": "en", "k": 2}
+
+        with when("encoding and decoding"):
+            frame = encode_batch(header, texts, [2, 0, 2], [0.5, 0.25, 1.0, -0.125])
+            decoded, out, counts, scores = decode_batch(frame)
+
+        with then("everything comes back as sent"):
+            assert_that(decoded, is_(equal_to(header)))
+            assert_that(out, is_(equal_to(texts)))
+            assert_that(counts.tolist(), is_(equal_to([2, 0, 2])))
+            assert_that(scores.dtype, is_(equal_to(np.dtype("<f4"))))
+            assert_that(scores.tolist(), is_(equal_to([0.5, 0.25, 1.0, -0.125])))
+
+    def test_rejects_malformed_frames(self):
+        """Wrong magic, truncated arrays and bad lengths are ValueErrors."""
+        with given([]) as _:
+            frame = encode_batch({"source_lang": "ki"}, ["wĩ mwega", "nĩ wega"])
+            not_an_object = b"TRB1" + struct.pack("<I", 2) + b"[]"
+
+        with then("each is rejected"):
+            for bad in (
+                b"{}",
+                frame[:20],
+                frame[:-1],
+                frame + b"x",
+                not_an_object,
+                frame[:-2] + b"\xff\xfe",
+            ):
+                with self.assertRaises(ValueError):
+                    decode_batch(bad)
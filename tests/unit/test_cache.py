@@ -0,0 +1,136 @@
+"""Unit tests for the translation result caches."""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, is_
+
+from app.serve.cache import LRUResultCache, SQLiteResultCache, cache_key
+
+
+class TestSQLiteResultCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmpdir.name, "results.sqlite3")
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def test_hit_and_miss_are_counted(self):
+        """A stored value is returned on the next lookup and counted as a hit."""
+        with given([]) as _:
+            cache = SQLiteResultCache(self.path, "run_1")
+            key = cache_key("ki_en", "retrieval", "wĩ mwega", 1, {})
+
+        with when("looking up before and after storing"):
+            before = cache.get(key)
+            cache.put(key, [["Are you well", 1.2]])
+            after = cache.get(key)
+
+        with then("the second lookup hits"):
+            assert_that(before, is_(equal_to(None)))
+            assert_that(after, is_(equal_to([["Are you well", 1.2]])))
+            stats = cache.stats()
+            assert_that((stats["hits"], stats["misses"]), is_(equal_to((1, 1))))
+
+    def test_entries_are_shared_and_dropped_when_the_run_changes(self):
+        """Another connection on the same run sees entries; a new run clears them."""
+        with given([]) as _:
+            SQLiteResultCache(self.path, "run_1").put("k", "value")
+
+        with when("reopening for the same run and then for a new run"):
+            same_run = SQLiteResultCache(self.path, "run_1").get("k")
+            new_run = SQLiteResultCache(self.path, "run_2").get("k")
+
+        with then("only the same run sees the entry"):
+            assert_that(same_run, is_(equal_to("value")))
+            assert_that(new_run, is_(equal_to(None)))
+
+    def test_evicts_least_recently_used(self):
+        """Past max_entries the least recently used entries are evicted first."""
+        with given([]) as _:
+            cache = SQLiteResultCache(self.path, "run_1", max_entries=2)
+
+        with when("touching the oldest entry before adding a third"):
+            with patch("app.serve.cache._EVICT_EVERY", 1):
+                cache.put("a", 1)
+                time.sleep(0.01)
+                cache.put("b", 2)
+                time.sleep(0.01)
+                cache.get("a")
+                time.sleep(0.01)
+                cache.put("c", 3)
+
+        with then("the untouched entry is gone"):
+            assert_that(cache.get("b"), is_(equal_to(None)))
+            assert_that((cache.get("a"), cache.get("c")), is_(equal_to((1, 3))))
+
+
+class TestLRUResultCache(unittest.TestCase):
+    def test_larger_k_answers_smaller_k(self):
+        """A cached top-5 serves a later top-1 request without recomputing."""
+        with given([]) as _:
+            cache = LRUResultCache()
+            calls = []
+
+            def compute(k):
+                calls.append(k)
+                return [f"candidate {i}" for i in range(k)]
+
+        with when("requesting top-5 then top-1"):
+            top5 = cache.get_or_compute("key", 5, lambda: compute(5))
+            top1 = cache.get_or_compute("key", 1, lambda: compute(1))
+
+        with then("the top-1 is the prefix and was not recomputed"):
+            assert_that(top1, is_(equal_to(top5[:1])))
+            assert_that(calls, is_(equal_to([5])))
+
+    def test_expired_and_evicted_entries_are_recomputed(self):
+        """Entries past their TTL or pushed out by newer keys miss again."""
+        with given([]) as _:
+            expiring = LRUResultCache(ttl_seconds=0.0)
+            small = LRUResultCache(max_entries=1)
+
+        with when("reusing keys after expiry and eviction"):
+            expiring.get_or_compute("a", 1, lambda: ["old"])
+            time.sleep(0.01)
+            expired = expiring.get_or_compute("a", 1, lambda: ["new"])
+            small.get_or_compute("a", 1, lambda: ["a"])
+            small.get_or_compute("b", 1, lambda: ["b"])
+            evicted = small.get_or_compute("a", 1, lambda: ["a again"])
+
+        with then("both were recomputed"):
+            assert_that(expired, is_(equal_to(["new"])))
+            assert_that(evicted, is_(equal_to(["a again"])))
+
+    def test_concurrent_identical_misses_compute_once(self):
+        """A burst of identical misses shares one computation."""
+        with given([]) as _:
+            cache = LRUResultCache()
+            calls = []
+            release = threading.Event()
+
+            def compute():
+                calls.append(1)
+                release.wait(timeout=5)
+                return ["result"]
+
+        with when("eight threads request the same key at once"):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                futures = [
+                    pool.submit(cache.get_or_compute, "key", 1, compute) for _ in range(8)
+                ]
+                time.sleep(0.2)
+                release.set()
+                results = [f.result() for f in futures]
+
+        with then("compute ran once and everyone got its result"):
+            assert_that(len(calls), is_(equal_to(1)))
+            assert_that(results, is_(equal_to([["result"]] * 8)))
+            assert_that(cache.stats()["coalesced"], is_(equal_to(7)))
@@ -0,0 +1,110 @@
+"""Unit tests for the compute executor and BLAS thread limits."""
+
+import asyncio
+import threading
+import time
+import unittest
+
+import numpy as np
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, is_
+
+from app.serve.compute import (
+    BlasLibrary,
+    BlasThreadLimiter,
+    ComputeExecutor,
+    find_blas_libraries,
+)
+
+
+def fake_library(calls: list[int]) -> BlasLibrary:
+    return BlasLibrary("/lib/libopenblas.so", "openblas", lambda: 0, calls.append)
+
+
+class TestBlasThreadLimiter(unittest.TestCase):
+    def test_overlapping_sites_get_the_largest_limit_then_idle(self):
+        """A batch overlapping a query raises the limit; it drops back once both end."""
+        with given([]) as _:
+            calls: list[int] = []
+            limiter = BlasThreadLimiter([fake_library(calls)], idle_threads=1)
+
+        with when("a batch site starts while a query is running"):
+            with limiter.limit(1):
+                with limiter.limit(4):
+                    pass
+
+        with then("the batch limit applies only while it runs"):
+            assert_that(calls, is_(equal_to([1, 4, 1])))
+
+    def test_equal_limits_are_applied_once(self):
+        """With the same limit everywhere the BLAS setting is never touched again."""
+        with given([]) as _:
+            calls: list[int] = []
+            limiter = BlasThreadLimiter([fake_library(calls)], idle_threads=1)
+
+        with when("running many tasks"):
+            for _ in range(5):
+                with limiter.limit(1):
+                    pass
+
+        with then("only the first applied it"):
+            assert_that(calls, is_(equal_to([1])))
+
+    def test_finds_numpys_blas(self):
+        """NumPy's bundled OpenBLAS is found and its thread count round-trips."""
+        with given([]) as _:
+            np.ones((2, 2)) @ np.ones(2)  # NumPy's BLAS is loaded with it
+            libraries = find_blas_libraries()
+            if not libraries:
+                self.skipTest("no BLAS with a settable thread count in this build")
+            library = libraries[0]
+            before = library.threads
+
+        with when("setting one thread"):
+            library.set_threads(1)
+            after = library.threads
+            library.set_threads(before)
+
+        with then("it reads back"):
+            assert_that(after, is_(equal_to(1)))
+
+
+class TestComputeExecutor(unittest.TestCase):
+    def test_concurrency_is_bounded_by_workers(self):
+        """Eight concurrent submissions never run more than `workers` at once."""
+        with given([]) as _:
+            executor = ComputeExecutor(2, {"query": 1}, libraries=[])
+            self.addCleanup(executor.shutdown)
+            lock = threading.Lock()
+            running = [0]
+            peak = [0]
+
+            def work() -> None:
+                with lock:
+                    running[0] += 1
+                    peak[0] = max(peak[0], running[0])
+                time.sleep(0.05)
+                with lock:
+                    running[0] -= 1
+
+        with when("submitting eight tasks"):
+            futures = [executor.submit("query", work) for _ in range(8)]
+            for f in futures:
+                f.result()
+
+        with then("at most two ran together and all completed"):
+            assert_that(peak[0], is_(equal_to(2)))
+            assert_that(executor.stats()["completed"], is_(equal_to({"query": 8})))
+
+    def test_runs_from_sync_and_async_callers(self):
+        """`run` returns the result to threads and `arun` to coroutines."""
+        with given([]) as _:
+            executor = ComputeExecutor(1, {"query": 1, "batch": 2}, libraries=[])
+            self.addCleanup(executor.shutdown)
+
+        with when("calling it both ways"):
+            sync = executor.run("query", sum, [1, 2])
+            awaited = asyncio.run(executor.arun("batch", sum, [3, 4]))
+
+        with then("both get their results"):
+            assert_that((sync, awaited), is_(equal_to((3, 7))))
@@ -9,6 +9,7 @@ from hamcrest import assert_that, equal_to, is_
 
 from app.api.embeddings import (
     CrossLingualTranslator,
+    TokenVectorCache,
     compute_csls_penalty,
     extract_identical_string_dictionary,
     extract_parallel_proper_noun_anchors,
@@ -132,6 +133,170 @@ class TestEmbeddings(unittest.TestCase):
         with then("the closest target sentence is retrieved"):
             assert_that(translation, is_(equal_to("apple")))
 
+    def test_word_table_answers_known_words_only(self):
+        """The precomputed table matches word-by-word and keeps unknown words."""
+        with given([]) as _:
+            src_model = MagicMock()
+            tgt_model = MagicMock()
+            tgt_model.get_words.return_value = ["apple", "banana"]
+            tgt_model.get_word_vector.side_effect = lambda w: {
+                "apple": np.array([1.0, 0.0]),
+                "banana": np.array([0.0, 1.0]),
+            }.get(w, np.zeros(2))
+            src_model.get_words.return_value = ["mubuyu", "irigũ"]
+            src_model.get_word_vector.side_effect = lambda w: {
+                "mubuyu": np.array([0.9, 0.1]),
+                "irigũ": np.array([0.1, 0.9]),
+            }.get(w, np.zeros(2))
+            translator = CrossLingualTranslator(src_model, tgt_model, np.eye(2), [])
+
+        with when("building a one-word table and translating with it"):
+            translator.build_word_table(1)
+            result = translator.translate_with_word_table("Mubuyu irigũ")
+
+        with then("the tabled word is translated and the other is passed through"):
+            assert_that(len(translator.word_table), is_(equal_to(1)))
+            assert_that(result, is_(equal_to("apple irigũ")))
+
+    def test_token_cache_reuses_lookups_across_keystrokes(self):
+        """A growing prefix only looks up the words it has not seen before."""
+        with given([]) as _:
+            src_model = MagicMock()
+            tgt_model = MagicMock()
+            tgt_model.get_words.return_value = ["apple", "banana"]
+            tgt_model.get_word_vector.side_effect = lambda w: {
+                "apple": np.array([1.0, 0.0]),
+                "banana": np.array([0.0, 1.0]),
+            }.get(w, np.zeros(2))
+            src_model.get_words.return_value = ["mubuyu", "irigũ"]
+            src_model.get_word_vector.side_effect = lambda w: {
+                "mubuyu": np.array([0.9, 0.1]),
+                "irigũ": np.array([0.1, 0.9]),
+            }.get(w, np.zeros(2))
+            translator = CrossLingualTranslator(src_model, tgt_model, np.eye(2), [])
+            translator.translate_word_by_word("warm-up")
+            cache = TokenVectorCache()
+
+        with when("translating a prefix and then the longer text"):
+            src_model.get_word_vector.reset_mock()
+            first = translator.translate_word_by_word("mubuyu", cache)
+            second = translator.translate_word_by_word("mubuyu irigũ", cache)
+            translator.embed_query("mubuyu irigũ", cache)
+
+        with then("results match the uncached path and each word is looked up once"):
+            assert_that(first, is_(equal_to("apple")))
+            assert_that(second, is_(equal_to("apple banana")))
+            looked_up = [c.args[0] for c in src_model.get_word_vector.call_args_list]
+            assert_that(looked_up, is_(equal_to(["mubuyu", "irigũ"])))
+
+    def test_batched_embeddings_match_single_queries(self):
+        """Batched query rows equal `embed_query`; unknown texts and targets are handled."""
+        with given([]) as _:
+            src_model = MagicMock()
+            tgt_model = MagicMock()
+            src_model.get_word_vector.side_effect = lambda w: {
+                "mubuyu": np.array([3.0, 1.0], dtype=np.float32),
+                "irigũ": np.array([0.0, 2.0], dtype=np.float32),
+            }.get(w, np.zeros(2, dtype=np.float32))
+            src_model.get_dimension.return_value = 2
+            tgt_model.get_word_vector.side_effect = lambda w: {
+                "apple": np.array([0.0, 5.0], dtype=np.float32),
+            }.get(w, np.zeros(2, dtype=np.float32))
+            rotation = np.array([[0.0, -1.0], [1.0, 0.0]])
+            translator = CrossLingualTranslator(src_model, tgt_model, rotation, [])
+            texts = ["mubuyu", "mubuyu irigũ", "", "ũnknown"]
+
+        with when("embedding them as queries and as targets"):
+            batched = translator.embed_queries(texts)
+            targets = translator.embed_targets(["apple", "ũnknown"])
+
+        with then("known rows are the single-query unit vectors, the rest zeros"):
+            for row, text in zip(batched[:2], texts[:2], strict=True):
+                np.testing.assert_allclose(row, translator.embed_query(text), atol=1e-7)
+            assert_that(batched[2:].any(), is_(False))
+            np.testing.assert_allclose(targets, [[0.0, 1.0], [0.0, 0.0]])
+
+    def test_translator_retrieve_top_k_ranks_candidates(self):
+        """retrieve_top_k should return bank sentences best-first with CSLS scores."""
+        with given([]) as _:
+            mock_src_model = MagicMock()
+            mock_tgt_model = MagicMock()
+            vectors = {
+                "apple": np.array([1.0, 0.0]),
+                "banana": np.array([0.0, 1.0]),
+                "cherry": np.array([0.7, 0.7]),
+            }
+            mock_tgt_model.get_word_vector.side_effect = lambda w: vectors.get(
+                w, np.zeros(2)
+            )
+            mock_src_model.get_word_vector.side_effect = lambda w: (
+                np.array([0.9, 0.1]) if w == "mubuyu" else np.zeros(2)
+            )
+            translator = CrossLingualTranslator(
+                src_model=mock_src_model,
+                tgt_model=mock_tgt_model,
+                projection_matrix=np.eye(2),
+                tgt_sentences=["apple", "banana", "cherry"],
+                csls_k=1,
+            )
+
+        with when("retrieving the top-2 candidates"):
+            candidates = translator.retrieve_top_k("mubuyu", 2)
+
+        with then("candidates are ordered by descending score"):
+            assert_that([c[0] for c in candidates], is_(equal_to(["apple", "cherry"])))
+            assert_that(candidates[0][1] >= candidates[1][1], is_(True))
+
+    def test_translator_retrieve_top_k_filters_by_domain(self):
+        """A domain filter should only return bank rows tagged with that domain."""
+        with given([]) as _:
+            mock_src_model = MagicMock()
+            mock_tgt_model = MagicMock()
+            vectors = {
+                "psalm": np.array([1.0, 0.0]),
+                "coffee": np.array([0.6, 0.8]),
+                "maize": np.array([0.0, 1.0]),
+            }
+            mock_tgt_model.get_word_vector.side_effect = lambda w: vectors.get(
+                w, np.zeros(2)
+            )
+            mock_src_model.get_word_vector.side_effect = lambda w: (
+                np.array([1.0, 0.1]) if w == "query" else np.zeros(2)
+            )
+            translator = CrossLingualTranslator(
+                src_model=mock_src_model,
+                tgt_model=mock_tgt_model,
+                projection_matrix=np.eye(2),
+                tgt_sentences=["psalm", "coffee", "maize"],
+                csls_k=1,
+                tgt_domains=["bible", "agriculture", "agriculture"],
+            )
+
+        with when("retrieving with and without the agriculture filter"):
+            unfiltered = translator.retrieve_top_k("query", 1)
+            filtered = translator.retrieve_top_k("query", 3, domains=["agriculture"])
+
+        with then("the filter excludes the closer bible verse"):
+            assert_that(unfiltered[0][0], is_(equal_to("psalm")))
+            assert_that([c[0] for c in filtered], is_(equal_to(["coffee", "maize"])))
+
+    def test_translator_rejects_unknown_domain(self):
+        """Filtering by a domain the bank does not contain raises ValueError."""
+        with given([]) as _:
+            mock_model = MagicMock()
+            mock_model.get_word_vector.return_value = np.array([1.0, 0.0])
+            translator = CrossLingualTranslator(
+                src_model=mock_model,
+                tgt_model=mock_model,
+                projection_matrix=np.eye(2),
+                tgt_sentences=["a"],
+                tgt_domains=["bible"],
+            )
+
+        with then("an unknown domain is reported"):
+            with self.assertRaises(ValueError):
+                translator.retrieve_top_k("a", 1, domains=["medicine"])
+
     def test_translator_word_by_word(self):
         """Translator should translate word-by-word by mapping vocab items."""
         with given([]) as _:
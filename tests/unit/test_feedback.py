@@ -0,0 +1,244 @@
+"""Unit tests for the background feedback writer."""
+
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, greater_than, is_
+
+from app.api.bank import load_parallel_bank
+from app.serve.feedback import FeedbackStore, FeedbackWriter
+
+
+def read_entries(path: str) -> list[dict]:
+    """Entries across the live file and its rotations, oldest file first."""
+    entries = []
+    for name in sorted(glob.glob(f"{path}.*"), key=os.path.getmtime) + [path]:
+        if name.endswith(".lock") or not os.path.exists(name):
+            continue
+        with open(name, encoding="utf-8") as f:
+            entries.extend(json.loads(line) for line in f)
+    return entries
+
+
+def rating(source: str, target: str, value: int, **extra: object) -> dict:
+    return {
+        "source_text": source,
+        "target_text": target,
+        "source_lang": "ki",
+        "target_lang": "en",
+        "method": "retrieval",
+        "rating": value,
+        **extra,
+    }
+
+
+def write_from_process(path: str, worker: int, count: int) -> None:
+    writer = FeedbackWriter(path, fsync_interval_s=0, max_bytes=20_000)
+    for i in range(count):
+        writer.put({"worker": worker, "i": i, "padding": "x" * 200})
+    writer.close()
+
+
+class TestFeedbackWriter(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmpdir.name, "feedback", "feedback.jsonl")
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def test_close_drains_queued_entries_in_order(self):
+        """Everything queued before close is on disk, in order, as whole lines."""
+        with given([]) as _:
+            writer = FeedbackWriter(self.path, fsync_interval_s=60)
+
+        with when("queueing entries and closing at once"):
+            for i in range(100):
+                writer.put({"i": i, "comment": "wĩ mwega"})
+            writer.close()
+
+        with then("all were written and fsynced on close"):
+            assert_that(
+                [e["i"] for e in read_entries(self.path)], is_(equal_to(list(range(100))))
+            )
+            stats = writer.stats()
+            assert_that((stats["written"], stats["pending"]), is_(equal_to((100, 0))))
+            assert_that(stats["fsyncs"], greater_than(0))
+
+    def test_rotates_by_size_without_losing_entries(self):
+        """Past max_bytes the file is renamed aside and writing continues in a new one."""
+        with given([]) as _:
+            writer = FeedbackWriter(self.path, fsync_interval_s=0, max_bytes=2_000)
+
+        with when("writing well over the limit in several batches"):
+            for i in range(40):
+                writer.put({"i": i, "padding": "x" * 100})
+                time.sleep(0.002)
+            writer.close()
+
+        with then("there are rotated files and every entry survives once"):
+            assert_that(writer.stats()["rotations"], greater_than(0))
+            assert_that(
+                sorted(e["i"] for e in read_entries(self.path)),
+                is_(equal_to(list(range(40)))),
+            )
+
+    def test_rotates_a_file_last_written_in_an_earlier_period(self):
+        """A log untouched since the previous period is rolled before the next append."""
+        with given([]) as _:
+            os.makedirs(os.path.dirname(self.path))
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"i": "old"}) + "\n")
+            yesterday = time.time() - 86_400
+            os.utime(self.path, (yesterday, yesterday))
+            writer = FeedbackWriter(self.path, rotate_s=3600)
+
+        with when("appending today"):
+            writer.put({"i": "new"})
+            writer.close()
+
+        with then("the old entry is in a rotated file and the live file is fresh"):
+            with open(self.path, encoding="utf-8") as f:
+                assert_that([json.loads(line)["i"] for line in f], is_(equal_to(["new"])))
+            assert_that(writer.stats()["rotations"], is_(equal_to(1)))
+
+    def test_full_queue_rejects(self):
+        """Entries beyond max_pending are refused instead of blocking the request."""
+        with given([]) as _:
+            writer = FeedbackWriter(self.path, max_pending=0)
+
+        with when("queueing into a full queue"):
+            accepted = writer.put({"i": 1})
+
+        with then("it is rejected and counted"):
+            assert_that(accepted, is_(False))
+            assert_that(writer.stats()["rejected"], is_(equal_to(1)))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "needs fork and flock")
+    def test_processes_writing_and_rotating_together_keep_lines_whole(self):
+        """Two workers appending and rotating the same log never tear a line."""
+        with given([]) as _:
+            ctx = multiprocessing.get_context("fork")
+            workers = [
+                ctx.Process(target=write_from_process, args=(self.path, w, 300))
+                for w in range(2)
+            ]
+
+        with when("both write at once"):
+            for p in workers:
+                p.start()
+            for p in workers:
+                p.join(timeout=30)
+
+        with then("every entry of both parses exactly once"):
+            entries = read_entries(self.path)
+            seen = sorted((e["worker"], e["i"]) for e in entries)
+            assert_that(seen, is_(equal_to([(w, i) for w in range(2) for i in range(300)])))
+
+
+class TestFeedbackStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.store = FeedbackStore(os.path.join(self._tmpdir.name, "feedback.sqlite3"))
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def test_counts_per_query_and_ignores_entries_seen_before(self):
+        """Wording variants of a query share counts; re-adding an entry changes nothing."""
+        with given([]) as _:
+            entries = [
+                rating("Wĩ mwega?", "Are you well", -1, id="a"),
+                rating("wĩ mwega", "Are you well", -1, id="b"),
+                rating("wĩ mwega", "Are you well", 1, id="c"),
+                rating("Nĩ wega", "Thank you", -1, id="d"),
+            ]
+
+        with when("adding them twice"):
+            first = self.store.add(entries)
+            second = self.store.add(entries)
+            stats = self.store.stats()
+
+        with then("each counts once and the worst query comes first"):
+            assert_that((first, second), is_(equal_to((4, 0))))
+            worst = stats["most_unhelpful"]
+            assert_that(
+                [(q["source_text"], q["unhelpful"], q["helpful"]) for q in worst],
+                is_(equal_to([("Wĩ mwega?", 2, 1), ("Nĩ wega", 1, 0)])),
+            )
+            assert_that(
+                stats["totals"],
+                is_(
+                    equal_to([
+                        {
+                            "direction": "ki_en",
+                            "method": "retrieval",
+                            "helpful": 1,
+                            "unhelpful": 3,
+                        }
+                    ])
+                ),
+            )
+
+    def test_stats_can_be_scoped(self):
+        """Filtering by direction and method only returns that scope."""
+        with given([]) as _:
+            self.store.add([
+                rating("wĩ mwega", "Are you well", -1, id="a"),
+                rating("wĩ mwega", "Are you well", -1, id="b", method="word-by-word"),
+            ])
+
+        with when("asking for word-by-word only"):
+            stats = self.store.stats("ki_en", "word-by-word")
+
+        with then("only that method is counted"):
+            assert_that(len(stats["most_unhelpful"]), is_(equal_to(1)))
+            assert_that(stats["totals"][0]["method"], is_(equal_to("word-by-word")))
+
+    def test_exports_positive_pairs_in_the_parallel_csv_schema(self):
+        """Net-positive pairs of both directions load as Kikuyu/English bank rows."""
+        with given([]) as _:
+            self.store.add([
+                rating("marigū", "Bananas", 1, id="a"),
+                rating("marigū", "Mangoes", -1, id="b"),
+                {
+                    **rating("thank you", "nĩ wega", 1, id="c"),
+                    "source_lang": "en",
+                    "target_lang": "ki",
+                },
+            ])
+            export_dir = os.path.join(self._tmpdir.name, "parallel")
+
+        with when("exporting and loading the CSV like the corpus"):
+            count = self.store.export_positive_pairs(os.path.join(export_dir, "f.csv"))
+            ki, en, _ = load_parallel_bank(export_dir, {})
+
+        with then("both positive pairs are there, oriented Kikuyu/English"):
+            assert_that(count, is_(equal_to(2)))
+            assert_that(
+                sorted(zip(ki, en, strict=True)),
+                is_(equal_to([("marigū", "Bananas"), ("nĩ wega", "thank you")])),
+            )
+
+    def test_writer_keeps_the_store_in_step(self):
+        """Entries written by the background writer are counted in the store."""
+        with given([]) as _:
+            writer = FeedbackWriter(
+                os.path.join(self._tmpdir.name, "feedback.jsonl"), store=self.store
+            )
+
+        with when("writing two ratings"):
+            writer.put(rating("wĩ mwega", "Are you well", -1, id="a"))
+            writer.put(rating("wĩ mwega", "Are you well", -1, id="b"))
+            writer.close()
+
+        with then("the store has them"):
+            worst = self.store.stats()["most_unhelpful"]
+            assert_that(worst[0]["unhelpful"], is_(equal_to(2)))
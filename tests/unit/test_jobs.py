@@ -0,0 +1,169 @@
+"""Unit tests for background bulk-translation jobs."""
+
+import csv
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, is_
+
+from app.serve.jobs import BulkJobs
+
+
+def upper(direction: str, method: str, texts: list[str]) -> list[str]:
+    return [t.upper() for t in texts]
+
+
+def wait_for(jobs: BulkJobs, job_id: str, statuses: tuple[str, ...]) -> dict:
+    for _ in range(200):
+        state = jobs.status(job_id)
+        if state is not None and state["status"] in statuses:
+            return state
+        time.sleep(0.01)
+    raise AssertionError(f"job stayed {state and state['status']}")
+
+
+class TestBulkJobs(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = self._tmpdir.name
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def upload(self, jobs: BulkJobs, data: bytes) -> tuple[str, str]:
+        job_id, path = jobs.new_job()
+        with open(path, "wb") as f:
+            f.write(data)
+        return job_id, path
+
+    def read_output(self, jobs: BulkJobs, job_id: str, delimiter: str = ",") -> list:
+        with open(jobs.output_path(job_id), encoding="utf-8", newline="") as f:
+            return list(csv.reader(f, delimiter=delimiter))
+
+    def test_translates_one_column_keeping_the_others(self):
+        """Quoted fields, embedded newlines and blank cells come through intact."""
+        with given([]) as _:
+            jobs = BulkJobs(self.root, upper, batch_size=2)
+            data = (
+                "﻿id,text,note\n"
+                '1,wĩ mwega,"a, b"\n'
+                '2,"nĩ wega\nmũno",\n'
+                "3,,empty\n"
+                "4,marigū,x\n"
+            ).encode()
+            job_id, _ = self.upload(jobs, data)
+
+        with when("running it to completion"):
+            jobs.submit(job_id, "text", "ki_en", "retrieval", "csv")
+            jobs.start()
+            self.addCleanup(jobs.stop)
+            state = wait_for(jobs, job_id, ("completed", "failed"))
+
+        with then("every row has its translation appended"):
+            assert_that(
+                (state["status"], state["rows_done"]), is_(equal_to(("completed", 4)))
+            )
+            assert_that(state["progress"], is_(equal_to(1.0)))
+            assert_that(
+                self.read_output(jobs, job_id),
+                is_(
+                    equal_to([
+                        ["id", "text", "note", "translation"],
+                        ["1", "wĩ mwega", "a, b", "WĨ MWEGA"],
+                        ["2", "nĩ wega\nmũno", "", "NĨ WEGA\nMŨNO"],
+                        ["3", "", "empty", ""],
+                        ["4", "marigū", "x", "MARIGŪ"],
+                    ])
+                ),
+            )
+
+    def test_tsv_and_unknown_columns(self):
+        """TSV output stays TSV; a missing column is rejected and its upload removed."""
+        with given([]) as _:
+            jobs = BulkJobs(self.root, upper)
+            good, _ = self.upload(jobs, "text\tid\nwĩ mwega\t1\n".encode())
+            bad, bad_path = self.upload(jobs, b"id,english\n1,hello\n")
+
+        with when("submitting both"):
+            jobs.submit(good, "text", "ki_en", "word-by-word", "tsv")
+            with self.assertRaises(ValueError):
+                jobs.submit(bad, "text", "ki_en", "retrieval", "csv")
+            jobs.start()
+            self.addCleanup(jobs.stop)
+            wait_for(jobs, good, ("completed", "failed"))
+
+        with then("the TSV is translated and the bad job is gone"):
+            assert_that(
+                self.read_output(jobs, good, "\t"),
+                is_(
+                    equal_to([["text", "id", "translation"], ["wĩ mwega", "1", "WĨ MWEGA"]])
+                ),
+            )
+            assert_that(os.path.exists(bad_path), is_(False))
+            assert_that(jobs.status(bad), is_(None))
+
+    def test_resumes_after_a_restart_without_repeating_rows(self):
+        """A job stopped mid-file continues from its saved offsets in a new instance."""
+        with given([]) as _:
+            rows = "".join(f"{i},sentence {i}\n" for i in range(10))
+            seen: list[str] = []
+            translated = threading.Event()
+            first: BulkJobs
+
+            def stop_after_first_batch(direction, method, texts):
+                seen.extend(texts)
+                first._stopping.set()  # As stop() does, before it joins the workers
+                translated.set()
+                return upper(direction, method, texts)
+
+            first = BulkJobs(self.root, stop_after_first_batch, batch_size=3)
+            job_id, _ = self.upload(first, f"id,text\n{rows}".encode())
+            first.submit(job_id, "text", "ki_en", "retrieval", "csv")
+
+        with when("the first server stops after one batch and a second one starts"):
+            first.start()
+            translated.wait(timeout=5)
+            first.stop()
+            stopped = first.status(job_id)
+
+            def record(direction, method, texts):
+                seen.extend(texts)
+                return upper(direction, method, texts)
+
+            second = BulkJobs(self.root, record, batch_size=3)
+            second.start()
+            self.addCleanup(second.stop)
+            done = wait_for(second, job_id, ("completed", "failed"))
+
+        with then("each row was translated once and the output is complete"):
+            assert_that(stopped["rows_done"], is_(equal_to(3)))
+            assert_that(0 < stopped["progress"] < 1, is_(True))
+            assert_that(seen, is_(equal_to([f"sentence {i}" for i in range(10)])))
+            assert_that(done["rows_done"], is_(equal_to(10)))
+            output = self.read_output(second, job_id)
+            assert_that(len(output), is_(equal_to(11)))
+            assert_that(output[-1], is_(equal_to(["9", "sentence 9", "SENTENCE 9"])))
+
+    def test_failed_batches_mark_the_job_failed(self):
+        """An error in translation is reported on the job instead of killing the worker."""
+        with given([]) as _:
+
+            def broken(direction, method, texts):
+                raise RuntimeError("model went away")
+
+            jobs = BulkJobs(self.root, broken)
+            job_id, _ = self.upload(jobs, b"text\nhello\n")
+
+        with when("running it"):
+            jobs.submit(job_id, "text", "en_ki", "retrieval", "csv")
+            jobs.start()
+            self.addCleanup(jobs.stop)
+            state = wait_for(jobs, job_id, ("completed", "failed"))
+
+        with then("it failed with the error"):
+            assert_that(state["status"], is_(equal_to("failed")))
+            assert_that(state["error"], is_(equal_to("model went away")))
@@ -0,0 +1,84 @@
+"""Unit tests for offline bulk translation."""
+
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, is_
+
+from app.serve.offline import translate_many
+
+
+class FakeTranslator:
+    """Uppercases retrieval queries; word-by-word reverses words and names the process."""
+
+    def __init__(self) -> None:
+        self.batches: list[int] = []
+
+    def retrieve_top_k_many(self, texts, k, domains=None):
+        self.batches.append(len(texts))
+        return [[(text.upper(), 1.0)] for text in texts]
+
+    def translate_word_by_word(self, text):
+        return f"{' '.join(reversed(text.split()))}@{os.getpid()}"
+
+
+class TestTranslateMany(unittest.TestCase):
+    def setUp(self) -> None:
+        self.translator = FakeTranslator()
+        loader = patch("app.serve.offline.load_translator", return_value=self.translator)
+        loader.start()
+        self.addCleanup(loader.stop)
+
+    def test_retrieval_is_batched_and_ordered(self):
+        """Texts are consumed lazily in batches and blank ones stay blank."""
+        with given([]) as _:
+            texts = [f"sentence {i}" if i % 4 else "" for i in range(10)]
+
+        with when("translating with batches of four"):
+            out = list(translate_many(iter(texts), "ki", "en", batch_size=4))
+
+        with then("each text maps to its translation in place"):
+            assert_that(out, is_(equal_to([t.upper() for t in texts])))
+            assert_that(self.translator.batches, is_(equal_to([3, 3, 1])))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "needs fork")
+    def test_word_by_word_pool_keeps_input_order(self):
+        """Batches finish on several processes but come back in input order."""
+        with given([]) as _:
+            texts = [f"a{i} b{i}" for i in range(200)]
+
+        with when("translating word by word on two processes"):
+            out = list(
+                translate_many(texts, "en", "ki", "word-by-word", batch_size=7, processes=2)
+            )
+
+        with then("the order holds and the work ran outside this process"):
+            words = [t.split("@")[0] for t in out]
+            assert_that(words, is_(equal_to([f"b{i} a{i}" for i in range(200)])))
+            pids = {t.split("@")[1] for t in out}
+            assert_that(str(os.getpid()) in pids, is_(False))
+
+    def test_rejects_unknown_methods_and_pairs(self):
+        """Bad arguments fail before anything is read."""
+        with then("they raise ValueError"):
+            with self.assertRaises(ValueError):
+                translate_many([], "ki", "ki")
+            with self.assertRaises(ValueError):
+                translate_many([], "ki", "en", "phrase")
+
+
+class TestOfflineImport(unittest.TestCase):
+    def test_importing_does_not_build_the_server(self):
+        """Offline translation loads without importing the FastAPI app."""
+        with when("importing the offline module in a fresh interpreter"):
+            code = "import sys, app.serve.offline; print('app.serve.main' in sys.modules)"
+            out = subprocess.run(
+                [sys.executable, "-c", code], capture_output=True, text=True, check=True
+            ).stdout
+
+        with then("app.serve.main was never imported"):
+            assert_that(out.strip(), is_(equal_to("False")))
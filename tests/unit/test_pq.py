@@ -0,0 +1,156 @@
+"""Unit tests for the product-quantization sentence index."""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, greater_than, is_
+
+from app.api.embeddings import compute_csls_penalty
+from app.api.pq import PQSentenceIndex, ProductQuantizer, evaluate_pq_recall
+from app.api.retrieval import ExactSentenceIndex, normalize_rows
+
+
+def _clustered_bank(n: int = 600, dim: int = 12, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(20, dim))
+    return (centers[rng.integers(0, 20, n)] + 0.05 * rng.normal(size=(n, dim))).astype(
+        np.float32
+    )
+
+
+class TestProductQuantizer(unittest.TestCase):
+    def test_decode_approximates_encoded_vectors(self):
+        """Reconstructed vectors should be much closer to the originals than random."""
+        with given([]) as _:
+            bank = normalize_rows(_clustered_bank())
+            pq = ProductQuantizer.train(bank, n_subvectors=4, n_centroids=32)
+
+        with when("encoding and decoding the bank"):
+            codes = pq.encode(bank)
+            recon = pq.decode(codes)
+
+        with then("codes are uint8 and the reconstruction error is small"):
+            assert_that(codes.dtype, is_(equal_to(np.uint8)))
+            assert_that(codes.shape, is_(equal_to((len(bank), 4))))
+            err = np.linalg.norm(recon - bank, axis=1).mean()
+            assert_that(float(err) < 0.2, is_(True))
+
+    def test_pads_dimensions_not_divisible_by_subvectors(self):
+        """A dimension that does not split evenly is zero-padded internally."""
+        with given([]) as _:
+            bank = normalize_rows(_clustered_bank(dim=10))
+
+        with when("training with 3 sub-vectors over 10 dimensions"):
+            pq = ProductQuantizer.train(bank, n_subvectors=3, n_centroids=16)
+
+        with then("decoded vectors keep the original dimension"):
+            assert_that(pq.decode(pq.encode(bank[:5])).shape, is_(equal_to((5, 10))))
+
+    def test_adc_scores_match_inner_product_with_decoded_rows(self):
+        """ADC lookup-table scores equal the dot product with reconstructed rows."""
+        with given([]) as _:
+            bank = normalize_rows(_clustered_bank())
+            pq = ProductQuantizer.train(bank, n_subvectors=4, n_centroids=32)
+            codes = pq.encode(bank)
+            query = bank[7]
+
+        with when("scoring via the distance table"):
+            scores = pq.adc_scores(pq.distance_table(query), codes)
+
+        with then("they match the decoded inner products"):
+            np.testing.assert_allclose(
+                scores, pq.decode(codes) @ query, rtol=1e-4, atol=1e-5
+            )
+
+
+class TestPQSentenceIndex(unittest.TestCase):
+    def test_reranked_search_matches_exact_top1(self):
+        """With exact re-ranking the PQ top-1 agrees with the exact CSLS scan."""
+        with given([]) as _:
+            rng = np.random.default_rng(11)
+            bank = rng.normal(size=(600, 12)).astype(np.float32)
+            penalty = compute_csls_penalty(bank, bank, k=5)
+            exact = ExactSentenceIndex(bank, penalty)
+            index = PQSentenceIndex.build(bank, penalty, n_subvectors=4, n_centroids=32)
+            index.rerank_vectors = bank
+            queries = normalize_rows(bank[:50] + 0.1 * rng.normal(size=(50, 12)))
+
+        with when("searching both indexes"):
+            agree = sum(
+                int(exact.search(q, 1)[0][0] == index.search(q, 1)[0][0]) for q in queries
+            )
+
+        with then("the top-1 rows agree for nearly every query"):
+            assert_that(agree, greater_than(45))
+
+    def test_save_and_load_roundtrip(self):
+        """A saved index reloads with identical codes, penalties and results."""
+        with given([]) as _:
+            bank = _clustered_bank(n=200)
+            penalty = compute_csls_penalty(bank, bank, k=5)
+            index = PQSentenceIndex.build(bank, penalty, n_subvectors=4, n_centroids=16)
+            query = normalize_rows(bank[:1])[0]
+
+        with when("saving and reloading the index"):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = os.path.join(tmpdir, "pq_en.npz")
+                index.save(path)
+                loaded = PQSentenceIndex.load(path)
+
+        with then("search results are unchanged"):
+            np.testing.assert_array_equal(loaded.codes, index.codes)
+            np.testing.assert_array_equal(
+                loaded.search(query, 5)[0], index.search(query, 5)[0]
+            )
+            assert_that(loaded.compression_ratio(), greater_than(1.0))
+
+    def test_recall_report_contains_requested_ks(self):
+        """The recall report lists recall@k for each k plus query latency."""
+        with given([]) as _:
+            bank = _clustered_bank(n=200)
+            penalty = compute_csls_penalty(bank, bank, k=5)
+            index = PQSentenceIndex.build(bank, penalty, n_subvectors=4, n_centroids=16)
+
+        with when("evaluating recall on bank rows as queries"):
+            report = evaluate_pq_recall(index, bank, normalize_rows(bank[:20]), ks=(1, 10))
+
+        with then("recall@10 is at least recall@1"):
+            assert_that(report["recall_at_10"] >= report["recall_at_1"], is_(True))
+            assert_that("mean_query_ms" in report, is_(True))
+
+    def test_added_rows_are_reranked_without_copying_the_memory_map(self):
+        """Appended rows go to an in-memory delta; the memory-mapped bank stays mapped."""
+        with given([]) as _:
+            rng = np.random.default_rng(7)
+            bank = rng.normal(size=(300, 12)).astype(np.float32)
+            added = rng.normal(size=(20, 12)).astype(np.float32)
+            grown = np.vstack([bank, added])
+            penalty = compute_csls_penalty(grown, grown, k=5)
+            tmpdir = tempfile.mkdtemp()
+            path = os.path.join(tmpdir, "tgt_embs_en.npy")
+            np.save(path, bank)
+            mapped = np.load(path, mmap_mode="r")
+            index = PQSentenceIndex.build(
+                bank, penalty[:300], n_subvectors=4, n_centroids=32
+            )
+            index.rerank_vectors = mapped
+            exact = ExactSentenceIndex(grown, penalty)
+
+        with when("adding rows in two batches and searching near old and new rows"):
+            extended = index.extended(added[:5], penalty[:305]).extended(added[5:], penalty)
+            results = [
+                extended.search(normalize_rows(grown[[row]])[0], 3) for row in (4, 310)
+            ]
+
+        with then("the bank is still the memory map and the scores match an exact scan"):
+            assert_that(extended.rerank_vectors is mapped, is_(True))
+            assert_that(extended.rerank_delta.shape, is_(equal_to((20, 12))))
+            for row, (ids, scores) in zip((4, 310), results, strict=True):
+                query = normalize_rows(grown[[row]])[0]
+                exact_ids, exact_scores = exact.search(query, 3)
+                assert_that(ids[0], is_(equal_to(row)))
+                assert_that(ids[0], is_(equal_to(exact_ids[0])))
+                np.testing.assert_allclose(scores[0], exact_scores[0], rtol=1e-5)
@@ -0,0 +1,161 @@
+"""Unit tests for the exact and cascade sentence-bank indexes."""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, greater_than, is_
+
+from app.api.embeddings import compute_csls_penalty
+from app.api.retrieval import (
+    CascadeSentenceIndex,
+    ExactSentenceIndex,
+    PCABasis,
+    contiguous_ranges,
+    normalize_rows,
+    top_k_indices,
+)
+
+
+def _bank(n: int = 500, dim: int = 32, seed: int = 5) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # Low-rank structure plus noise, like averaged word vectors
+    basis = rng.normal(size=(8, dim))
+    return (rng.normal(size=(n, 8)) @ basis + 0.1 * rng.normal(size=(n, dim))).astype(
+        np.float32
+    )
+
+
+class TestTopKIndices(unittest.TestCase):
+    def test_returns_best_first(self):
+        """top_k_indices returns the highest scores in descending order."""
+        with given([]) as _:
+            scores = np.array([0.1, 0.9, 0.4, 0.7])
+
+        with when("selecting the top 3"):
+            top = top_k_indices(scores, 3)
+
+        with then("indices are sorted by score"):
+            assert_that(top.tolist(), is_(equal_to([1, 3, 2])))
+
+    def test_k_larger_than_scores(self):
+        """Requesting more rows than exist returns every row."""
+        with when("selecting the top 10 of 2"):
+            top = top_k_indices(np.array([0.2, 0.5]), 10)
+
+        with then("both rows are returned"):
+            assert_that(top.tolist(), is_(equal_to([1, 0])))
+
+
+class TestRowRanges(unittest.TestCase):
+    def test_contiguous_ranges_groups_runs_per_label(self):
+        """Each label maps to the [start, end) runs where it appears."""
+        with when("grouping labels with a split domain"):
+            ranges = contiguous_ranges(["bible", "bible", "agri", "agri", "bible"])
+
+        with then("runs are recorded in row order"):
+            assert_that(
+                ranges, is_(equal_to({"bible": [(0, 2), (4, 5)], "agri": [(2, 4)]}))
+            )
+
+    def test_exact_search_only_returns_rows_in_ranges(self):
+        """Restricting the scan to ranges never returns rows outside them."""
+        with given([]) as _:
+            bank = _bank(n=100)
+            index = ExactSentenceIndex(bank, compute_csls_penalty(bank, bank, k=5))
+            query = normalize_rows(bank[5:6])[0]
+
+        with when("searching only rows 40-60 and 80-90"):
+            ids, _ = index.search(query, 10, ranges=[(40, 60), (80, 90)])
+
+        with then("every returned row lies inside the ranges"):
+            assert_that(len(ids), is_(equal_to(10)))
+            assert_that(all(40 <= i < 60 or 80 <= i < 90 for i in ids), is_(True))
+
+    def test_ranged_search_matches_full_search_restricted(self):
+        """A ranged scan ranks rows exactly as the full scan does within those rows."""
+        with given([]) as _:
+            bank = _bank(n=100)
+            penalty = compute_csls_penalty(bank, bank, k=5)
+            index = ExactSentenceIndex(bank, penalty)
+            query = normalize_rows(bank[50:51])[0]
+
+        with when("searching the full bank and the second half"):
+            full_ids, _ = index.search(query, 100)
+            half_ids, _ = index.search(query, 5, ranges=[(50, 100)])
+
+        with then("the ranged top-5 is the full ranking filtered to the range"):
+            expected = [i for i in full_ids.tolist() if i >= 50][:5]
+            assert_that(half_ids.tolist(), is_(equal_to(expected)))
+
+    def test_search_many_matches_single_queries(self):
+        """Batched exact search returns what one search per query returns."""
+        with given([]) as _:
+            bank = _bank(n=200)
+            index = ExactSentenceIndex(bank, compute_csls_penalty(bank, bank, k=5))
+            queries = normalize_rows(bank[:40] + 0.1)
+
+        with when("searching all queries at once within a range"):
+            batched = index.search_many(queries, 3, ranges=[(20, 150)])
+
+        with then("each result equals the single-query search"):
+            for q, (ids, scores) in zip(queries, batched, strict=True):
+                single_ids, single_scores = index.search(q, 3, ranges=[(20, 150)])
+                assert_that(ids.tolist(), is_(equal_to(single_ids.tolist())))
+                np.testing.assert_allclose(scores, single_scores, rtol=1e-5)
+
+
+class TestCascadeSentenceIndex(unittest.TestCase):
+    def test_full_shortlist_matches_exact_scan(self):
+        """A shortlist covering the whole bank gives exactly the exact-scan ranking."""
+        with given([]) as _:
+            bank = _bank()
+            penalty = compute_csls_penalty(bank, bank, k=5)
+            exact = ExactSentenceIndex(bank, penalty)
+            cascade = CascadeSentenceIndex(bank, penalty, PCABasis.fit(bank, 8))
+            query = normalize_rows(bank[:1] + 0.05)[0]
+
+        with when("searching with shortlist=len(bank)"):
+            ids, scores = cascade.search(query, 5, shortlist=len(bank))
+
+        with then("results equal the exact index"):
+            exact_ids, exact_scores = exact.search(query, 5)
+            assert_that(ids.tolist(), is_(equal_to(exact_ids.tolist())))
+            np.testing.assert_allclose(scores, exact_scores, rtol=1e-5)
+
+    def test_small_shortlist_keeps_exact_top1(self):
+        """A small coarse shortlist still finds the exact top-1 for most queries."""
+        with given([]) as _:
+            bank = _bank()
+            penalty = compute_csls_penalty(bank, bank, k=5)
+            exact = ExactSentenceIndex(bank, penalty)
+            cascade = CascadeSentenceIndex(bank, penalty, PCABasis.fit(bank, 8))
+            rng = np.random.default_rng(1)
+            queries = normalize_rows(bank[:40] + 0.2 * rng.normal(size=(40, 32)))
+
+        with when("searching with a 25-row shortlist"):
+            agree = sum(
+                int(cascade.search(q, 1, shortlist=25)[0][0] == exact.search(q, 1)[0][0])
+                for q in queries
+            )
+
+        with then("nearly all top-1 answers agree"):
+            assert_that(agree, greater_than(36))
+
+    def test_pca_basis_save_and_load(self):
+        """A saved PCA basis reloads with identical mean and components."""
+        with given([]) as _:
+            basis = PCABasis.fit(_bank(), n_components=4)
+
+        with when("saving and loading the basis"):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = os.path.join(tmpdir, "pca_en.npz")
+                basis.save(path)
+                loaded = PCABasis.load(path)
+
+        with then("the arrays round-trip"):
+            np.testing.assert_array_equal(loaded.mean, basis.mean)
+            np.testing.assert_array_equal(loaded.components, basis.components)
+            assert_that(loaded.components.shape, is_(equal_to((32, 4))))
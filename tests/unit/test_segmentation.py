@@ -0,0 +1,76 @@
+"""Unit tests for document paragraph and sentence segmentation."""
+
+import unittest
+
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, is_
+
+from app.api.segmentation import segment_document, split_sentences
+
+
+class TestSentenceSegmentation(unittest.TestCase):
+    def test_closing_quotes_stay_with_their_sentence(self):
+        """Kikuyu quoted speech keeps its closing quote and splits before the next word."""
+        with when("splitting quoted speech"):
+            sentences = split_sentences(
+                "Akĩuga atĩrĩ: “Kahũa nĩ kabataraga maĩ.” Akĩongera, “Tiga!” Ĩĩ, nĩ wega."
+            )
+
+        with then("each sentence ends with its punctuation and quote"):
+            assert_that(
+                sentences,
+                is_(
+                    equal_to([
+                        "Akĩuga atĩrĩ: “Kahũa nĩ kabataraga maĩ.”",
+                        "Akĩongera, “Tiga!”",
+                        "Ĩĩ, nĩ wega.",
+                    ])
+                ),
+            )
+
+    def test_abbreviations_and_initials_do_not_split(self):
+        """Titles, scripture references, initials and list numbers keep their full stop."""
+        with when("splitting text with abbreviations"):
+            sentences = split_sentences(
+                "1. Dr. Kamau read Math. 5:3 with J. Kenyatta in 1963. Prune, e.g. in June."
+            )
+
+        with then("only real sentence ends split"):
+            assert_that(
+                sentences,
+                is_(
+                    equal_to([
+                        "1. Dr. Kamau read Math. 5:3 with J. Kenyatta in 1963.",
+                        "Prune, e.g. in June.",
+                    ])
+                ),
+            )
+
+    def test_lowercase_continuation_does_not_split(self):
+        """A full stop followed by a lower-case word is not a sentence boundary."""
+        with then("the text stays one sentence"):
+            assert_that(
+                split_sentences("Mix 2.5 kg. of manure per hole"),
+                is_(equal_to(["Mix 2.5 kg. of manure per hole"])),
+            )
+
+
+class TestDocumentSegmentation(unittest.TestCase):
+    def test_paragraphs_are_preserved(self):
+        """Blank lines separate paragraphs; single newlines are joined."""
+        with given([]) as _:
+            text = "Rĩu ũrĩ mwega?\nĨĩ, ndĩ mwega.\n\n\n  Plant coffee in March.  \n"
+
+        with when("segmenting the document"):
+            paragraphs = segment_document(text)
+
+        with then("sentences are grouped per paragraph"):
+            assert_that(
+                paragraphs,
+                is_(
+                    equal_to([
+                        ["Rĩu ũrĩ mwega?", "Ĩĩ, ndĩ mwega."],
+                        ["Plant coffee in March."],
+                    ])
+                ),
+            )
@@ -0,0 +1,148 @@
+"""Unit tests for the process-sharded sentence index."""
+
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, is_
+
+from app.api.embeddings import compute_csls_penalty
+from app.api.retrieval import ExactSentenceIndex, normalize_rows
+from app.api.sharding import (
+    ShardedSentenceIndex,
+    gather_partial,
+    local_ranges,
+    read_shard_layout,
+    shard_bounds,
+    write_shard_layout,
+)
+
+
+class TestShardLayout(unittest.TestCase):
+    def test_shard_bounds_cover_every_row_once(self):
+        """Shards are contiguous, non-overlapping and cover the whole bank."""
+        with when("splitting 10 rows into 3 shards"):
+            bounds = shard_bounds(10, 3)
+
+        with then("the slices tile the bank"):
+            assert_that(bounds, is_(equal_to([(0, 3), (3, 7), (7, 10)])))
+
+    def test_local_ranges_clip_to_the_shard(self):
+        """Global row ranges are clipped and rebased to shard-local rows."""
+        with when("intersecting ranges with the shard [10, 20)"):
+            ranges = local_ranges([(0, 12), (15, 16), (25, 30)], 10, 20)
+
+        with then("only the overlapping parts remain, in local rows"):
+            assert_that(ranges, is_(equal_to([(0, 2), (5, 6)])))
+
+    def test_layout_is_reused_only_for_the_same_bank(self):
+        """A recorded layout is returned only while row and shard counts match."""
+        with when("recording a layout and reading it back"):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = os.path.join(tmpdir, "shards_en.json")
+                write_shard_layout(path, shard_bounds(100, 4), "tgt_embs_en.npy")
+                same = read_shard_layout(path, 100, 4)
+                grown = read_shard_layout(path, 120, 4)
+
+        with then("a matching bank reuses it and a grown bank does not"):
+            assert_that(same, is_(equal_to(shard_bounds(100, 4))))
+            assert_that(grown, is_(equal_to(None)))
+
+
+class TestShardedSentenceIndex(unittest.TestCase):
+    def test_scatter_gather_matches_exact_scan(self):
+        """Merged shard top-k lists equal the single-process exact ranking."""
+        with given([]) as _:
+            rng = np.random.default_rng(3)
+            bank = rng.normal(size=(300, 16)).astype(np.float32)
+            penalty = compute_csls_penalty(bank, bank, k=5)
+            exact = ExactSentenceIndex(bank, penalty)
+            sharded = ShardedSentenceIndex(bank, penalty, shard_bounds(300, 3), timeout=10)
+            query = normalize_rows(bank[7:8] + 0.1)[0]
+
+        with when("searching the full bank and a range crossing a shard boundary"):
+            full = sharded.search(query, 10)
+            ranged = sharded.search(query, 5, ranges=[(90, 210)])
+            sharded.close()
+
+        with then("both agree with the exact index"):
+            exact_full = exact.search(query, 10)
+            exact_ranged = exact.search(query, 5, ranges=[(90, 210)])
+            assert_that(full[0].tolist(), is_(equal_to(exact_full[0].tolist())))
+            np.testing.assert_allclose(full[1], exact_full[1], rtol=1e-5)
+            assert_that(ranged[0].tolist(), is_(equal_to(exact_ranged[0].tolist())))
+
+    def test_gather_partial_drops_late_shards(self):
+        """Shards that miss the deadline are reported missing, the rest are kept."""
+        with given([]) as _:
+            pool = ThreadPoolExecutor(max_workers=2)
+            futures = {
+                0: pool.submit(lambda: "fast"),
+                1: pool.submit(lambda: time.sleep(1.0) or "slow"),
+            }
+
+        with when("gathering with a short timeout"):
+            results, missing = gather_partial(futures, timeout=0.2)
+            pool.shutdown(wait=False)
+
+        with then("only the fast shard contributes"):
+            assert_that(results, is_(equal_to({0: "fast"})))
+            assert_that(missing, is_(equal_to([1])))
+
+    def test_a_shard_busy_with_an_abandoned_search_is_skipped(self):
+        """Later queries do not queue behind a search that already missed its deadline."""
+        with given([]) as _:
+            rng = np.random.default_rng(5)
+            bank = rng.normal(size=(90, 8)).astype(np.float32)
+            penalty = compute_csls_penalty(bank, bank, k=5)
+            sharded = ShardedSentenceIndex(bank, penalty, shard_bounds(90, 3), timeout=0.2)
+            self.addCleanup(sharded.close)
+            exact = ExactSentenceIndex(bank[30:60], penalty[30:60])
+            calls = []
+
+            class SlowShard:
+                """Shard 1's worker: its first two searches sleep past the timeout."""
+
+                def __init__(self):
+                    self.pool = ThreadPoolExecutor(max_workers=1)
+
+                def submit(self, fn, query, k, ranges):
+                    calls.append(query)
+                    slow = len(calls) <= 2
+
+                    def run():
+                        if slow:
+                            time.sleep(0.6)
+                        return exact.search(query, k, ranges=ranges)
+
+                    return self.pool.submit(run)
+
+                def shutdown(self, wait=True):
+                    self.pool.shutdown(wait=wait)
+
+            sharded._pools[1].shutdown()
+            sharded._pools[1] = SlowShard()
+            query = normalize_rows(bank[40:41])[0]
+
+        with when("querying twice per slow search, then once the shard is fast again"):
+            elapsed, rows = [], []
+            for _ in range(2):
+                for _ in range(2):
+                    start = time.monotonic()
+                    ids, _ = sharded.search(query, 3)
+                    elapsed.append(time.monotonic() - start)
+                    rows.append(ids.tolist())
+                time.sleep(0.6)  # the abandoned search finishes
+            ids, _ = sharded.search(query, 3)
+
+        with then("no query waits past the timeout and the shard answers after recovering"):
+            assert_that(max(elapsed) < 0.4, is_(True))
+            assert_that(any(40 in r for r in rows), is_(False))
+            assert_that(len(calls), is_(equal_to(3)))
+            assert_that(sharded.shard_timeouts[1], is_(equal_to(2)))
+            assert_that(sharded.shard_skips[1], is_(equal_to(2)))
+            assert_that(ids[0], is_(equal_to(40)))
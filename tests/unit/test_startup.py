@@ -0,0 +1,62 @@
+"""Unit tests for the startup stage report."""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from givenpy import given, then, when
+from hamcrest import (
+    assert_that,
+    equal_to,
+    greater_than,
+    greater_than_or_equal_to,
+    is_,
+    less_than,
+)
+
+from app.serve.startup import StartupReport, unique_memory_mb
+
+
+class TestStartupReport(unittest.TestCase):
+    def test_concurrent_stages_are_timed_and_overlap(self):
+        """Stages run on a pool are all recorded with overlapping start offsets."""
+        with given([]) as _:
+            report = StartupReport()
+            # Both stages must be running at once for either to get past the barrier
+            both_running = threading.Barrier(2, timeout=5)
+
+            def stage() -> None:
+                both_running.wait()
+                time.sleep(0.1)
+
+        with when("running two stages concurrently"):
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [pool.submit(report.run, name, stage) for name in "ab"]
+                for f in futures:
+                    f.result()
+            report.finish("ready")
+
+        with then("both are reported and each started before the other ended"):
+            stages = report.as_dict()["stages"]
+            assert_that(sorted(stages), is_(equal_to(["a", "b"])))
+            a, b = stages["a"], stages["b"]
+            assert_that(a["seconds"], greater_than_or_equal_to(0.1))
+            assert_that(a["start_s"], less_than(b["start_s"] + b["seconds"]))
+            assert_that(b["start_s"], less_than(a["start_s"] + a["seconds"]))
+            assert_that(report.ready, is_(True))
+
+
+class TestUniqueMemory(unittest.TestCase):
+    @unittest.skipUnless(sys.platform.startswith("linux"), "needs /proc smaps_rollup")
+    def test_reports_private_memory_of_a_live_process(self):
+        """USS of this process is positive and absent for a pid that does not exist."""
+        with when("measuring this process and an impossible pid"):
+            own = unique_memory_mb(os.getpid())
+            missing = unique_memory_mb(2**22 + 1)
+
+        with then("only the live process has a value"):
+            assert_that(own, greater_than(0))
+            assert_that(missing, is_(None))
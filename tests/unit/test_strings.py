@@ -0,0 +1,104 @@
+"""Unit tests for the compact string store and label array."""
+
+import os
+import tempfile
+import unittest
+
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, is_
+
+from app.api.retrieval import contiguous_ranges
+from app.api.strings import LabelArray, StringMap, StringStore
+
+_WORDS = ["mũndũ", "arakorirũo", "thĩna", "", "Ngai", "mũndũ mũrũme"]
+
+
+class TestStringStore(unittest.TestCase):
+    def test_round_trips_utf8_strings(self):
+        """Items, slices and iteration return the original strings."""
+        with when("building a store"):
+            store = StringStore.from_strings(_WORDS)
+
+        with then("every access path decodes the same strings"):
+            assert_that(len(store), is_(equal_to(len(_WORDS))))
+            assert_that(store[1], is_(equal_to("arakorirũo")))
+            assert_that(store[-1], is_(equal_to("mũndũ mũrũme")))
+            assert_that(list(store), is_(equal_to(_WORDS)))
+            assert_that(list(store[2:5]), is_(equal_to(_WORDS[2:5])))
+            assert_that(store.take([4, 0]), is_(equal_to(["Ngai", "mũndũ"])))
+
+    def test_save_and_memory_mapped_load(self):
+        """A saved store reloads memory-mapped with identical contents."""
+        with given([]) as _:
+            store = StringStore.from_strings(_WORDS)
+
+        with when("saving and loading it"):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                stem = os.path.join(tmpdir, "bank_en")
+                store[1:].save(stem)
+                loaded = StringStore.load(stem)
+                words = list(loaded)
+                del loaded
+
+        with then("the slice round-trips"):
+            assert_that(words, is_(equal_to(_WORDS[1:])))
+
+    def test_index_of_uses_sorted_lookup(self):
+        """index_of finds exact matches and returns None for unknown words."""
+        with given([]) as _:
+            store = StringStore.from_strings(_WORDS)
+
+        with then("known words map to their row ids"):
+            assert_that(store.index_of("thĩna"), is_(equal_to(2)))
+            assert_that(store.index_of("Ngai"), is_(equal_to(4)))
+            assert_that(store.index_of(""), is_(equal_to(3)))
+            assert_that(store.index_of("mũndũ mũ"), is_(equal_to(None)))
+
+    def test_appended_keeps_existing_rows(self):
+        """Appending to a sliced store yields the slice followed by the new strings."""
+        with when("appending to a view"):
+            store = StringStore.from_strings(_WORDS)[2:4].appended(["ithe", "maitũ"])
+
+        with then("rows are in order"):
+            assert_that(list(store), is_(equal_to(["thĩna", "", "ithe", "maitũ"])))
+
+
+class TestLabelArray(unittest.TestCase):
+    def test_ranges_match_the_list_implementation(self):
+        """Vectorised label runs equal contiguous_ranges over a plain list."""
+        with given([]) as _:
+            labels = ["bible", "bible", "agri", "agri", "bible", "other"]
+
+        with when("encoding the labels"):
+            array = LabelArray.from_labels(labels)
+
+        with then("ranges and items agree with the list"):
+            assert_that(contiguous_ranges(array), is_(equal_to(contiguous_ranges(labels))))
+            assert_that(list(array), is_(equal_to(labels)))
+
+    def test_concatenate_remaps_codes(self):
+        """Concatenating arrays with different name tables keeps every label."""
+        with when("concatenating two label arrays"):
+            merged = LabelArray.concatenate([
+                LabelArray.from_labels(["bible", "agri"]),
+                LabelArray.from_labels(["medicine", "bible"]),
+            ])
+
+        with then("labels keep their order"):
+            assert_that(list(merged), is_(equal_to(["bible", "agri", "medicine", "bible"])))
+
+
+class TestStringMap(unittest.TestCase):
+    def test_lookups_match_a_dict(self):
+        """Present keys return their value and missing keys the default."""
+        with given([]) as _:
+            table = {"mũndũ": "person", "thĩna": "trouble", "ngai": "god"}
+
+        with when("building a string map from the items"):
+            mapping = StringMap.from_items(table.items())
+
+        with then("it answers like the dict"):
+            assert_that(len(mapping), is_(equal_to(3)))
+            for key, value in table.items():
+                assert_that(mapping.get(key, key), is_(equal_to(value)))
+            assert_that(mapping.get("mũtĩ", "mũtĩ"), is_(equal_to("mũtĩ")))
@@ -0,0 +1,65 @@
+"""Unit tests for the HNSW parameter tuner."""
+
+import argparse
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+from givenpy import given, then, when
+from hamcrest import assert_that, equal_to, greater_than_or_equal_to, is_
+
+from app.api.embeddings import CrossLingualTranslator
+from app.api.retrieval import normalize_rows
+from scripts.tune_hnsw import pareto_front, select_config, tune_direction
+
+
+def _result(recall: float, query_ms: float) -> dict:
+    return {"recall_at_1": recall, "query_ms": query_ms}
+
+
+class TestParetoSelection(unittest.TestCase):
+    def test_front_drops_dominated_configs(self):
+        """A config slower and less accurate than another is not on the front."""
+        with given([]) as _:
+            results = [_result(0.90, 0.1), _result(0.99, 0.3), _result(0.95, 0.4)]
+
+        with when("computing the Pareto front"):
+            front = pareto_front(results)
+
+        with then("only the non-dominated configs remain, fastest first"):
+            assert_that(front, is_(equal_to([_result(0.90, 0.1), _result(0.99, 0.3)])))
+
+    def test_select_prefers_fastest_config_meeting_target(self):
+        """The fastest config reaching the target wins; otherwise the most accurate."""
+        with given([]) as _:
+            front = [_result(0.90, 0.1), _result(0.97, 0.2), _result(0.99, 0.3)]
+
+        with then("the target decides the pick"):
+            assert_that(select_config(front, 0.95), is_(equal_to(_result(0.97, 0.2))))
+            assert_that(select_config(front, 0.999), is_(equal_to(_result(0.99, 0.3))))
+
+
+class TestTuneDirection(unittest.TestCase):
+    def test_wide_search_matches_brute_force(self):
+        """With ef and shortlist covering the vocab, HNSW agrees with the exact path."""
+        with given([]) as _:
+            rng = np.random.default_rng(0)
+            words = [f"w{i}" for i in range(200)]
+            vectors = dict(zip(words, rng.normal(size=(200, 16)), strict=True))
+            model = MagicMock()
+            model.get_words.return_value = words
+            model.get_word_vector.side_effect = lambda w: vectors[w]
+            translator = CrossLingualTranslator(model, model, np.eye(16), [])
+            queries = normalize_rows(rng.normal(size=(50, 16)))
+            args = argparse.Namespace(
+                M=[8], ef_construction=[50], ef=[200], shortlist=[8, 200], target_recall=1.0
+            )
+
+        with when("tuning the direction"):
+            report = tune_direction(translator, queries, args)
+
+        with then("the full shortlist reaches perfect recall and is selected"):
+            recalls = {r["shortlist"]: r["recall_at_1"] for r in report["results"]}
+            assert_that(recalls[200], is_(equal_to(1.0)))
+            assert_that(recalls[200], greater_than_or_equal_to(recalls[8]))
+            assert_that(report["selected"]["recall_at_1"], is_(equal_to(1.0)))
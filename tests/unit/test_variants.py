@@ -0,0 +1,158 @@
+"""Unit tests for A/B and shadow serving of several runs."""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from givenpy import given, then, when
+from hamcrest import assert_that, close_to, equal_to, is_
+
+from app.serve.variants import SharedArtifacts, VariantRouter, VariantServing
+
+
+def wait_idle(serving: VariantServing) -> None:
+    deadline = time.monotonic() + 5
+    while serving.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestVariantRouter(unittest.TestCase):
+    def test_assignment_is_sticky_and_weighted(self):
+        """Each key keeps its run, and runs get about their weight of the keys."""
+        with given([]) as _:
+            router = VariantRouter("run_a", {"run_b": 0.2}, {})
+            keys = [f"client-{i}" for i in range(10_000)]
+
+        with when("assigning every key twice"):
+            first = [router.assign(k) for k in keys]
+            second = [router.assign(k) for k in keys]
+
+        with then("assignments repeat and about a fifth go to the weighted run"):
+            assert_that(first, is_(equal_to(second)))
+            assert_that(first.count("run_b") / len(keys), is_(close_to(0.2, 0.02)))
+
+    def test_shadow_sampling(self):
+        """Shadow runs are sampled at their rate; the primary re-checks weighted runs."""
+        with given([]) as _:
+            router = VariantRouter(
+                "run_a", {"run_b": 0.5}, {"run_c": 1.0}, compare_rate=1.0, seed=0
+            )
+
+        with then("a primary request shadows run_c and a run_b one also the primary"):
+            assert_that(router.shadow_runs("run_a"), is_(equal_to(["run_c"])))
+            assert_that(router.shadow_runs("run_b"), is_(equal_to(["run_c", "run_a"])))
+
+
+class TestSharedArtifacts(unittest.TestCase):
+    def test_linked_files_load_once(self):
+        """Loads are shared by file identity, so a hard link reuses the first load."""
+        with given([]) as _:
+            root = tempfile.mkdtemp()
+            paths = {run: os.path.join(root, f"{run}.bin") for run in ("a", "b", "c")}
+            for run, content in (("a", b"same"), ("c", b"same")):
+                with open(paths[run], "wb") as f:
+                    f.write(content)
+            os.link(paths["a"], paths["b"])
+            shared = SharedArtifacts()
+            loads = []
+
+            def load(path):
+                def start():
+                    loads.append(path)
+                    future = Future()
+                    future.set_result(path)
+                    return future
+
+                return start
+
+        with when("loading each file for one run each"):
+            results = {
+                run: shared.future("model", [path], load(path)).result()
+                for run, path in paths.items()
+            }
+
+        with then("the link reuses the first load and the copy loads itself"):
+            assert_that(loads, is_(equal_to([paths["a"], paths["c"]])))
+            assert_that(results["b"], is_(equal_to(paths["a"])))
+            assert_that(shared.reused, is_(equal_to(1)))
+
+
+class TestVariantServing(unittest.TestCase):
+    def test_shadow_answers_are_compared_with_the_primary(self):
+        """Shadow latency and agreement are recorded without touching the reply."""
+        with given([]) as _:
+            runs = {"run_a": {"ki_en": "a"}, "run_c": {"ki_en": "c"}}
+            router = VariantRouter("run_a", {}, {"run_c": 1.0})
+            serving = VariantServing("run_a", runs, router)
+            self.addCleanup(serving.close)
+            answers = {"a": "same", "c": "same"}
+
+        with when("the primary serves two requests that run_c shadows"):
+            for answer in ("same", "different"):
+                run, translator = serving.route("client", "ki_en", "a")
+                serving.observe(run, 0.01)
+                serving.shadow(run, "ki_en", answer, lambda t: answers[t])
+            wait_idle(serving)
+            stats = serving.stats()["runs"]
+
+        with then("run_c agreed once in two comparisons"):
+            assert_that(stats["run_a"]["served"], is_(equal_to(2)))
+            assert_that(stats["run_c"]["shadowed"], is_(equal_to(2)))
+            assert_that(stats["run_c"]["compared"], is_(equal_to(2)))
+            assert_that(stats["run_c"]["agreement"], is_(equal_to(0.5)))
+
+    def test_shadow_work_beyond_the_bound_is_dropped(self):
+        """A slow shadow run never builds up an unbounded queue."""
+        with given([]) as _:
+            runs = {"run_a": {"ki_en": "a"}, "run_c": {"ki_en": "c"}}
+            router = VariantRouter("run_a", {}, {"run_c": 1.0})
+            serving = VariantServing("run_a", runs, router, max_pending=1)
+            self.addCleanup(serving.close)
+            release = threading.Event()
+
+            def evaluate(translator):
+                release.wait(timeout=5)
+                return "x"
+
+        with when("three requests arrive while the first evaluation blocks"):
+            for _ in range(3):
+                serving.shadow("run_a", "ki_en", None, evaluate)
+            dropped = serving.stats()["dropped"]
+            release.set()
+            wait_idle(serving)
+
+        with then("two were dropped and the one evaluated is not compared"):
+            assert_that(dropped, is_(equal_to(2)))
+            run_c = serving.stats()["runs"]["run_c"]
+            assert_that(run_c["shadowed"], is_(equal_to(1)))
+            assert_that(run_c["compared"], is_(equal_to(0)))
+
+    def test_evaluations_run_through_the_given_compute(self):
+        """The server hands shadow work to its compute executor instead of running it."""
+        with given([]) as _:
+            runs = {"run_a": {"ki_en": "a"}, "run_c": {"ki_en": "c"}}
+            router = VariantRouter("run_a", {}, {"run_c": 1.0})
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="compute")
+            self.addCleanup(executor.shutdown)
+            threads = []
+
+            def compute(fn):
+                return executor.submit(fn).result()
+
+            def evaluate(translator):
+                threads.append(threading.current_thread().name)
+                return "same"
+
+            serving = VariantServing("run_a", runs, router, compute=compute)
+            self.addCleanup(serving.close)
+
+        with when("the primary serves a request that run_c shadows"):
+            serving.shadow("run_a", "ki_en", "same", evaluate)
+            wait_idle(serving)
+
+        with then("the evaluation ran on the compute thread and was compared"):
+            assert_that(threads, is_(equal_to(["compute_0"])))
+            assert_that(serving.stats()["runs"]["run_c"]["agreement"], is_(equal_to(1.0)))